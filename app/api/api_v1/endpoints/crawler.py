@@ -1,12 +1,21 @@
 """
 Crawler API endpoints for testing and triggering crawls.
 """
+import asyncio
+import uuid
 from typing import Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import AnyHttpUrl, BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_crawl_queue, get_crawler_service
+from app.core.config import settings
+from app.db.session import get_async_db
+from app.models.tracked_page import TrackedPage
+from app.schemas.crawl_job import CrawlJobCreated, CrawlJobRead
 from app.services.crawler.crawler_service import CrawlerService
+from app.services.crawler.queue import CrawlQueue
 from app.services.crawler.firecrawl import JobPostingsResponse as FireCrawlJobPostingsResponse
 from app.services.crawler.firecrawl import JobPosting as FireCrawlJobPosting
 
@@ -51,6 +60,12 @@ class JobPostingRequest(BaseModel):
     url: AnyHttpUrl
     company_name: Optional[str] = None
     append_positions_tag: bool = False
+    timeout: Optional[float] = Field(
+        None, gt=0, le=600, description="Extraction timeout in seconds"
+    )
+    force_refresh: bool = Field(
+        False, description="Bypass the cache and change detection and always extract"
+    )
 
 
 class JobPostingResponse(BaseModel):
@@ -61,17 +76,75 @@ class JobPostingResponse(BaseModel):
     url: str
     status_code: int
     total: int = Field(..., description="Total number of job postings found")
+    changed: bool = Field(True, description="False if the page was unchanged and the last result was reused")
+    provider: Optional[str] = Field(None, description="Crawler provider that produced the result")
+
+
+class JobPostingDiffRequest(BaseModel):
+    """
+    Request model for the changes on a tracked page since its last crawl.
+    """
+    tracked_page_id: uuid.UUID
+    append_positions_tag: bool = False
+    timeout: Optional[float] = Field(
+        None, gt=0, le=600, description="Extraction timeout in seconds"
+    )
+    force_refresh: bool = Field(
+        False, description="Bypass the cache and change detection and always extract"
+    )
+
+
+class JobPostingDiffResponse(BaseModel):
+    """
+    Response model for the changes on a career page since its last crawl.
+    """
+    url: str
+    added: List[JobPosting]
+    removed: List[JobPosting]
+    modified: List[JobPosting]
+    unchanged: int
+
+
+class BatchJobPostingRequest(BaseModel):
+    """
+    Request model for extracting job postings from many career pages.
+    """
+    urls: List[AnyHttpUrl] = Field(..., min_length=1)
+    append_positions_tag: bool = False
+    timeout: Optional[float] = Field(
+        None, gt=0, le=600, description="Per-request extraction timeout in seconds"
+    )
+
+
+class BatchJobPostingResult(BaseModel):
+    """
+    Extraction result for a single URL of a batch.
+    """
+    url: str
+    job_postings: List[JobPosting] = []
+    total: int = 0
+    error: Optional[str] = None
+
+
+class BatchJobPostingResponse(BaseModel):
+    """
+    Response model for batch job posting extraction.
+    """
+    results: List[BatchJobPostingResult]
+    succeeded: int
+    failed: int
 
 
 @router.post("/crawl", response_model=CrawlResponse, status_code=status.HTTP_200_OK)
-async def crawl_url(request: CrawlRequest):
+async def crawl_url(
+    request: CrawlRequest,
+    crawler_service: CrawlerService = Depends(get_crawler_service),
+):
     """
     Crawl a URL and extract its content.
     
     This endpoint is for testing the crawler functionality and extraction logic.
     """
-    crawler_service = CrawlerService()
-    
     try:
         # 執行爬取和處理
         result = await crawler_service.crawl_and_process(str(request.url))
@@ -95,25 +168,29 @@ async def crawl_url(request: CrawlRequest):
 
 
 @router.post("/extract-jobs", response_model=JobPostingResponse, status_code=status.HTTP_200_OK)
-async def extract_job_postings(request: JobPostingRequest):
+async def extract_job_postings(
+    request: JobPostingRequest,
+    crawler_service: CrawlerService = Depends(get_crawler_service),
+):
     """
     Extract job postings from a career page.
     
     Args:
         request: Job posting extraction request with URL, optional company name,
-                and whether to append "#positions" tag to the URL.
+                whether to append "#positions" tag to the URL, an optional timeout and
+                whether to force a refresh.
     
     Returns:
         List of extracted job postings.
     """
-    crawler_service = CrawlerService()
-    
     try:
         # 執行爬取職缺
         result = await crawler_service.crawl_job_postings(
             url=str(request.url),
             company_name=request.company_name,
-            append_positions_tag=request.append_positions_tag
+            append_positions_tag=request.append_positions_tag,
+            timeout=request.timeout,
+            force_refresh=request.force_refresh
         )
         
         # 將 FireCrawl 模型轉換為 API 模型
@@ -134,11 +211,15 @@ async def extract_job_postings(request: JobPostingRequest):
             job_postings=job_postings,
             url=str(result.url),
             status_code=result.status_code,
-            total=len(job_postings)
+            total=len(job_postings),
+            changed=result.changed,
+            provider=result.provider
         )
         
         return response
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -146,6 +227,171 @@ async def extract_job_postings(request: JobPostingRequest):
         )
 
 
+@router.post("/extract-jobs/diff", response_model=JobPostingDiffResponse, status_code=status.HTTP_200_OK)
+async def extract_job_posting_changes(
+    request: JobPostingDiffRequest,
+    crawler_service: CrawlerService = Depends(get_crawler_service),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Extract job postings from a tracked page and return only what changed since its last crawl.
+    
+    Snapshots are kept per tracked page, so users tracking the same career page each
+    see their own changes.
+    
+    Args:
+        request: Job posting diff request.
+    
+    Returns:
+        Added, removed and modified job postings.
+    """
+    page = await db.get(TrackedPage, request.tracked_page_id)
+    if page is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Tracked page {request.tracked_page_id} not found"
+        )
+    
+    try:
+        diff = await crawler_service.crawl_job_posting_changes(
+            url=page.url,
+            company_name=page.company_name,
+            append_positions_tag=request.append_positions_tag,
+            timeout=request.timeout,
+            force_refresh=request.force_refresh,
+            page_key=str(page.id)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Job posting diff failed: {str(e)}"
+        )
+    
+    return JobPostingDiffResponse(
+        url=diff.url,
+        added=[JobPosting(**job.model_dump()) for job in diff.added],
+        removed=[JobPosting(**job.model_dump()) for job in diff.removed],
+        modified=[JobPosting(**job.model_dump()) for job in diff.modified],
+        unchanged=diff.unchanged_count
+    )
+
+
+@router.post("/extract-jobs/batch", response_model=BatchJobPostingResponse, status_code=status.HTTP_200_OK)
+async def extract_job_postings_batch(
+    request: BatchJobPostingRequest,
+    crawler_service: CrawlerService = Depends(get_crawler_service),
+):
+    """
+    Extract job postings from many career pages in batched provider requests.
+    
+    A failure on one URL is reported in that URL's result and does not fail the batch.
+    
+    Args:
+        request: Batch extraction request with the URLs, whether to append the
+                "#positions" tag and an optional per-request timeout.
+    
+    Returns:
+        Per-URL extraction results and errors.
+    """
+    if len(request.urls) > settings.CRAWLER_BATCH_MAX_URLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch may contain at most {settings.CRAWLER_BATCH_MAX_URLS} URLs"
+        )
+    
+    urls = [str(url) for url in request.urls]
+    
+    try:
+        batch = await crawler_service.crawl_job_postings_batch(
+            urls=urls,
+            append_positions_tag=request.append_positions_tag,
+            timeout=request.timeout
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch job posting extraction failed: {str(e)}"
+        )
+    
+    results = []
+    for url in dict.fromkeys(urls):
+        result = batch.results.get(url)
+        if result is None:
+            results.append(BatchJobPostingResult(url=url, error=batch.errors.get(url, "No result")))
+            continue
+        
+        job_postings = [JobPosting(**job.model_dump()) for job in result.job_postings]
+        results.append(BatchJobPostingResult(url=url, job_postings=job_postings, total=len(job_postings)))
+    
+    failed = sum(1 for result in results if result.error is not None)
+    return BatchJobPostingResponse(
+        results=results,
+        succeeded=len(results) - failed,
+        failed=failed
+    )
+
+
+@router.post("/jobs", response_model=CrawlJobCreated, status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_crawl_job(
+    request: JobPostingRequest,
+    crawl_queue: CrawlQueue = Depends(get_crawl_queue)
+):
+    """
+    Queue a job posting extraction to be processed by the crawl workers.
+    
+    Poll ``GET /crawler/jobs/{job_id}`` for the result.
+    """
+    try:
+        job = await asyncio.to_thread(
+            crawl_queue.enqueue,
+            str(request.url),
+            company_name=request.company_name,
+            append_positions_tag=request.append_positions_tag,
+            force_refresh=request.force_refresh,
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to enqueue crawl job: {str(e)}"
+        )
+    return CrawlJobCreated(job_id=job.id, status=job.status)
+
+
+@router.get("/jobs/{job_id}", response_model=CrawlJobRead, status_code=status.HTTP_200_OK)
+async def get_crawl_job(
+    job_id: uuid.UUID,
+    crawl_queue: CrawlQueue = Depends(get_crawl_queue)
+):
+    """
+    Get the status and result of a queued crawl job.
+    """
+    job = await asyncio.to_thread(crawl_queue.get, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Crawl job {job_id} not found"
+        )
+    return job
+
+
+@router.get("/providers", status_code=status.HTTP_200_OK)
+async def get_provider_stats(crawler_service: CrawlerService = Depends(get_crawler_service)):
+    """
+    Get crawler provider health (latency, error rate, circuit state) in routing order.
+    """
+    return crawler_service.provider_stats()
+
+
+@router.get("/cache/stats", status_code=status.HTTP_200_OK)
+async def get_cache_stats(crawler_service: CrawlerService = Depends(get_crawler_service)):
+    """
+    Get extraction cache hit/miss metrics.
+    """
+    return crawler_service.cache_stats()
+
+
 @router.get("/test", status_code=status.HTTP_200_OK)
 async def test_crawler():
     """
@@ -1,24 +1,118 @@
 """
 Jobs endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+import uuid
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_job_search_service
+from app.db.session import AsyncSessionLocal, get_async_db
+from app.models.job import Job
+from app.models.tracked_page import TrackedPage
+from app.schemas.job import JobListResponse, JobRead, JobSearchResponse
+from app.services.jobs.listing import JobFilters, iter_jobs_ndjson, list_jobs, to_job_schema
+from app.services.jobs.search import JobSearchService
 
 router = APIRouter()
 
 
-@router.get("/")
-async def read_jobs():
+def get_job_filters(
+    tracked_page_id: Optional[uuid.UUID] = Query(None, description="Only jobs of this tracked page"),
+    status: Optional[Literal["new", "seen", "notified"]] = Query(None, description="Job status"),
+    location: Optional[str] = Query(None, description="Exact location"),
+    department: Optional[str] = Query(None, description="Exact department"),
+    company: Optional[str] = Query(None, description="Company name of the tracked page"),
+) -> JobFilters:
+    """
+    Collect the listing filters from the query string.
+    """
+    return JobFilters(
+        tracked_page_id=tracked_page_id,
+        status=status,
+        location=location,
+        department=department,
+        company=company,
+    )
+
+
+@router.get("/", response_model=JobListResponse)
+async def read_jobs(
+    filters: JobFilters = Depends(get_job_filters),
+    cursor: Optional[str] = Query(None, description="Cursor returned by the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get list of jobs matching user's criteria, newest first.
+    
+    Pages are keyset-paginated on ``(first_seen, id)``; pass ``next_cursor`` to get the next page.
+    """
+    items, next_cursor = await list_jobs(db, filters, cursor, limit)
+    return JobListResponse(items=items, next_cursor=next_cursor, limit=limit)
+
+
+@router.get("/search", response_model=JobSearchResponse)
+async def search_jobs(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text"),
+    filters: JobFilters = Depends(get_job_filters),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    search_service: JobSearchService = Depends(get_job_search_service)
+):
+    """
+    Search jobs by title and description, ranked by relevance.
+    
+    Matches full-text terms in the title or description, or titles similar to the query
+    (typo tolerant).
+    """
+    items = await search_service.search(db, q, filters, limit)
+    return JobSearchResponse(query=q, items=items)
+
+
+@router.get("/search/suggest", response_model=List[str])
+async def suggest_job_titles(
+    prefix: str = Query(..., min_length=1, max_length=100, description="Text typed so far"),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db),
+    search_service: JobSearchService = Depends(get_job_search_service)
+):
+    """
+    Autocomplete job titles from a prefix.
+    """
+    return await search_service.suggest(db, prefix, limit)
+
+
+@router.get("/export")
+async def export_jobs(filters: JobFilters = Depends(get_job_filters)):
     """
-    Get list of jobs matching user's criteria.
+    Export all jobs matching the filters as newline-delimited JSON.
     """
-    # Placeholder for jobs list implementation
-    return {"message": "Jobs list endpoint (to be implemented)"}
+    # 串流期間自行開啟 session，請求相依的 session 在回應送出前就會關閉
+    return StreamingResponse(
+        iter_jobs_ndjson(AsyncSessionLocal, filters),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="jobs.ndjson"'},
+    )
 
 
-@router.get("/{job_id}")
-async def read_job(job_id: str):
+@router.get("/{job_id}", response_model=JobRead)
+async def read_job(job_id: uuid.UUID, db: AsyncSession = Depends(get_async_db)):
     """
     Get details for a specific job by ID.
     """
-    # Placeholder for job details implementation
-    return {"message": f"Job details endpoint for ID: {job_id} (to be implemented)"} 
\ No newline at end of file
+    row = (await db.execute(
+        select(Job, TrackedPage.company_name)
+        .join(TrackedPage, Job.tracked_page_id == TrackedPage.id)
+        .where(Job.id == job_id)
+    )).first()
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found"
+        )
+    
+    return to_job_schema(*row)
@@ -0,0 +1,65 @@
+"""
+Shared FastAPI dependencies.
+"""
+from fastapi import HTTPException, Request, status
+
+from app.services.crawler.crawler_service import CrawlerService
+from app.services.crawler.queue import CrawlQueue
+from app.services.jobs.search import JobSearchService
+
+
+def get_crawler_service(request: Request) -> CrawlerService:
+    """
+    Get the process-wide crawler service created during application startup.
+    
+    Args:
+        request: Incoming request, used to reach the application state.
+        
+    Returns:
+        CrawlerService: Shared crawler service instance.
+        
+    Raises:
+        HTTPException: If the crawler service could not be initialized.
+    """
+    crawler_service = getattr(request.app.state, "crawler_service", None)
+    if crawler_service is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Crawler service is not available"
+        )
+    return crawler_service
+
+
+def get_crawl_queue(request: Request) -> CrawlQueue:
+    """
+    Get the crawl job queue created during application startup.
+    
+    Args:
+        request: Incoming request, used to reach the application state.
+        
+    Returns:
+        CrawlQueue: Shared crawl queue instance.
+        
+    Raises:
+        HTTPException: If the crawl queue could not be initialized.
+    """
+    crawl_queue = getattr(request.app.state, "crawl_queue", None)
+    if crawl_queue is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Crawl queue is not available"
+        )
+    return crawl_queue
+
+
+def get_job_search_service(request: Request) -> JobSearchService:
+    """
+    Get the job search service created during application startup.
+    
+    Args:
+        request: Incoming request, used to reach the application state.
+        
+    Returns:
+        JobSearchService: Shared job search service instance.
+    """
+    return request.app.state.job_search_service
@@ -78,6 +78,19 @@ class Settings(BaseSettings):
             path=f"{values.data.get('POSTGRES_DB') or ''}",
         )
     
+    # Database connection pool settings (每個處理程序各自一組連線池)
+    # 單一 API worker 的連線上限為 DB_POOL_SIZE + DB_MAX_OVERFLOW
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 30
+    # 等待連線池釋出連線的逾時秒數，逾時回傳 503
+    DB_POOL_TIMEOUT: float = 10.0
+    # 連線最長重複使用秒數，避免被資料庫或防火牆單方面關閉
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # 同步引擎 (排程器、佇列與舊有端點) 的連線池較小，避免每個處理程序的連線上限加倍
+    SYNC_DB_POOL_SIZE: int = 5
+    SYNC_DB_MAX_OVERFLOW: int = 10
+    
     # JWT settings
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
@@ -86,10 +99,150 @@ class Settings(BaseSettings):
     # Jina AI API settings
     # 金鑰必須以 "jina_" 開頭
     JINA_AI_API_KEY: str
+    JINA_READER_URL: str = "https://r.jina.ai"
+    JINA_REQUEST_TIMEOUT: float = 60.0
+    # 路由權重，數值越低越優先；Jina 只做啟發式連結擷取，預設排在 FireCrawl 的 LLM 提取之後
+    JINA_PROVIDER_COST: float = 3.0
     
     # FireCrawl API settings
     # 金鑰必須以 "fc-" 開頭
     FIRECRAWL_API_KEY: str = ""
+    FIRECRAWL_API_URL: str = "https://api.firecrawl.dev"
+    # 單次提取 (送出 + 輪詢) 的逾時秒數
+    FIRECRAWL_EXTRACT_TIMEOUT: float = 120.0
+    # 單一 HTTP 請求的逾時秒數
+    FIRECRAWL_REQUEST_TIMEOUT: float = 30.0
+    FIRECRAWL_POLL_INTERVAL: float = 2.0
+    # 每個 worker 同時進行中的提取任務上限
+    FIRECRAWL_MAX_CONCURRENT_EXTRACTIONS: int = 32
+    FIRECRAWL_PROVIDER_COST: float = 1.0
+    # 批次提取：每次請求的 URL 數量、逾時秒數、全域同時進行的批次數
+    FIRECRAWL_BATCH_SIZE: int = 10
+    FIRECRAWL_BATCH_EXTRACT_TIMEOUT: float = 300.0
+    CRAWLER_BATCH_CONCURRENCY: int = 8
+    CRAWLER_BATCH_MAX_URLS: int = 5000
+    
+    # Crawler provider routing settings (健康度追蹤、故障轉移與對沖請求)
+    CRAWLER_PROVIDER_EWMA_ALPHA: float = 0.2
+    CRAWLER_PROVIDER_DEGRADED_ERROR_RATE: float = 0.3
+    CRAWLER_PROVIDER_DEGRADED_LATENCY: float = 60.0
+    # 連續失敗次數達到上限後暫停使用該服務的秒數
+    CRAWLER_PROVIDER_FAILURE_THRESHOLD: int = 5
+    CRAWLER_PROVIDER_COOLDOWN: float = 60.0
+    # 服務降級時等待多久後向下一個服務送出對沖請求，未設定則停用對沖
+    CRAWLER_HEDGE_DELAY: Optional[float] = 5.0
+    
+    # Rate limiting settings (每個處理程序各自計算)
+    # 每個目標網域每秒請求數與突發上限，未設定則不限制
+    CRAWLER_DOMAIN_RATE_LIMIT: Optional[float] = 1.0
+    CRAWLER_DOMAIN_BURST: float = 2
+    JINA_RATE_LIMIT: float = 3.0
+    JINA_RATE_BURST: float = 10
+    FIRECRAWL_RATE_LIMIT: float = 2.0
+    FIRECRAWL_RATE_BURST: float = 10
+    # 可重試錯誤的重試次數與指數退避設定；超過上限的 Retry-After 直接轉移至下一個服務
+    CRAWLER_MAX_RETRIES: int = 3
+    CRAWLER_RETRY_BASE_DELAY: float = 1.0
+    CRAWLER_RETRY_MAX_DELAY: float = 60.0
+    
+    # Extraction cache settings (同一頁面在 TTL 內只提取一次)
+    EXTRACTION_CACHE_ENABLED: bool = True
+    EXTRACTION_CACHE_TTL_SECONDS: int = 6 * 60 * 60
+    EXTRACTION_CACHE_MAX_MEMORY_MB: int = 64
+    # 備援服務 (非設定中最優先的服務) 產生的結果只快取此秒數
+    EXTRACTION_CACHE_FALLBACK_TTL_SECONDS: int = 30 * 60
+    # 設定後啟用 SQLite 持久層，重啟後仍保留快取
+    EXTRACTION_CACHE_SQLITE_PATH: Optional[str] = None
+    
+    # Change detection settings (頁面未變更時跳過 LLM 提取)
+    CHANGE_DETECTION_ENABLED: bool = True
+    # 指紋最長保留時間，過期後強制重新提取
+    CHANGE_DETECTION_MAX_AGE_SECONDS: int = 7 * 24 * 60 * 60
+    # simhash 漢明距離不超過此值視為未變更；未設定時需內容雜湊完全相同
+    # 注意：長頁面中新增單一職缺也可能只改變極少位元
+    CHANGE_DETECTION_SIMHASH_THRESHOLD: Optional[int] = None
+    # 可見文字少於此長度的頁面 (多為 JavaScript 外殼) 一律重新提取
+    CHANGE_DETECTION_MIN_CONTENT_LENGTH: int = 500
+    CHANGE_DETECTION_MAX_MEMORY_MB: int = 32
+    CHANGE_DETECTION_SQLITE_PATH: Optional[str] = None
+    
+    # Page snapshot settings (各頁面最後一次的職缺列表，用於計算差異)
+    # 設定時每次更新都追加到旁邊的日誌 (多個程序可共用)，日誌超過上限或關閉服務時
+    # 併入可記憶體映射的快照檔，啟動時直接映射；未設定時只保存在記憶體
+    SNAPSHOT_STORE_PATH: Optional[str] = None
+    SNAPSHOT_JOURNAL_MAX_MB: int = 64
+    
+    # Response archive settings (爬蟲服務原始回應的壓縮封存，可重新解析而不必重新爬取)
+    RESPONSE_ARCHIVE_ENABLED: bool = True
+    RESPONSE_ARCHIVE_DIR: str = "./data/archive"
+    # 單一封存檔 (壓縮後) 達到此大小時換新檔；每個程序保留最新的檔案數，0 表示全部保留
+    RESPONSE_ARCHIVE_MAX_FILE_MB: int = 64
+    RESPONSE_ARCHIVE_MAX_FILES: int = 20
+    # 等待寫入的回應上限，超過時捨棄新回應而不拖慢爬取
+    RESPONSE_ARCHIVE_QUEUE_SIZE: int = 1000
+    
+    # Structured extraction settings (Greenhouse/Lever/Ashby/Workable API 與 schema.org JSON-LD，命中時不呼叫 LLM)
+    STRUCTURED_EXTRACTION_ENABLED: bool = True
+    STRUCTURED_EXTRACTION_TIMEOUT: float = 15.0
+    # 網址無法判斷時抓取頁面 HTML 尋找內嵌職缺板與 JSON-LD (變更偵測已抓取時直接沿用)
+    STRUCTURED_EXTRACTION_FETCH_PAGES: bool = True
+    
+    # Job detail enrichment settings (抓取新職缺的詳細頁面，補齊描述、地點與部門)
+    JOB_ENRICHMENT_ENABLED: bool = True
+    JOB_ENRICHMENT_CONCURRENCY: int = 16
+    # 同一網域同時抓取的詳細頁面數 (另受 CRAWLER_DOMAIN_RATE_LIMIT 限制)
+    JOB_ENRICHMENT_DOMAIN_CONCURRENCY: int = 2
+    JOB_ENRICHMENT_TIMEOUT: float = 15.0
+    # 超過此大小的頁面只讀取前段
+    JOB_ENRICHMENT_MAX_BYTES: int = 2 * 1024 * 1024
+    # 詳細資料以標準職缺網址快取 (使用提取結果快取)，重新爬取時不再抓取
+    JOB_ENRICHMENT_CACHE_TTL_SECONDS: int = 30 * 24 * 60 * 60
+    # 沒有取得描述的頁面只快取較短時間，之後重新抓取
+    JOB_ENRICHMENT_NEGATIVE_CACHE_TTL_SECONDS: int = 60 * 60
+    
+    # Crawler HTTP connection pool settings (跨請求共用的 keep-alive 連線池)
+    CRAWLER_HTTP_MAX_CONNECTIONS: int = 100
+    CRAWLER_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    CRAWLER_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    # 等待連線池釋出連線的逾時秒數
+    CRAWLER_HTTP_POOL_TIMEOUT: float = 10.0
+    
+    # Job matching settings
+    # 匹配分數門檻 (0-100)，超過才視為匹配
+    JOB_MATCH_THRESHOLD: float = 30.0
+    # 每批職缺每位用戶最多回傳的匹配數
+    JOB_MATCH_TOP_K: int = 20
+    # 技能重疊比例在匹配分數中的權重 (其餘為文字相似度)
+    JOB_MATCH_SKILL_WEIGHT: float = 0.4
+    
+    # Crawl queue and worker settings (追蹤頁面的排程爬取)
+    # 設定後佇列使用獨立資料庫 (例如 sqlite:///./data/crawl_queue.db)，否則與主資料庫共用
+    CRAWL_QUEUE_DATABASE_URL: Optional[str] = None
+    # 工作租約秒數，worker 逾時未回報心跳則由其他 worker 接手
+    CRAWL_QUEUE_LEASE_SECONDS: int = 300
+    CRAWL_QUEUE_MAX_ATTEMPTS: int = 3
+    # 失敗重試的基礎延遲秒數 (指數退避)
+    CRAWL_QUEUE_RETRY_DELAY: float = 60.0
+    CRAWL_QUEUE_POLL_INTERVAL: float = 2.0
+    CRAWL_WORKER_PROCESSES: int = 2
+    # 每個 worker 處理程序同時處理的工作數
+    CRAWL_WORKER_CONCURRENCY: int = 8
+    # 排程器掃描到期追蹤頁面的間隔秒數與每次掃描上限
+    CRAWL_SCHEDULER_INTERVAL: float = 300.0
+    CRAWL_SCHEDULER_BATCH_SIZE: int = 500
+    
+    # Sweep pipeline settings (爬取→補齊→寫入→匹配→通知的串流處理，各階段以有界佇列串接)
+    # 各階段的併發數；匹配階段固定為 1 (匹配引擎不可並行使用)
+    SWEEP_CRAWL_CONCURRENCY: int = 32
+    SWEEP_ENRICH_CONCURRENCY: int = 8
+    SWEEP_PERSIST_CONCURRENCY: int = 2
+    # 每次寫入交易與通知寫入合併的頁面數
+    SWEEP_BATCH_SIZE: int = 50
+    # 階段間佇列容量 (背壓)，以及每次從資料庫讀取的到期頁面數
+    SWEEP_QUEUE_SIZE: int = 100
+    SWEEP_PAGE_SIZE: int = 500
+    # 進度日誌間隔秒數
+    SWEEP_PROGRESS_INTERVAL: float = 30.0
     
     # Email settings
     SMTP_HOST: str
@@ -98,6 +251,23 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str
     EMAIL_FROM_NAME: str
     EMAIL_FROM_ADDRESS: str
+    # 連線加密：未設定時 465 埠使用隱式 TLS，其他埠在伺服器支援時自動 STARTTLS
+    SMTP_USE_TLS: Optional[bool] = None
+    SMTP_TIMEOUT: float = 30.0
+    # 保持登入狀態的 SMTP 連線數，以及每條連線寄送多少封後重新連線
+    SMTP_POOL_SIZE: int = 3
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+    
+    # Notification digest settings
+    # 用戶最早一筆未寄通知等待多久後寄出摘要信 (秒)，期間的匹配合併為同一封
+    NOTIFICATION_DIGEST_WINDOW: int = 300
+    # 單封摘要信最多列出的職缺數，達到時不等待直接寄出
+    NOTIFICATION_DIGEST_MAX_ITEMS: int = 25
+    # 每輪最多處理的用戶數與輪詢間隔 (秒)
+    NOTIFICATION_DISPATCH_BATCH_USERS: int = 200
+    NOTIFICATION_DISPATCH_INTERVAL: float = 30.0
+    # 認領後未完成寄送的通知 (例如程序中斷) 在此秒數後可再被認領
+    NOTIFICATION_CLAIM_TIMEOUT: int = 600
     
     # Google OAuth settings
     GOOGLE_CLIENT_ID: str
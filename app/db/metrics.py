@@ -0,0 +1,108 @@
+"""
+Connection pool metrics for the database engines.
+"""
+import math
+import threading
+from collections import deque
+from typing import Any, Deque, Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class PoolMetrics:
+    """
+    Collects connection pool statistics for one engine.
+    
+    Checkout wait times are recorded by the session dependency; connection events
+    (new connections, invalidations, checkout timeouts) are counted through pool events.
+    Current connection counts are read from the pool when the metrics are requested.
+    """
+    
+    def __init__(self, window: int = 1000):
+        """
+        Initialize the metrics.
+        
+        Args:
+            window: Number of recent checkout wait samples kept for percentiles.
+        """
+        self._lock = threading.Lock()
+        self._waits: Deque[float] = deque(maxlen=window)
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.connections_opened = 0
+        self.connections_invalidated = 0
+    
+    def attach(self, engine: Engine) -> None:
+        """
+        Listen to the pool events of an engine.
+        
+        Args:
+            engine: Synchronous engine (use ``AsyncEngine.sync_engine`` for async engines).
+        """
+        @event.listens_for(engine, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            with self._lock:
+                self.connections_opened += 1
+        
+        @event.listens_for(engine, "invalidate")
+        def _on_invalidate(dbapi_connection, connection_record, exception):
+            with self._lock:
+                self.connections_invalidated += 1
+    
+    def record_checkout(self, wait: float) -> None:
+        """
+        Record how long a session waited for a pooled connection.
+        
+        Args:
+            wait: Wait time in seconds.
+        """
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self._waits.append(wait)
+    
+    def record_timeout(self) -> None:
+        """
+        Record a checkout that timed out because the pool was exhausted.
+        """
+        with self._lock:
+            self.checkout_timeouts += 1
+    
+    def snapshot(self, engine: Engine) -> Dict[str, Any]:
+        """
+        Get the current pool metrics.
+        
+        Args:
+            engine: Engine the metrics belong to.
+            
+        Returns:
+            Dict[str, Any]: Connection counts and checkout wait statistics (in ms).
+        """
+        pool = engine.pool
+        with self._lock:
+            waits = sorted(self._waits)
+            checkouts = self.checkouts
+            stats = {
+                "checkouts": checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "connections_opened": self.connections_opened,
+                "connections_invalidated": self.connections_invalidated,
+                "wait_avg_ms": round(self.total_wait / checkouts * 1000, 3) if checkouts else 0.0,
+                "wait_max_ms": round(self.max_wait * 1000, 3),
+            }
+        
+        for name, quantile in (("wait_p50_ms", 0.5), ("wait_p95_ms", 0.95), ("wait_p99_ms", 0.99)):
+            # 與基準測試相同的 nearest-rank 百分位數
+            index = max(0, min(len(waits) - 1, math.ceil(quantile * len(waits)) - 1))
+            stats[name] = round(waits[index] * 1000, 3) if waits else 0.0
+        
+        # QueuePool 以外的連線池 (例如 NullPool) 沒有這些計數
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            method = getattr(pool, name, None)
+            if method is not None:
+                stats[name] = method()
+        return stats
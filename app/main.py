@@ -2,11 +2,61 @@
 Main application module for Job Alert AI.
 This module initializes the FastAPI application and includes all routers.
 """
+import logging
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
+from app.db.session import async_engine, get_pool_metrics
+from app.services.crawler.crawler_service import CrawlerService
+from app.services.crawler.queue import CrawlQueue, create_queue_session_factory
+from app.services.jobs.search import JobSearchService
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Manage process-wide resources for the lifetime of the application.
+    
+    A single crawler service (and its HTTP connection pool) is created on startup,
+    shared by all requests through dependency injection, and closed on shutdown.
+    
+    Args:
+        app: The FastAPI application instance.
+    """
+    try:
+        app.state.crawler_service = CrawlerService()
+    except ValueError as e:
+        # 缺少爬蟲 API 金鑰時仍允許應用啟動，爬蟲端點會回傳 503
+        logger.warning(f"Crawler service disabled: {str(e)}")
+        app.state.crawler_service = None
+    
+    try:
+        app.state.crawl_queue = CrawlQueue(
+            create_queue_session_factory(),
+            lease_seconds=settings.CRAWL_QUEUE_LEASE_SECONDS,
+            max_attempts=settings.CRAWL_QUEUE_MAX_ATTEMPTS,
+            retry_delay=settings.CRAWL_QUEUE_RETRY_DELAY,
+        )
+    except Exception as e:
+        # 佇列資料庫無法使用時仍允許應用啟動，佇列端點會回傳 503
+        logger.warning(f"Crawl queue disabled: {str(e)}")
+        app.state.crawl_queue = None
+    
+    app.state.job_search_service = JobSearchService()
+    
+    try:
+        yield
+    finally:
+        if app.state.crawler_service is not None:
+            await app.state.crawler_service.aclose()
+        await async_engine.dispose()
+
 
 def create_app() -> FastAPI:
     """
@@ -22,6 +72,7 @@ def create_app() -> FastAPI:
         openapi_url=f"{settings.API_V1_STR}/openapi.json",
         docs_url="/docs",
         redoc_url="/redoc",
+        lifespan=lifespan,
     )
     
     # Configure CORS
@@ -47,6 +98,11 @@ def create_app() -> FastAPI:
         """Health check endpoint"""
         return {"status": "healthy"}
     
+    @app.get("/metrics/db-pool")
+    async def db_pool_metrics():
+        """Database connection pool metrics endpoint"""
+        return get_pool_metrics()
+    
     return app
 
 
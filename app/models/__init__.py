@@ -1,3 +1,9 @@
 """
 SQLAlchemy ORM models package.
-""" 
\ No newline at end of file
+"""
+from app.models.crawl_job import CrawlJob
+from app.models.job import Job
+from app.models.notification import Notification
+from app.models.resume import Resume
+from app.models.tracked_page import TrackedPage
+from app.models.user import User
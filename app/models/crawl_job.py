@@ -0,0 +1,59 @@
+"""
+Crawl job queue model.
+"""
+import uuid
+
+from sqlalchemy import JSON, Boolean, Column, DateTime, Index, Integer, String, Text, Uuid, func
+
+from app.db.base import Base
+
+# 工作狀態
+CRAWL_JOB_QUEUED = "queued"
+CRAWL_JOB_RUNNING = "running"
+CRAWL_JOB_SUCCEEDED = "succeeded"
+CRAWL_JOB_FAILED = "failed"
+CRAWL_JOB_ACTIVE_STATUSES = (CRAWL_JOB_QUEUED, CRAWL_JOB_RUNNING)
+
+
+class CrawlJob(Base):
+    """
+    Durable crawl request, claimed and executed by crawl workers.
+    """
+    __tablename__ = "crawl_jobs"
+    
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    # 佇列可能位於獨立的資料庫 (例如本機 SQLite)，因此不建立外鍵
+    tracked_page_id = Column(Uuid, nullable=True)
+    url = Column(String(2048), nullable=False)
+    company_name = Column(String(255), nullable=True)
+    append_positions_tag = Column(Boolean, nullable=False, default=False)
+    force_refresh = Column(Boolean, nullable=False, default=False)
+    
+    status = Column(String(16), nullable=False, default=CRAWL_JOB_QUEUED)
+    priority = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    # 最早可被領取的時間 (重試退避)
+    available_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # worker 租約到期時間，逾期的 running 工作可被重新領取
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    worker_id = Column(String(255), nullable=True)
+    
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        Index("ix_crawl_jobs_claim", "status", "available_at", "priority"),
+        # 同一追蹤頁面同時只允許一個進行中的工作
+        Index(
+            "uq_crawl_jobs_active_page",
+            "tracked_page_id",
+            unique=True,
+            postgresql_where=status.in_(CRAWL_JOB_ACTIVE_STATUSES),
+            sqlite_where=status.in_(CRAWL_JOB_ACTIVE_STATUSES),
+        ),
+    )
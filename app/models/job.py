@@ -0,0 +1,98 @@
+"""
+Job posting model.
+"""
+import uuid
+
+from sqlalchemy import (
+    DDL, JSON, Column, DateTime, ForeignKey, Index, SmallInteger, String, Text, UniqueConstraint, Uuid, event, func,
+    literal_column,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.db.base import Base
+
+# 職缺狀態
+JOB_STATUS_NEW = "new"
+JOB_STATUS_SEEN = "seen"
+JOB_STATUS_NOTIFIED = "notified"
+JOB_STATUSES = (JOB_STATUS_NEW, JOB_STATUS_SEEN, JOB_STATUS_NOTIFIED)
+
+# 全文檢索設定；常數以字面值輸出，查詢運算式才能與索引運算式完全相同而使用索引
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+
+
+def job_search_vector(job_title, job_description):
+    """
+    Build the weighted ``tsvector`` expression of a job (title weighted above description).
+    
+    The GIN index and the search queries must use this exact expression.
+    
+    Args:
+        job_title: Title column.
+        job_description: Description column.
+        
+    Returns:
+        SQL expression of type ``tsvector``.
+    """
+    title = func.setweight(
+        func.to_tsvector(SEARCH_CONFIG, func.coalesce(job_title, literal_column("''"))), literal_column("'A'")
+    )
+    description = func.setweight(
+        func.to_tsvector(SEARCH_CONFIG, func.coalesce(job_description, literal_column("''"))), literal_column("'B'")
+    )
+    return title.op("||")(description)
+
+
+class Job(Base):
+    """
+    Job posting found on a tracked career page.
+    """
+    __tablename__ = "jobs"
+    
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    tracked_page_id = Column(Uuid, ForeignKey("tracked_pages.id", ondelete="CASCADE"), nullable=False)
+    job_title = Column(String(512), nullable=False)
+    job_url = Column(String(2048), nullable=False)
+    job_description = Column(Text, nullable=True)
+    location = Column(String(255), nullable=True)
+    department = Column(String(255), nullable=True)
+    # 技能 ID (見 app.services.matching.skills.SKILL_DICTIONARY)
+    # PostgreSQL 使用原生 smallint 陣列，其他資料庫 (測試用 SQLite) 以 JSON 儲存
+    extracted_skills = Column(JSON().with_variant(ARRAY(SmallInteger), "postgresql"), nullable=True)
+    status = Column(String(16), nullable=False, default=JOB_STATUS_NEW)
+    first_seen = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        # 同一追蹤頁面的職缺以標準網址去重 (批次 upsert 的衝突目標)
+        UniqueConstraint("tracked_page_id", "job_url", name="uq_jobs_page_url"),
+        # 列表以 (first_seen, id) 做 keyset 分頁，每個篩選條件各有一個以排序鍵結尾的複合索引
+        Index("ix_jobs_first_seen_id", "first_seen", "id"),
+        Index("ix_jobs_page_first_seen_id", "tracked_page_id", "first_seen", "id"),
+        Index("ix_jobs_status_first_seen_id", "status", "first_seen", "id"),
+        Index("ix_jobs_location_first_seen_id", "location", "first_seen", "id"),
+        Index("ix_jobs_department_first_seen_id", "department", "first_seen", "id"),
+        # 全文檢索與職稱模糊比對 (僅 PostgreSQL，SQLite 使用程序內索引)
+        Index(
+            "ix_jobs_search_vector",
+            job_search_vector(job_title, job_description),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+        # 依技能查詢職缺 (陣列 && / @> 運算子)
+        Index("ix_jobs_extracted_skills", "extracted_skills", postgresql_using="gin").ddl_if(dialect="postgresql"),
+        Index(
+            "ix_jobs_title_trgm",
+            job_title,
+            postgresql_using="gin",
+            postgresql_ops={"job_title": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+# 建立資料表前先啟用 pg_trgm 擴充套件
+event.listen(
+    Job.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
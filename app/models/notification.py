@@ -0,0 +1,39 @@
+"""
+Notification model.
+"""
+import uuid
+
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Index, UniqueConstraint, Uuid, func
+
+from app.db.base import Base
+
+
+class Notification(Base):
+    """
+    Job match to notify a user about; sent by email in per-user digests.
+    """
+    __tablename__ = "notifications"
+    
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    job_id = Column(Uuid, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False)
+    match_score = Column(Float, nullable=False)
+    email_sent = Column(Boolean, nullable=False, default=False)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    # 寄送程序認領通知的時間；寄送期間不持有資料列鎖，逾時未完成的認領可被重新認領
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    
+    __table_args__ = (
+        # 同一職缺只通知用戶一次
+        UniqueConstraint("user_id", "job_id", name="uq_notifications_user_job"),
+        Index("ix_notifications_user_created_at", "user_id", "created_at"),
+        # 寄送程序只掃描尚未寄出的通知
+        Index(
+            "ix_notifications_pending",
+            "user_id",
+            "created_at",
+            postgresql_where=email_sent.is_(False),
+            sqlite_where=email_sent.is_(False),
+        ),
+    )
@@ -0,0 +1,28 @@
+"""
+Resume model.
+"""
+import uuid
+
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, SmallInteger, String, Text, Uuid, func
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.db.base import Base
+
+
+class Resume(Base):
+    """
+    Processed resume of a user.
+    """
+    __tablename__ = "resumes"
+    
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    # 經過處理的履歷內容
+    content = Column(Text, nullable=False)
+    skills = Column(JSON().with_variant(ARRAY(String), "postgresql"), nullable=True)
+    # 從履歷內容與技能擷取的技能 ID (見 app.services.matching.skills.SKILL_DICTIONARY)
+    skill_ids = Column(JSON().with_variant(ARRAY(SmallInteger), "postgresql"), nullable=True)
+    experience = Column(JSON, nullable=True)
+    education = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
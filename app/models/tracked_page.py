@@ -0,0 +1,32 @@
+"""
+Tracked career page model.
+"""
+import uuid
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, String, Uuid, func
+
+from app.db.base import Base
+
+
+class TrackedPage(Base):
+    """
+    Career page a user tracks for new job postings.
+    """
+    __tablename__ = "tracked_pages"
+    
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    url = Column(String(2048), nullable=False)
+    company_name = Column(String(255), nullable=True)
+    # daily / weekly
+    check_frequency = Column(String(16), nullable=False, default="daily")
+    last_checked = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        # 排程器依頻率與上次檢查時間找出到期頁面
+        Index("ix_tracked_pages_due", "check_frequency", "last_checked"),
+        # 職缺列表依公司篩選時透過追蹤頁面關聯
+        Index("ix_tracked_pages_company_name", "company_name"),
+    )
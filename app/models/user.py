@@ -0,0 +1,23 @@
+"""
+User model.
+"""
+import uuid
+
+from sqlalchemy import Boolean, Column, DateTime, String, Uuid, func
+
+from app.db.base import Base
+
+
+class User(Base):
+    """
+    Application user, authenticated through Google OAuth.
+    """
+    __tablename__ = "users"
+    
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    email = Column(String(255), unique=True, nullable=False, index=True)
+    full_name = Column(String(255), nullable=True)
+    google_id = Column(String(255), unique=True, nullable=True)
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
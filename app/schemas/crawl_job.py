@@ -0,0 +1,39 @@
+"""
+Crawl job schemas.
+"""
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class CrawlJobRead(BaseModel):
+    """
+    Crawl job status as returned by the queue and the API.
+    """
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: uuid.UUID
+    tracked_page_id: Optional[uuid.UUID] = None
+    url: str
+    company_name: Optional[str] = None
+    append_positions_tag: bool = False
+    force_refresh: bool = False
+    status: str
+    attempts: int
+    max_attempts: int
+    worker_id: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class CrawlJobCreated(BaseModel):
+    """
+    Response returned when a crawl job is enqueued.
+    """
+    job_id: uuid.UUID
+    status: str
@@ -0,0 +1,54 @@
+"""
+Job posting schemas.
+"""
+import uuid
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class JobRead(BaseModel):
+    """
+    Job posting as returned by the API.
+    """
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: uuid.UUID
+    tracked_page_id: uuid.UUID
+    company_name: Optional[str] = None
+    job_title: str
+    job_url: str
+    job_description: Optional[str] = None
+    location: Optional[str] = None
+    department: Optional[str] = None
+    extracted_skills: Optional[List[int]] = Field(None, description="Skill IDs found in the posting")
+    skills: List[str] = Field(default_factory=list, description="Names of the extracted skills")
+    status: str
+    first_seen: datetime
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class JobListResponse(BaseModel):
+    """
+    One page of a keyset-paginated job listing.
+    """
+    items: List[JobRead]
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, None on the last page")
+    limit: int
+
+
+class JobSearchResult(JobRead):
+    """
+    Job posting returned by a search, with its relevance score.
+    """
+    score: float
+
+
+class JobSearchResponse(BaseModel):
+    """
+    Ranked job search results.
+    """
+    query: str
+    items: List[JobSearchResult]
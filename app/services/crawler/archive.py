@@ -0,0 +1,267 @@
+"""
+Append-only, compressed archive of raw crawler provider responses.
+"""
+import asyncio
+import glob
+import gzip
+import logging
+import os
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.utils.urls import canonicalize_url, normalize_url
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = "responses-"
+SEGMENT_SUFFIX = ".jsonl.gz"
+
+# 單次寫入最多合併的紀錄數 (每次寫入為一個 gzip member)
+_WRITE_BATCH_SIZE = 256
+
+
+class ArchivedResponse(BaseModel):
+    """
+    A raw provider response with what is needed to parse it again.
+    """
+    archived_at: datetime
+    provider: str
+    # "extract" 為單一頁面，"batch" 為多頁面批次請求
+    kind: str = "extract"
+    url: str
+    urls: List[str] = Field(default_factory=list)
+    # 提取 prompt 與 schema 的雜湊值，用於辨識以舊版設定取得的回應
+    schema_hash: Optional[str] = None
+    # 呼叫者指定的公司名稱；未指定時重新解析會再從網址推斷
+    company_name: Optional[str] = None
+    payload: Any = None
+
+
+class ResponseArchive:
+    """
+    Write raw provider responses to size-rotated gzip JSONL segments.
+    
+    ``record`` only enqueues the response, so it never blocks the event loop; a
+    background task serializes, compresses and appends queued responses in a worker
+    thread. Each write is a separate gzip member, so segments are valid gzip files
+    after every write and a crash loses at most the write in progress. When the
+    queue is full new responses are dropped and counted rather than slowing down
+    the crawl.
+    """
+    
+    def __init__(self, directory: str, max_file_bytes: int, max_files: int = 0,
+                 queue_size: int = 1000, compresslevel: int = 6):
+        """
+        Initialize the archive.
+        
+        Args:
+            directory: Directory holding the archive segments.
+            max_file_bytes: Compressed size at which a new segment is started.
+            max_files: Number of segments of this process (plus those left by exited
+                       processes) to keep, oldest deleted first; 0 keeps all.
+            queue_size: Maximum number of responses waiting to be written.
+            compresslevel: gzip compression level.
+        """
+        self.directory = directory
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self.compresslevel = compresslevel
+        
+        self._queue: "asyncio.Queue[ArchivedResponse]" = asyncio.Queue(maxsize=queue_size)
+        self._writer: Optional[asyncio.Task] = None
+        self._path: Optional[str] = None
+        self._size = 0
+        self._stats = {"recorded": 0, "written": 0, "dropped": 0, "failed": 0, "bytes": 0, "segments": 0}
+    
+    def record(self, provider: str, url: str, payload: Any, schema_hash: Optional[str] = None,
+               urls: Optional[List[str]] = None, company_name: Optional[str] = None) -> None:
+        """
+        Queue a raw response for archiving.
+        
+        Args:
+            provider: Name of the provider that returned the response.
+            url: Requested career page URL (first URL for batch requests).
+            payload: Decoded response body.
+            schema_hash: Hash of the extraction options the response was produced with.
+            urls: All requested URLs for a batch request.
+            company_name: Company name given by the caller, if any.
+        """
+        record = ArchivedResponse(
+            archived_at=datetime.now(timezone.utc),
+            provider=provider,
+            kind="batch" if urls else "extract",
+            url=url,
+            urls=list(urls or []),
+            schema_hash=schema_hash,
+            company_name=company_name,
+            payload=payload,
+        )
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self._stats["dropped"] += 1
+            logger.warning(f"Response archive queue full, dropping {provider} response for {url}")
+            return
+        
+        self._stats["recorded"] += 1
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._run())
+    
+    async def flush(self) -> None:
+        """
+        Wait until every queued response has been written.
+        """
+        if self._writer is not None and not self._writer.done():
+            await self._queue.join()
+    
+    async def aclose(self) -> None:
+        """
+        Write the remaining responses and stop the background writer.
+        """
+        await self.flush()
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get archive counters.
+        """
+        return {**self._stats, "queued": self._queue.qsize(), "segment": self._path}
+    
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < _WRITE_BATCH_SIZE and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._write, batch)
+                self._stats["written"] += len(batch)
+            except Exception as e:
+                self._stats["failed"] += len(batch)
+                logger.error(f"Failed to archive {len(batch)} provider responses: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    def _write(self, batch: List[ArchivedResponse]) -> None:
+        lines = "".join(record.model_dump_json() + "\n" for record in batch)
+        data = gzip.compress(lines.encode("utf-8"), compresslevel=self.compresslevel)
+        
+        if self._path is None or (self._size and self._size + len(data) > self.max_file_bytes):
+            self._rotate()
+        with open(self._path, "ab") as f:
+            f.write(data)
+        self._size += len(data)
+        self._stats["bytes"] += len(data)
+    
+    def _rotate(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        # 檔名以時間開頭，字典序即為時間順序；加上 PID 避免多個 worker 寫入同一檔案
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        self._path = os.path.join(self.directory, f"{SEGMENT_PREFIX}{timestamp}-{os.getpid()}{SEGMENT_SUFFIX}")
+        self._size = 0
+        self._stats["segments"] += 1
+        logger.info(f"Started response archive segment {self._path}")
+        
+        if self.max_files > 0:
+            # 只清除本程序與已結束程序的檔案，其他 worker 程序可能仍在寫入自己的檔案；
+            # 新檔案在第一次寫入時才建立，因此只保留 max_files - 1 個既有檔案
+            segments = [path for path in list_segments(self.directory) if _segment_prunable(path)]
+            for path in segments[:max(0, len(segments) - self.max_files + 1)]:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning(f"Failed to remove old archive segment {path}: {str(e)}")
+
+
+def _segment_pid(path: str) -> Optional[int]:
+    # 檔名格式為 responses-{時間}-{PID}.jsonl.gz
+    name = os.path.basename(path)[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]
+    try:
+        return int(name.rsplit("-", 1)[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def _segment_prunable(path: str) -> bool:
+    pid = _segment_pid(path)
+    if pid is None or pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        # 程序存在但屬於其他使用者
+        return False
+    return False
+
+
+def list_segments(directory: str) -> List[str]:
+    """
+    List the archive segments of a directory, oldest first.
+    
+    Args:
+        directory: Archive directory.
+    
+    Returns:
+        List[str]: Segment paths.
+    """
+    return sorted(glob.glob(os.path.join(directory, f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}")))
+
+
+def iter_archived_responses(directory: str, provider: Optional[str] = None, url: Optional[str] = None,
+                            since: Optional[datetime] = None,
+                            schema_hash: Optional[str] = None) -> Iterator[ArchivedResponse]:
+    """
+    Read archived responses in the order they were written.
+    
+    A segment truncated by a crash is read up to the last complete write; undecodable
+    lines are skipped.
+    
+    Args:
+        directory: Archive directory.
+        provider: Only responses of this provider.
+        url: Only responses for this career page (compared canonically, including batch members).
+        since: Only responses archived at or after this time.
+        schema_hash: Only responses produced with these extraction options.
+    
+    Returns:
+        Iterator[ArchivedResponse]: Matching archived responses.
+    """
+    url_key = (canonicalize_url(url) or normalize_url(url)) if url else None
+    if since is not None and since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    
+    for path in list_segments(directory):
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = ArchivedResponse.model_validate_json(line)
+                    except ValueError:
+                        logger.warning(f"Skipping undecodable archive line in {path}")
+                        continue
+                    
+                    if provider is not None and record.provider != provider:
+                        continue
+                    if since is not None and record.archived_at < since:
+                        continue
+                    if schema_hash is not None and record.schema_hash != schema_hash:
+                        continue
+                    if url_key is not None and url_key not in {
+                        canonicalize_url(u) or normalize_url(u) for u in [record.url, *record.urls]
+                    }:
+                        continue
+                    yield record
+        except (EOFError, OSError, zlib.error) as e:
+            logger.warning(f"Archive segment {path} is truncated or corrupt, read up to the error: {str(e)}")
@@ -0,0 +1,259 @@
+"""
+Common interface and errors for crawler providers.
+"""
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+
+import httpx
+from fastapi import HTTPException
+
+from app.services.crawler.archive import ArchivedResponse, ResponseArchive
+from app.services.crawler.models import JobPosting, JobPostingsResponse
+from app.utils.urls import canonicalize_job_url, job_url_key
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+# 可重試的上游 HTTP 狀態碼
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class ProviderError(HTTPException):
+    """
+    Error raised by a crawler provider.
+    
+    It is an HTTPException, so endpoints can surface it directly, and also keeps the
+    upstream status code and Retry-After hint for the router and retry logic.
+    """
+    
+    def __init__(self, provider: str, status_code: int, detail: str,
+                 upstream_status: Optional[int] = None, retry_after: Optional[float] = None,
+                 retryable: bool = False):
+        headers = {"Retry-After": str(int(retry_after))} if retry_after is not None else None
+        super().__init__(status_code=status_code, detail=detail, headers=headers)
+        self.provider = provider
+        self.upstream_status = upstream_status
+        self.retry_after = retry_after
+        self.retryable = retryable
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header given in seconds or as an HTTP date.
+    
+    Args:
+        value: Header value.
+        
+    Returns:
+        Optional[float]: Delay in seconds, or None if absent or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def provider_error_from_exception(provider: str, url: str, error: Exception) -> ProviderError:
+    """
+    Translate a low-level exception into a ProviderError.
+    
+    Args:
+        provider: Name of the provider that failed.
+        url: URL being extracted.
+        error: Original exception.
+        
+    Returns:
+        ProviderError: Error with status code, upstream status and retry hints.
+    """
+    if isinstance(error, ProviderError):
+        return error
+    if isinstance(error, (TimeoutError, httpx.TimeoutException)):
+        return ProviderError(
+            provider, 504, f"Timed out extracting job postings from {url}", retryable=True
+        )
+    if isinstance(error, httpx.HTTPStatusError):
+        upstream_status = error.response.status_code
+        return ProviderError(
+            provider,
+            502,
+            f"Failed to extract job postings: {provider} returned HTTP {upstream_status}",
+            upstream_status=upstream_status,
+            retry_after=parse_retry_after(error.response.headers.get("Retry-After")),
+            retryable=upstream_status in RETRYABLE_STATUS_CODES,
+        )
+    if isinstance(error, httpx.TransportError):
+        return ProviderError(
+            provider, 502, f"Failed to extract job postings: {str(error)}", retryable=True
+        )
+    return ProviderError(provider, 500, f"Failed to extract job postings: {str(error)}")
+
+
+# 公司職缺板架設於 ATS 網域時，公司名稱在路徑的第一段 (例如 jobs.lever.co/<company>)
+_HOSTED_BOARD_DOMAINS = (
+    "boards.greenhouse.io",
+    "job-boards.greenhouse.io",
+    "jobs.lever.co",
+    "jobs.eu.lever.co",
+    "jobs.ashbyhq.com",
+    "apply.workable.com",
+)
+
+
+def extract_company_from_url(url: str) -> str:
+    """
+    Extract company name from URL domain, or from the board name for ATS hosted job boards.
+    
+    Args:
+        url: The URL to extract company name from.
+        
+    Returns:
+        str: Extracted company name.
+    """
+    try:
+        # 從 URL 中提取域名
+        domain = url.split("//")[-1].split("/")[0]
+        
+        # 移除 www. 前綴和頂級域名
+        parts = domain.split(".")
+        if parts[0] == "www":
+            parts = parts[1:]
+        
+        if ".".join(parts).lower() in _HOSTED_BOARD_DOMAINS:
+            path = url.split("//")[-1].split("?")[0].split("#")[0].split("/")[1:]
+            board = next((segment for segment in path if segment and segment != "embed"), None)
+            if board:
+                return board.replace("-", " ").replace("_", " ").title()
+        
+        # 取出可能的公司名稱部分
+        company = parts[0]
+        
+        # 將首字母大寫
+        return company.capitalize()
+        
+    except Exception as e:
+        logger.warning(f"Failed to extract company name from URL {url}: {str(e)}")
+        return "Unknown"
+
+
+def canonicalize_job_postings(postings: List[JobPosting], page_url: str) -> List[JobPosting]:
+    """
+    Rewrite posting URLs to their canonical form and drop repeated postings.
+    
+    The same posting is often listed several times on a page (or under different
+    tracking links). Postings whose canonical URL was already seen are merged into the
+    first one, filling fields it is missing. Postings without a usable URL are kept
+    with an empty URL, so the diff falls back to their title.
+    
+    Args:
+        postings: Postings as returned by the provider.
+        page_url: URL of the career page, used to resolve relative links.
+        
+    Returns:
+        List[JobPosting]: Postings in page order, one per canonical URL.
+    """
+    seen: Dict[str, JobPosting] = {}
+    result: List[JobPosting] = []
+    for posting in postings:
+        url = canonicalize_job_url(posting.url, page_url)
+        if url is None:
+            posting.url = ""
+            result.append(posting)
+            continue
+        
+        # 有無 www. 的連結視為同一職缺
+        key = job_url_key(url)
+        first = seen.get(key)
+        if first is None:
+            posting.url = url
+            seen[key] = posting
+            result.append(posting)
+            continue
+        
+        # 重複的職缺補齊第一筆缺少的欄位
+        for field in ("description", "location", "department"):
+            if not getattr(first, field) and getattr(posting, field):
+                setattr(first, field, getattr(posting, field))
+    
+    if len(result) < len(postings):
+        logger.debug(f"Merged {len(postings) - len(result)} duplicate job postings on {page_url}")
+    return result
+
+
+class CrawlerProvider(ABC):
+    """
+    Asynchronous job posting extraction backend.
+    """
+    
+    # 服務名稱與相對成本 (用於路由排序)
+    name: str = "provider"
+    cost: float = 1.0
+    # 原始回應封存 (未設定則不封存)
+    archive: Optional[ResponseArchive] = None
+    
+    @abstractmethod
+    async def extract_job_postings(self, url: str, company_name: Optional[str] = None,
+                                   append_positions_tag: bool = False,
+                                   timeout: Optional[float] = None) -> JobPostingsResponse:
+        """
+        Extract job postings from a career page.
+        
+        Args:
+            url: URL of the career page.
+            company_name: Name of the company. If not provided, will be extracted from the URL.
+            append_positions_tag: If True, append "#positions" to the URL.
+            timeout: Timeout in seconds for the whole extraction.
+            
+        Returns:
+            JobPostingsResponse: Extracted job postings.
+            
+        Raises:
+            ProviderError: If the extraction fails.
+        """
+    
+    async def aclose(self) -> None:
+        """
+        Release resources held by the provider.
+        """
+    
+    @classmethod
+    def parse_archived(cls, record: ArchivedResponse) -> Dict[str, JobPostingsResponse]:
+        """
+        Convert an archived raw response into job postings again, without calling the provider.
+        
+        Args:
+            record: Archived response of this provider.
+            
+        Returns:
+            Dict[str, JobPostingsResponse]: Results keyed by the requested page URL.
+            
+        Raises:
+            NotImplementedError: If the provider does not archive its responses.
+        """
+        raise NotImplementedError(f"{cls.name} responses cannot be replayed")
+    
+    def _archive_response(self, url: str, payload: object, schema_hash: Optional[str] = None,
+                          urls: Optional[List[str]] = None, company_name: Optional[str] = None) -> None:
+        """
+        Queue a raw response for the archive, if one is configured.
+        """
+        if self.archive is not None:
+            self.archive.record(self.name, url, payload, schema_hash=schema_hash, urls=urls,
+                                company_name=company_name)
+    
+    def _extract_company_from_url(self, url: str) -> str:
+        """
+        Extract company name from URL domain.
+        """
+        return extract_company_from_url(url)
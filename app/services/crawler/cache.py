@@ -0,0 +1,233 @@
+"""
+Extraction cache with an in-memory LRU tier and an optional SQLite tier.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.utils.urls import canonicalize_url, normalize_url
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+# 持久層清除過期項目的間隔秒數
+_PRUNE_INTERVAL_SECONDS = 300.0
+
+
+def make_cache_key(url: str, options_hash: str, **params: Any) -> str:
+    """
+    Build a content-addressed cache key.
+    
+    Args:
+        url: Requested URL, canonicalized before hashing.
+        options_hash: Hash of the extraction prompt and schema.
+        **params: Extra request parameters that change the result.
+        
+    Returns:
+        str: Hex digest identifying the cache entry.
+    """
+    material = json.dumps(
+        {"url": canonicalize_url(url) or normalize_url(url), "options": options_hash, "params": params},
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    """
+    Two-tier cache for serialized extraction results.
+    
+    The memory tier is an LRU bounded by the total UTF-8 size of the payloads. The optional SQLite
+    tier survives restarts; hits from it are promoted into memory. Every entry carries
+    its own expiry time.
+    """
+    
+    def __init__(self, ttl_seconds: float, max_memory_bytes: int, sqlite_path: Optional[str] = None):
+        """
+        Initialize the cache.
+        
+        Args:
+            ttl_seconds: Default time-to-live for new entries.
+            max_memory_bytes: Upper bound for payload bytes (UTF-8) kept in memory.
+            sqlite_path: Path of the SQLite database for the persistent tier, or None to disable it.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_bytes = max_memory_bytes
+        
+        # 鍵 -> (到期時間, 內容, UTF-8 位元組數)
+        self._memory: "OrderedDict[str, Tuple[float, str, int]]" = OrderedDict()
+        self._memory_bytes = 0
+        
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "sets": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+        
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._last_prune = 0.0
+        if sqlite_path:
+            os.makedirs(os.path.dirname(sqlite_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, payload TEXT NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS ix_cache_entries_expires_at ON cache_entries (expires_at)"
+            )
+            self._db.commit()
+            logger.info(f"Extraction cache persistent tier enabled at {sqlite_path}")
+    
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached payload.
+        
+        Args:
+            key: Cache key.
+            
+        Returns:
+            Optional[str]: The cached payload, or None on a miss or expired entry.
+        """
+        now = time.time()
+        
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, payload, _ = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self._stats["hits"] += 1
+                self._stats["memory_hits"] += 1
+                return payload
+            self._evict(key)
+            self._stats["expirations"] += 1
+        
+        if self._db is not None:
+            row = await asyncio.to_thread(self._db_get, key)
+            if row is not None:
+                expires_at, payload = row
+                if expires_at > now:
+                    self._remember(key, expires_at, payload)
+                    self._stats["hits"] += 1
+                    self._stats["disk_hits"] += 1
+                    return payload
+                await asyncio.to_thread(self._db_delete, key)
+                self._stats["expirations"] += 1
+        
+        self._stats["misses"] += 1
+        return None
+    
+    async def set(self, key: str, payload: str, ttl_seconds: Optional[float] = None) -> None:
+        """
+        Store a payload.
+        
+        Args:
+            key: Cache key.
+            payload: Serialized value.
+            ttl_seconds: Time-to-live for this entry, defaults to the cache TTL.
+        """
+        expires_at = time.time() + (ttl_seconds if ttl_seconds is not None else self.ttl_seconds)
+        self._remember(key, expires_at, payload)
+        self._stats["sets"] += 1
+        
+        if self._db is not None:
+            await asyncio.to_thread(self._db_set, key, expires_at, payload)
+    
+    async def invalidate(self, key: str) -> None:
+        """
+        Remove an entry from both tiers.
+        
+        Args:
+            key: Cache key.
+        """
+        if key in self._memory:
+            self._evict(key)
+        if self._db is not None:
+            await asyncio.to_thread(self._db_delete, key)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters and memory usage.
+        
+        Returns:
+            Dict[str, Any]: Cache metrics.
+        """
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "max_memory_bytes": self.max_memory_bytes,
+            "persistent": self._db is not None,
+        }
+    
+    async def aclose(self) -> None:
+        """
+        Close the persistent tier.
+        """
+        if self._db is not None:
+            db, self._db = self._db, None
+            await asyncio.to_thread(db.close)
+    
+    def _remember(self, key: str, expires_at: float, payload: str) -> None:
+        """
+        Insert an entry into the memory tier, evicting least recently used entries.
+        """
+        size = len(payload.encode("utf-8"))
+        if key in self._memory:
+            self._evict(key)
+        if size > self.max_memory_bytes:
+            return
+        
+        self._memory[key] = (expires_at, payload, size)
+        self._memory_bytes += size
+        
+        while self._memory_bytes > self.max_memory_bytes:
+            oldest = next(iter(self._memory))
+            self._evict(oldest)
+            self._stats["evictions"] += 1
+    
+    def _evict(self, key: str) -> None:
+        """
+        Remove an entry from the memory tier.
+        """
+        _, _, size = self._memory.pop(key)
+        self._memory_bytes -= size
+    
+    def _db_get(self, key: str) -> Optional[Tuple[float, str]]:
+        with self._db_lock:
+            return self._db.execute(
+                "SELECT expires_at, payload FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+    
+    def _db_set(self, key: str, expires_at: float, payload: str) -> None:
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, expires_at, payload) VALUES (?, ?, ?)",
+                (key, expires_at, payload),
+            )
+            # 定期清除過期項目，避免資料庫無限成長
+            now = time.time()
+            if now - self._last_prune >= _PRUNE_INTERVAL_SECONDS:
+                self._db.execute("DELETE FROM cache_entries WHERE expires_at < ?", (now,))
+                self._last_prune = now
+            self._db.commit()
+    
+    def _db_delete(self, key: str) -> None:
+        with self._db_lock:
+            self._db.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            self._db.commit()
@@ -1,10 +1,30 @@
 """
 Crawler service factory for job posting extraction.
 """
+import asyncio
 import logging
 from typing import Dict, List, Optional
 
-from app.services.crawler.firecrawl import FirecrawlService, JobPostingsResponse
+import httpx
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.services.crawler.archive import ResponseArchive
+from app.services.crawler.cache import ExtractionCache, make_cache_key
+from app.services.crawler.diff import JobPostingsDiff
+from app.services.crawler.enrichment import JobEnricher
+from app.services.crawler.extractors.registry import ExtractorRegistry, create_default_registry
+from app.services.crawler.fingerprint import ChangeCheck, ChangeDetector
+from app.services.crawler.base import CrawlerProvider, extract_company_from_url
+from app.services.crawler.firecrawl import EXTRACT_OPTIONS_HASH, FirecrawlService
+from app.services.crawler.http_client import create_http_client
+from app.services.crawler.jina import JinaReaderService
+from app.services.crawler.models import BatchJobPostingsResponse, JobPostingsResponse
+from app.services.crawler.ratelimit import PolitenessScheduler
+from app.services.crawler.router import ProviderRouter
+from app.services.crawler.singleflight import SingleFlight
+from app.services.crawler.snapshots import SnapshotStore, diff_snapshots
+from app.utils.urls import canonicalize_url, normalize_url
 
 # 設置日誌記錄器
 logger = logging.getLogger(__name__)
@@ -15,44 +35,585 @@ class CrawlerService:
     Factory service for crawling job postings from various sources.
     """
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
         """
         Initialize the crawler service with required dependencies.
+        
+        The service is intended to be created once per process (see the application
+        lifespan) so that its HTTP connection pool is shared across requests.
+        
+        Args:
+            http_client: Shared HTTP client. If not provided, a pooled client is created
+                         and owned by this service.
+            
+        Raises:
+            ValueError: If no crawler provider is configured.
         """
-        # 初始化 FireCrawl 服務
-        self.firecrawl = FirecrawlService()
+        self._owns_http_client = http_client is None
+        self.http_client = http_client or create_http_client()
+        
+        # 爬蟲服務原始回應的封存 (供重新解析)
+        self.archive: Optional[ResponseArchive] = None
+        if settings.RESPONSE_ARCHIVE_ENABLED:
+            self.archive = ResponseArchive(
+                directory=settings.RESPONSE_ARCHIVE_DIR,
+                max_file_bytes=settings.RESPONSE_ARCHIVE_MAX_FILE_MB * 1024 * 1024,
+                max_files=settings.RESPONSE_ARCHIVE_MAX_FILES,
+                queue_size=settings.RESPONSE_ARCHIVE_QUEUE_SIZE,
+            )
+        
+        # 初始化可用的爬蟲服務 (共用連線池)，缺少金鑰的服務略過
+        providers: List[CrawlerProvider] = []
+        self.jina: Optional[JinaReaderService] = None
+        self.firecrawl: Optional[FirecrawlService] = None
+        try:
+            self.jina = JinaReaderService(client=self.http_client, archive=self.archive)
+            providers.append(self.jina)
+        except ValueError as e:
+            logger.warning(f"Jina Reader disabled: {str(e)}")
+        try:
+            self.firecrawl = FirecrawlService(client=self.http_client, archive=self.archive)
+            providers.append(self.firecrawl)
+        except ValueError as e:
+            logger.warning(f"FireCrawl disabled: {str(e)}")
+        
+        if not providers:
+            raise ValueError("No crawler provider is configured (set JINA_AI_API_KEY or FIRECRAWL_API_KEY)")
+        
+        # 提取結果依服務而異：快取鍵包含設定的服務順序，備援服務的結果只短暫快取
+        self._provider_order = [provider.name for provider in sorted(providers, key=lambda provider: provider.cost)]
+        
+        # 每個目標網域與爬蟲服務的速率限制 (含重試與退避)
+        self.scheduler = PolitenessScheduler(
+            domain_rate=settings.CRAWLER_DOMAIN_RATE_LIMIT,
+            domain_burst=settings.CRAWLER_DOMAIN_BURST,
+            provider_limits={
+                "jina": (settings.JINA_RATE_LIMIT, settings.JINA_RATE_BURST),
+                "firecrawl": (settings.FIRECRAWL_RATE_LIMIT, settings.FIRECRAWL_RATE_BURST),
+            },
+            max_retries=settings.CRAWLER_MAX_RETRIES,
+            retry_base_delay=settings.CRAWLER_RETRY_BASE_DELAY,
+            retry_max_delay=settings.CRAWLER_RETRY_MAX_DELAY,
+        )
+        
+        self.router = ProviderRouter(
+            providers,
+            alpha=settings.CRAWLER_PROVIDER_EWMA_ALPHA,
+            degraded_error_rate=settings.CRAWLER_PROVIDER_DEGRADED_ERROR_RATE,
+            degraded_latency=settings.CRAWLER_PROVIDER_DEGRADED_LATENCY,
+            failure_threshold=settings.CRAWLER_PROVIDER_FAILURE_THRESHOLD,
+            cooldown=settings.CRAWLER_PROVIDER_COOLDOWN,
+            hedge_delay=settings.CRAWLER_HEDGE_DELAY,
+            scheduler=self.scheduler,
+        )
+        
+        # 全域批次併發上限 (跨所有批次請求共用)
+        self._batch_semaphore = asyncio.Semaphore(settings.CRAWLER_BATCH_CONCURRENCY)
+        
+        # 提取結果快取：同一頁面在 TTL 內只付費提取一次
+        self.cache: Optional[ExtractionCache] = None
+        if settings.EXTRACTION_CACHE_ENABLED:
+            self.cache = ExtractionCache(
+                ttl_seconds=settings.EXTRACTION_CACHE_TTL_SECONDS,
+                max_memory_bytes=settings.EXTRACTION_CACHE_MAX_MEMORY_MB * 1024 * 1024,
+                sqlite_path=settings.EXTRACTION_CACHE_SQLITE_PATH,
+            )
+        
+        # 變更偵測：頁面未變更時跳過 LLM 提取
+        self._fingerprint_store: Optional[ExtractionCache] = None
+        self.change_detector: Optional[ChangeDetector] = None
+        if settings.CHANGE_DETECTION_ENABLED:
+            self._fingerprint_store = ExtractionCache(
+                ttl_seconds=settings.CHANGE_DETECTION_MAX_AGE_SECONDS,
+                max_memory_bytes=settings.CHANGE_DETECTION_MAX_MEMORY_MB * 1024 * 1024,
+                sqlite_path=settings.CHANGE_DETECTION_SQLITE_PATH,
+            )
+            self.change_detector = ChangeDetector(
+                client=self.http_client,
+                store=self._fingerprint_store,
+                simhash_threshold=settings.CHANGE_DETECTION_SIMHASH_THRESHOLD,
+                min_content_length=settings.CHANGE_DETECTION_MIN_CONTENT_LENGTH,
+                scheduler=self.scheduler,
+            )
+        
+        # ATS 職缺板 API 與 JSON-LD 的結構化提取，命中時不呼叫 LLM 服務
+        self.extractors: Optional[ExtractorRegistry] = None
+        if settings.STRUCTURED_EXTRACTION_ENABLED:
+            self.extractors = create_default_registry(self.http_client, self.scheduler)
+        
+        # 進行中的提取 (合併相同頁面的並行請求)
+        self.flights = SingleFlight()
+        
+        # 每個追蹤頁面最後一次看到的職缺列表 (精簡格式)，用於計算差異
+        self.snapshots = SnapshotStore(
+            settings.SNAPSHOT_STORE_PATH,
+            max_journal_bytes=settings.SNAPSHOT_JOURNAL_MAX_MB * 1024 * 1024,
+        )
+        
+        # 新職缺的詳細頁面抓取 (只處理差異中新增的職缺)
+        self.enricher: Optional[JobEnricher] = None
+        if settings.JOB_ENRICHMENT_ENABLED:
+            self.enricher = JobEnricher(
+                client=self.http_client,
+                cache=self.cache,
+                scheduler=self.scheduler,
+                concurrency=settings.JOB_ENRICHMENT_CONCURRENCY,
+                domain_concurrency=settings.JOB_ENRICHMENT_DOMAIN_CONCURRENCY,
+                timeout=settings.JOB_ENRICHMENT_TIMEOUT,
+                max_bytes=settings.JOB_ENRICHMENT_MAX_BYTES,
+                cache_ttl_seconds=settings.JOB_ENRICHMENT_CACHE_TTL_SECONDS,
+                negative_cache_ttl_seconds=settings.JOB_ENRICHMENT_NEGATIVE_CACHE_TTL_SECONDS,
+            )
+    
+    async def aclose(self) -> None:
+        """
+        Release the resources held by the underlying crawler clients.
+        """
+        await self.router.aclose()
+        if self.archive is not None:
+            await self.archive.aclose()
+        if self.cache is not None:
+            await self.cache.aclose()
+        if self._fingerprint_store is not None:
+            await self._fingerprint_store.aclose()
+        if self.snapshots.path:
+            try:
+                await asyncio.to_thread(self.snapshots.compact, True)
+            except Exception as e:
+                logger.error(f"Failed to compact page snapshots into {self.snapshots.path}: {str(e)}")
+        self.snapshots.close()
+        if self._owns_http_client:
+            await self.http_client.aclose()
     
     async def crawl_job_postings(self, url: str, company_name: Optional[str] = None, 
-                            append_positions_tag: bool = False) -> JobPostingsResponse:
+                            append_positions_tag: bool = False,
+                            timeout: Optional[float] = None,
+                            force_refresh: bool = False) -> JobPostingsResponse:
         """
-        Crawl job postings from a career page using FireCrawl.
+        Crawl job postings from a career page using the healthiest available provider.
+        
+        The extraction cache is consulted first. Concurrent misses for the same page and
+        options share a single in-flight extraction. On a miss, a cheap change check compares
+        the page with its last fingerprint and reuses the previous result when the page is
+        unchanged, so the LLM extraction only runs for pages that actually changed.
         
         Args:
             url: URL of the career page.
             company_name: Name of the company. If not provided, will be extracted from URL.
             append_positions_tag: If True, append "#positions" to the URL (useful for some career sites).
+            timeout: Per-call extraction timeout in seconds, defaults to FIRECRAWL_EXTRACT_TIMEOUT.
+            force_refresh: If True, bypass the cache and change detection and always extract.
             
         Returns:
-            JobPostingsResponse: Extracted job postings.
+            JobPostingsResponse: Extracted job postings; ``changed`` is False when the
+                                 previous result was reused for an unchanged page.
         """
         logger.info(f"Crawling job postings from URL: {url}")
         
-        # 使用 FireCrawl 爬取職缺
+        if not force_refresh:
+            cached = await self._get_cached(url, company_name, append_positions_tag)
+            if cached is not None:
+                logger.info(f"Extraction cache hit for URL: {url}")
+                return cached
+        
+        # 同一頁面與提取選項的並行請求共用同一次提取，取消單一呼叫者不影響其他呼叫者
+        key = (self._cache_key(url, append_positions_tag), force_refresh)
+        response = await self.flights.do(
+            key,
+            lambda: self._extract_fresh(url, company_name, append_positions_tag, timeout, force_refresh),
+        )
+        return self._restamp(response, url, company_name)
+    
+    async def _extract_fresh(self, url: str, company_name: Optional[str], append_positions_tag: bool,
+                             timeout: Optional[float], force_refresh: bool) -> JobPostingsResponse:
+        """
+        Run the change check and, if needed, the extraction for a cache miss.
+        
+        Args:
+            url: URL of the career page.
+            company_name: Name of the company, if any.
+            append_positions_tag: Whether "#positions" is appended for extraction.
+            timeout: Per-call extraction timeout in seconds.
+            force_refresh: If True, skip the change detection shortcut.
+            
+        Returns:
+            JobPostingsResponse: Extracted or reused job postings.
+        """
+        check = await self._check_changed(url, append_positions_tag)
+        if not force_refresh and check is not None and not check.changed and check.previous_result:
+            logger.info(f"Skipping extraction for unchanged page: {url}")
+            response = self._restamp(check.previous_result, url, company_name)
+            response.changed = False
+            await self._store_cached(url, append_positions_tag, response)
+            return response
+        
+        response = await self._extract_structured(url, company_name, append_positions_tag, check)
+        if response is not None:
+            return response
+        
+        # 透過路由選擇爬蟲服務 (含故障轉移)
         try:
-            response = await self.firecrawl.extract_job_postings(
+            response = await self.router.extract_job_postings(
                 url=url, 
                 company_name=company_name,
-                append_positions_tag=append_positions_tag
+                append_positions_tag=append_positions_tag,
+                timeout=timeout
             )
-            logger.info(f"Successfully extracted {len(response.job_postings)} job postings using FireCrawl")
+            logger.info(f"Successfully extracted {len(response.job_postings)} job postings using {response.provider}")
+            await self._remember_result(url, append_positions_tag, response, check)
             return response
         except Exception as e:
-            logger.error(f"Error using FireCrawl for URL {url}: {str(e)}")
+            logger.error(f"Error crawling job postings for URL {url}: {str(e)}")
             raise
+    
+    async def _extract_structured(self, url: str, company_name: Optional[str], append_positions_tag: bool,
+                                  check: Optional[ChangeCheck]) -> Optional[JobPostingsResponse]:
+        """
+        Try the deterministic extractors and remember the result on a hit.
+        
+        Args:
+            url: URL of the career page.
+            company_name: Name of the company, if any.
+            append_positions_tag: Whether "#positions" is appended for extraction.
+            check: Change check that preceded the extraction, if any; its page HTML is reused.
+        
+        Returns:
+            Optional[JobPostingsResponse]: Extracted job postings, or None to fall back to the providers.
+        """
+        if self.extractors is None:
+            return None
+        response = await self.extractors.extract(url, company_name, content=check.content if check else None)
+        if response is not None:
+            await self._remember_result(url, append_positions_tag, response, check)
+        return response
+    
+    async def crawl_job_postings_batch(self, urls: List[str], append_positions_tag: bool = False,
+                                       timeout: Optional[float] = None) -> BatchJobPostingsResponse:
+        """
+        Crawl job postings from many career pages, batching FireCrawl requests when it is
+        the preferred provider.
+        
+        Cached and unchanged pages are answered without extraction. The remaining URLs are
+        grouped into chunks of FIRECRAWL_BATCH_SIZE and the chunks run concurrently under
+        the process-wide CRAWLER_BATCH_CONCURRENCY cap. A failed chunk, or a page that
+        cannot be attributed in the batch response, is retried as a single-URL extraction, so
+        one bad URL only fails itself.
+        
+        Args:
+            urls: URLs of the career pages.
+            append_positions_tag: If True, append "#positions" to each URL.
+            timeout: Per-request timeout in seconds.
+            
+        Returns:
+            BatchJobPostingsResponse: Per-URL results and per-URL errors.
+        """
+        batch_response = BatchJobPostingsResponse()
+        
+        # 去除重複 URL 並保留順序，已快取的頁面直接回傳
+        pending_urls = []
+        for url in dict.fromkeys(urls):
+            cached = await self._get_cached(url, None, append_positions_tag)
+            if cached is not None:
+                batch_response.results[url] = cached
+            else:
+                pending_urls.append(url)
+        
+        reused = len(batch_response.results)
+        
+        # 並行執行變更偵測，未變更的頁面沿用上次結果
+        checks: Dict[str, ChangeCheck] = {}
+        
+        async def run_check(url: str) -> None:
+            async with self._batch_semaphore:
+                check = await self._check_changed(url, append_positions_tag)
+            if check is None:
+                return
+            if not check.changed and check.previous_result:
+                result = self._restamp(check.previous_result, url, None)
+                result.changed = False
+                batch_response.results[url] = result
+                await self._store_cached(url, append_positions_tag, result)
+            else:
+                checks[url] = check
+        
+        await asyncio.gather(*(run_check(url) for url in pending_urls))
+        pending_urls = [url for url in pending_urls if url not in batch_response.results]
+        
+        # ATS 職缺板與 JSON-LD 頁面直接提取，不進入 LLM 批次
+        async def run_structured(url: str) -> None:
+            async with self._batch_semaphore:
+                result = await self._extract_structured(url, None, append_positions_tag, checks.get(url))
+            if result is not None:
+                batch_response.results[url] = result
+        
+        if self.extractors is not None:
+            changed = len(batch_response.results)
+            await asyncio.gather(*(run_structured(url) for url in pending_urls))
+            pending_urls = [url for url in pending_urls if url not in batch_response.results]
+            structured = len(batch_response.results) - changed
+        else:
+            structured = 0
+        
+        # 只有 FireCrawl 為首選服務時才使用多 URL 批次請求
+        use_firecrawl_batch = self.firecrawl is not None and self.router.ordered()[0] is self.firecrawl
+        chunk_size = max(1, settings.FIRECRAWL_BATCH_SIZE) if use_firecrawl_batch else 1
+        chunks = [pending_urls[i:i + chunk_size] for i in range(0, len(pending_urls), chunk_size)]
+        logger.info(
+            f"Crawling job postings from {len(pending_urls)} URLs in {len(chunks)} batches "
+            f"({reused} from cache, {len(batch_response.results) - reused - structured} unchanged, "
+            f"{structured} from structured data)"
+        )
+        
+        async def run_single(url: str) -> None:
+            async with self._batch_semaphore:
+                try:
+                    result = await self.router.extract_job_postings(
+                        url=url,
+                        append_positions_tag=append_positions_tag,
+                        timeout=timeout
+                    )
+                    batch_response.results[url] = result
+                    await self._remember_result(url, append_positions_tag, result, checks.get(url))
+                except Exception as e:
+                    batch_response.errors[url] = e.detail if isinstance(e, HTTPException) else str(e)
+        
+        async def run_chunk(chunk: List[str]) -> None:
+            if len(chunk) == 1:
+                await run_single(chunk[0])
+                return
+            
+            async with self._batch_semaphore:
+                try:
+                    results = await self.scheduler.run(
+                        lambda: self.firecrawl.extract_job_postings_batch(
+                            chunk,
+                            append_positions_tag=append_positions_tag,
+                            timeout=timeout
+                        ),
+                        urls=chunk,
+                        provider=self.firecrawl.name
+                    )
+                except Exception as e:
+                    logger.warning(f"Batch of {len(chunk)} URLs failed, retrying individually: {str(e)}")
+                    results = {}
+            
+            batch_response.results.update(results)
+            for url, result in results.items():
+                await self._remember_result(url, append_positions_tag, result, checks.get(url))
+            
+            # 失敗或無法歸屬的 URL 個別重試 (在釋放批次名額後進行，避免死鎖)
+            missing = [url for url in chunk if url not in results]
+            if missing:
+                await asyncio.gather(*(run_single(url) for url in missing))
+        
+        await asyncio.gather(*(run_chunk(chunk) for chunk in chunks))
+        
+        logger.info(
+            f"Batch crawl finished: {len(batch_response.results)} succeeded, "
+            f"{len(batch_response.errors)} failed"
+        )
+        return batch_response
+    
+    async def crawl_job_posting_changes(self, url: str, company_name: Optional[str] = None,
+                                        append_positions_tag: bool = False,
+                                        timeout: Optional[float] = None,
+                                        force_refresh: bool = False,
+                                        page_key: Optional[str] = None) -> JobPostingsDiff:
+        """
+        Crawl a career page and return only the postings that changed since the last crawl.
+        
+        The first crawl of a page reports every posting as added. The page snapshot is
+        replaced with the fresh job list afterwards. Added postings are enriched with the
+        details of their own pages when enrichment is enabled; the snapshot keeps the
+        listing data, so enrichment never shows up as a modification.
+        
+        Args:
+            url: URL of the career page.
+            company_name: Name of the company. If not provided, will be extracted from URL.
+            append_positions_tag: If True, append "#positions" to the URL.
+            timeout: Per-call extraction timeout in seconds.
+            force_refresh: If True, bypass the cache and change detection.
+            page_key: Snapshot key for the tracked page, defaults to the canonical URL.
+            
+        Returns:
+            JobPostingsDiff: Added, removed and modified postings.
+        """
+        page_key = page_key or canonicalize_url(url) or normalize_url(url)
+        response = await self.crawl_job_postings(
+            url=url,
+            company_name=company_name,
+            append_positions_tag=append_positions_tag,
+            timeout=timeout,
+            force_refresh=force_refresh
+        )
+        
+        # 不以 response.changed 略過比對：變更偵測以網址為單位，同一網址的其他快照鍵
+        # 可能已取走變更；快照比對只是雜湊比較，成本很低
+        previous = self.snapshots.get(page_key)
+        # 快照會寫入日誌 (需要跨程序的檔案鎖)，在執行緒中處理
+        current = await asyncio.to_thread(self.snapshots.put, page_key, response.job_postings)
+        if self.snapshots.needs_compaction:
+            try:
+                await asyncio.to_thread(self.snapshots.compact)
+            except Exception as e:
+                logger.error(f"Failed to compact page snapshots into {self.snapshots.path}: {str(e)}")
+        diff = diff_snapshots(previous, current, url=url)
+        if self.enricher is not None:
+            diff.added = await self.enricher.enrich(diff.added)
+        
+        logger.info(
+            f"Diff for {url}: {len(diff.added)} added, {len(diff.removed)} removed, "
+            f"{len(diff.modified)} modified, {diff.unchanged_count} unchanged"
+        )
+        return diff
+    
+    def provider_stats(self) -> Dict:
+        """
+        Get per-provider health statistics in routing order, rate limiter, coalescing,
+        structured extractor and response archive counters.
+        """
+        return {
+            "providers": self.router.stats(),
+            "rate_limits": self.scheduler.stats(),
+            "coalescing": self.flights.stats(),
+            "structured": self.extractors.stats() if self.extractors is not None else {"enabled": False},
+            "archive": self.archive.stats() if self.archive is not None else {"enabled": False},
+        }
+    
+    def cache_stats(self) -> Dict:
+        """
+        Get extraction cache metrics.
+        
+        Returns:
+            Dict: Hit/miss counters and memory usage, or ``{"enabled": False}``.
+        """
+        if self.cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.cache.stats()}
+    
+    async def _get_cached(self, url: str, company_name: Optional[str],
+                          append_positions_tag: bool) -> Optional[JobPostingsResponse]:
+        """
+        Look up a cached extraction and adapt it to the current caller.
+        
+        The cache is shared by every user tracking the same page, so the company name
+        and requested URL are re-applied to the cached postings.
+        
+        Args:
+            url: URL of the career page.
+            company_name: Company name requested by the caller, if any.
+            append_positions_tag: Whether "#positions" is appended for extraction.
+            
+        Returns:
+            Optional[JobPostingsResponse]: Cached response, or None on a miss.
+        """
+        if self.cache is None:
+            return None
+        
+        payload = await self.cache.get(self._cache_key(url, append_positions_tag))
+        if payload is None:
+            return None
+        
+        return self._restamp(JobPostingsResponse.model_validate_json(payload), url, company_name)
+    
+    def _restamp(self, response: JobPostingsResponse, url: str,
+                 company_name: Optional[str]) -> JobPostingsResponse:
+        """
+        Re-apply the caller's URL and company name to a stored extraction result.
+        
+        Args:
+            response: Stored extraction result.
+            url: URL requested by the caller.
+            company_name: Company name requested by the caller, if any.
             
+        Returns:
+            JobPostingsResponse: A copy addressed to the caller.
+        """
+        response = response.model_copy(deep=True)
+        company = company_name or extract_company_from_url(url)
+        for job in response.job_postings:
+            job.company = company
+        response.url = url
+        return response
+    
+    async def _check_changed(self, url: str, append_positions_tag: bool) -> Optional[ChangeCheck]:
+        """
+        Run the change detection pre-check for a page.
+        
+        Args:
+            url: URL of the career page.
+            append_positions_tag: Whether "#positions" is appended for extraction.
+            
+        Returns:
+            Optional[ChangeCheck]: The check result, or None if change detection is disabled.
+        """
+        if self.change_detector is None:
+            return None
+        return await self.change_detector.check(self._fingerprint_key(url, append_positions_tag), url)
+    
+    async def _remember_result(self, url: str, append_positions_tag: bool, response: JobPostingsResponse,
+                               check: Optional[ChangeCheck]) -> None:
+        """
+        Store a fresh extraction in the cache and record the page fingerprint it came from.
+        
+        Args:
+            url: URL of the career page.
+            append_positions_tag: Whether "#positions" was appended for extraction.
+            response: Extraction result.
+            check: Change check that preceded the extraction, if any.
+        """
+        await self._store_cached(url, append_positions_tag, response)
+        # 備援服務的結果不記錄指紋，否則頁面未變更時會一直沿用
+        if (self.change_detector is not None and check is not None and check.fingerprint is not None
+                and not self._is_fallback(response)):
+            await self.change_detector.record(
+                self._fingerprint_key(url, append_positions_tag), check.fingerprint, response
+            )
+    
+    async def _store_cached(self, url: str, append_positions_tag: bool,
+                            response: JobPostingsResponse) -> None:
+        """
+        Store an extraction result in the cache.
+        
+        Args:
+            url: URL of the career page.
+            append_positions_tag: Whether "#positions" was appended for extraction.
+            response: Extraction result to cache.
+        """
+        if self.cache is None:
+            return
+        ttl_seconds = None
+        if self._is_fallback(response):
+            # 備援服務的結果 (偏好的服務故障時) 只短暫快取，恢復後盡快改用偏好的服務
+            ttl_seconds = settings.EXTRACTION_CACHE_FALLBACK_TTL_SECONDS
+        await self.cache.set(
+            self._cache_key(url, append_positions_tag), response.model_dump_json(), ttl_seconds=ttl_seconds
+        )
+    
+    def _is_fallback(self, response: JobPostingsResponse) -> bool:
+        """
+        Whether a result came from a provider other than the preferred one.
+        """
+        return response.provider in self._provider_order[1:]
+    
+    def _cache_key(self, url: str, append_positions_tag: bool) -> str:
+        """
+        Build the extraction cache key from the normalized URL, the prompt/schema hash
+        and the configured provider order.
+        """
+        return make_cache_key(url, EXTRACT_OPTIONS_HASH, append_positions_tag=append_positions_tag,
+                              providers=self._provider_order)
+    
+    def _fingerprint_key(self, url: str, append_positions_tag: bool) -> str:
+        """
+        Build the fingerprint store key; prefixed so it never collides with cache entries.
+        """
+        return "fingerprint:" + make_cache_key(url, EXTRACT_OPTIONS_HASH, append_positions_tag=append_positions_tag,
+                                               providers=self._provider_order)
+    
     async def crawl_and_process(self, url: str) -> Dict:
         """
-        Crawl a page and extract its basic content using FireCrawl.
+        Crawl a page and extract its basic content, preferring FireCrawl.
         
         This is a simplified method for general content extraction, useful for testing and
         for scenarios where full job posting extraction is not needed.
@@ -67,11 +628,13 @@ class CrawlerService:
         
         try:
             # 嘗試基本提取，這裡我們先只獲取職缺作為內容示例
-            job_response = await self.firecrawl.extract_job_postings(
-                url=url, 
-                debug_mode=True,
-                append_positions_tag=False  # 對通用爬取，不添加 #positions 標籤
-            )
+            if self.firecrawl is not None:
+                job_response = await self.firecrawl.extract_job_postings(
+                    url=url, 
+                    append_positions_tag=False  # 對通用爬取，不添加 #positions 標籤
+                )
+            else:
+                job_response = await self.router.extract_job_postings(url=url)
             
             # 將提取的資訊轉換為簡單的頁面內容
             content = "Job postings found on page:\n"
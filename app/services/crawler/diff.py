@@ -0,0 +1,133 @@
+"""
+Diff engine for job postings: compare a fresh extraction with the last snapshot of a page.
+"""
+import hashlib
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from pydantic import BaseModel
+
+from app.services.crawler.models import JobPosting
+from app.utils.urls import job_url_key
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class JobPostingsDiff(BaseModel):
+    """
+    Changes between two snapshots of a career page.
+    """
+    url: str
+    added: List[JobPosting] = []
+    removed: List[JobPosting] = []
+    # 內容有變動的職缺 (新版本)
+    modified: List[JobPosting] = []
+    unchanged_count: int = 0
+    
+    @property
+    def has_changes(self) -> bool:
+        """
+        Whether any posting was added, removed or modified.
+        """
+        return bool(self.added or self.removed or self.modified)
+
+
+def _normalize_text(value: Optional[str]) -> str:
+    return _WHITESPACE_RE.sub(" ", value or "").strip().lower()
+
+
+def title_identity(posting: JobPosting) -> str:
+    """
+    Identity based on the normalized title and company.
+    """
+    return f"title:{_normalize_text(posting.title)}|{_normalize_text(posting.company)}"
+
+
+def posting_identity(posting: JobPosting) -> str:
+    """
+    Stable identity of a posting: its job URL, or its title and company if it has no URL.
+    
+    Args:
+        posting: Job posting.
+        
+    Returns:
+        str: Identity key.
+    """
+    url = job_url_key(posting.url)
+    if url is not None:
+        return f"url:{url}"
+    return title_identity(posting)
+
+
+def posting_fingerprint(posting: JobPosting) -> str:
+    """
+    Hash of the posting fields whose change counts as a modification.
+    
+    Args:
+        posting: Job posting.
+        
+    Returns:
+        str: Hex digest of the normalized title, description, location and department.
+    """
+    material = "\x1f".join(
+        _normalize_text(value)
+        for value in (posting.title, posting.description, posting.location, posting.department)
+    )
+    return hashlib.blake2b(material.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def index_postings(postings: Iterable[JobPosting]) -> Dict[str, JobPosting]:
+    """
+    Index postings by identity in a single pass.
+    
+    Pages sometimes list every job with the same URL (e.g. the listing page itself); URLs
+    shared by several postings are not an identity, so those postings fall back to their
+    title and company. Later duplicates of the same identity are dropped.
+    
+    Args:
+        postings: Job postings of one page.
+        
+    Returns:
+        Dict[str, JobPosting]: Postings keyed by identity, in their original order.
+    """
+    postings = list(postings)
+    identities = [posting_identity(posting) for posting in postings]
+    counts = Counter(identities)
+    
+    index: Dict[str, JobPosting] = {}
+    for identity, posting in zip(identities, postings):
+        if counts[identity] > 1 and identity.startswith("url:"):
+            identity = title_identity(posting)
+        index.setdefault(identity, posting)
+    return index
+
+
+def diff_job_postings(previous: Iterable[JobPosting], current: Iterable[JobPosting],
+                      url: str = "") -> JobPostingsDiff:
+    """
+    Compute added, removed and modified postings in O(n) using hashed indexes.
+    
+    Args:
+        previous: Postings from the last snapshot of the page.
+        current: Postings from the fresh extraction.
+        url: URL of the career page, for reference in the result.
+        
+    Returns:
+        JobPostingsDiff: The changes between the two lists.
+    """
+    previous_index = index_postings(previous)
+    current_index = index_postings(current)
+    
+    diff = JobPostingsDiff(url=url)
+    for identity, posting in current_index.items():
+        old = previous_index.get(identity)
+        if old is None:
+            diff.added.append(posting)
+        elif posting_fingerprint(old) != posting_fingerprint(posting):
+            diff.modified.append(posting)
+        else:
+            diff.unchanged_count += 1
+    
+    diff.removed = [posting for identity, posting in previous_index.items() if identity not in current_index]
+    return diff
@@ -0,0 +1,274 @@
+"""
+Enrichment stage: fetch the detail pages of new job postings and fill in their details.
+"""
+import asyncio
+import html
+import logging
+import re
+import uuid
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.crawler.cache import ExtractionCache, make_cache_key
+from app.services.crawler.extractors.jsonld import html_to_text, is_job_posting, iter_json_ld, job_posting_fields
+from app.services.crawler.models import JobPosting, JobPostingsResponse
+from app.services.crawler.ratelimit import PolitenessScheduler, url_domain
+from app.services.jobs.persistence import new_job_postings
+from app.utils.urls import canonicalize_job_url
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+# 詳細資料解析方式的版本；解析邏輯變更時遞增以淘汰舊快取
+ENRICHMENT_VERSION = "details-v1"
+
+_META_RE = re.compile(r"<meta\b[^>]*>", re.IGNORECASE)
+_ATTR_RE = re.compile(r"([\w:-]+)\s*=\s*(\"[^\"]*\"|'[^']*')")
+_NOISE_BLOCK_RE = re.compile(
+    r"<(head|script|style|noscript|svg|template|nav|header|footer)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL
+)
+
+# 沒有結構化資料時，頁面文字最多保留的字元數
+_MAX_PAGE_TEXT_LENGTH = 5000
+
+# 依優先順序嘗試的描述 meta 標籤
+_DESCRIPTION_META = ("og:description", "twitter:description", "description")
+
+_MAX_FIELD_LENGTH = 255
+
+
+class PostingDetails(BaseModel):
+    """
+    Details extracted from a job posting page.
+    """
+    description: Optional[str] = None
+    location: Optional[str] = None
+    department: Optional[str] = None
+
+
+def _meta_tags(content: str) -> Dict[str, str]:
+    tags: Dict[str, str] = {}
+    for tag in _META_RE.finditer(content):
+        attrs = {name.lower(): value[1:-1] for name, value in _ATTR_RE.findall(tag.group(0))}
+        name = (attrs.get("property") or attrs.get("name") or "").lower()
+        if name and "content" in attrs:
+            tags.setdefault(name, html.unescape(attrs["content"]).strip())
+    return tags
+
+
+def extract_posting_details(content: str) -> PostingDetails:
+    """
+    Extract description, location and department from a job posting page.
+    
+    Uses the schema.org ``JobPosting`` JSON-LD block that most ATS pages embed for
+    search engines, and falls back to the description meta tags.
+    
+    Args:
+        content: Raw HTML of the posting page.
+    
+    Returns:
+        PostingDetails: Extracted details; fields that could not be found are None.
+    """
+    details = PostingDetails()
+    for item in iter_json_ld(content):
+        if not is_job_posting(item):
+            continue
+        details.description, details.location, details.department = job_posting_fields(item)
+        break
+    
+    if not details.description:
+        meta = _meta_tags(content)
+        details.description = next((meta[name] for name in _DESCRIPTION_META if meta.get(name)), None)
+    
+    if details.location:
+        details.location = details.location[:_MAX_FIELD_LENGTH]
+    if details.department:
+        details.department = details.department[:_MAX_FIELD_LENGTH]
+    return details
+
+
+def parse_detail_page(content: str) -> PostingDetails:
+    """
+    Details of a job posting page, falling back to its visible text for the description.
+    
+    Args:
+        content: Raw HTML of the detail page.
+    
+    Returns:
+        PostingDetails: Extracted details.
+    """
+    details = extract_posting_details(content)
+    if not details.description:
+        # 沒有結構化資料時退回頁面可見文字
+        details.description = html_to_text(_NOISE_BLOCK_RE.sub(" ", content))[:_MAX_PAGE_TEXT_LENGTH] or None
+    return details
+
+
+class JobEnricher:
+    """
+    Fetch the detail pages of job postings concurrently and merge in their details.
+    
+    Fetches are bounded globally and per domain, and go through the politeness
+    scheduler so career sites see the same request rate as the listing crawl.
+    Details are cached by canonical job URL, so re-crawls only fetch pages that
+    were never seen before.
+    """
+    
+    def __init__(self, client: httpx.AsyncClient, cache: Optional[ExtractionCache] = None,
+                 scheduler: Optional[PolitenessScheduler] = None, concurrency: int = 16,
+                 domain_concurrency: int = 2, timeout: float = 15.0, max_bytes: int = 2 * 1024 * 1024,
+                 cache_ttl_seconds: Optional[float] = None, negative_cache_ttl_seconds: float = 3600.0):
+        """
+        Initialize the enricher.
+        
+        Args:
+            client: Shared HTTP client.
+            cache: Cache for extracted details, or None to disable caching.
+            scheduler: Per-domain rate limiter.
+            concurrency: Maximum number of detail pages fetched at once.
+            domain_concurrency: Maximum number of detail pages fetched at once from one domain.
+            timeout: Timeout in seconds for one detail page.
+            max_bytes: Pages larger than this are truncated.
+            cache_ttl_seconds: Time-to-live of cached details, defaults to the cache TTL.
+            negative_cache_ttl_seconds: Time-to-live of cached pages that yielded no description.
+        """
+        self._client = client
+        self._cache = cache
+        self._scheduler = scheduler
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.domain_concurrency = domain_concurrency
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.negative_cache_ttl_seconds = negative_cache_ttl_seconds
+        
+        # 網域 -> [信號量, 使用中的請求數]；閒置後移除，避免網域數無限增長
+        self._domains: Dict[str, list] = {}
+        self._stats = {"enriched": 0, "fetched": 0, "cache_hits": 0, "failed": 0}
+    
+    async def enrich(self, postings: List[JobPosting]) -> List[JobPosting]:
+        """
+        Fill in the missing details of the given postings.
+        
+        Postings that already have a description or have no URL are returned as is.
+        The input postings are not modified.
+        
+        Args:
+            postings: Postings to enrich, typically the ones a diff marked as added.
+        
+        Returns:
+            List[JobPosting]: Enriched copies, in the input order.
+        """
+        if not postings:
+            return []
+        results = await asyncio.gather(*(self._enrich_one(posting) for posting in postings))
+        logger.info(f"Enriched {sum(1 for r in results if r.description)}/{len(postings)} job postings")
+        return list(results)
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get enrichment counters.
+        """
+        return dict(self._stats)
+    
+    async def _enrich_one(self, posting: JobPosting) -> JobPosting:
+        url = canonicalize_job_url(posting.url)
+        if url is None or posting.description:
+            return posting
+        
+        details = await self._get_details(url)
+        if details is None:
+            return posting
+        
+        self._stats["enriched"] += 1
+        return posting.model_copy(update={
+            "description": details.description,
+            "location": posting.location or details.location,
+            "department": posting.department or details.department,
+        })
+    
+    async def _get_details(self, url: str) -> Optional[PostingDetails]:
+        key = make_cache_key(url, ENRICHMENT_VERSION)
+        if self._cache is not None:
+            payload = await self._cache.get(key)
+            if payload is not None:
+                self._stats["cache_hits"] += 1
+                return PostingDetails.model_validate_json(payload)
+        
+        try:
+            content = await self._fetch(url)
+        except (httpx.HTTPError, asyncio.TimeoutError) as e:
+            self._stats["failed"] += 1
+            logger.warning(f"Failed to fetch job detail page {url}: {str(e)}")
+            return None
+        
+        # 大型頁面的正規表示式解析移至執行緒，避免阻塞事件迴圈
+        details = await asyncio.to_thread(parse_detail_page, content)
+        
+        if self._cache is not None:
+            # 沒有描述的結果多為暫時性問題 (例如 JavaScript 外殼)，只短暫快取
+            ttl = self.cache_ttl_seconds if details.description else self.negative_cache_ttl_seconds
+            await self._cache.set(key, details.model_dump_json(), ttl_seconds=ttl)
+        return details
+    
+    async def _fetch(self, url: str) -> str:
+        domain = url_domain(url)
+        entry = self._domains.setdefault(domain, [asyncio.Semaphore(self.domain_concurrency), 0])
+        entry[1] += 1
+        try:
+            async with entry[0], self._semaphore:
+                if self._scheduler is not None:
+                    await self._scheduler.acquire([url])
+                async with asyncio.timeout(self.timeout):
+                    async with self._client.stream("GET", url) as response:
+                        response.raise_for_status()
+                        body = bytearray()
+                        async for chunk in response.aiter_bytes():
+                            body.extend(chunk)
+                            if len(body) >= self.max_bytes:
+                                break
+                        self._stats["fetched"] += 1
+                        return body.decode(response.encoding or "utf-8", errors="replace")
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._domains[domain]
+
+
+async def enrich_new_postings(enricher: Optional[JobEnricher], session_factory: Callable[[], AsyncSession],
+                              tracked_page_id: uuid.UUID, response: JobPostingsResponse) -> JobPostingsResponse:
+    """
+    Enrich the postings of a tracked page that are not stored yet.
+    
+    Postings already in the jobs table keep their stored details, so re-crawls
+    only fetch the detail pages of new postings.
+    
+    Args:
+        enricher: Detail page enricher, or None to skip enrichment.
+        session_factory: Async session factory used to look up stored postings.
+        tracked_page_id: ID of the tracked page.
+        response: Crawl result of the page.
+    
+    Returns:
+        JobPostingsResponse: The response with enriched new postings, or the original
+                             response if enrichment is disabled or fails.
+    """
+    if enricher is None or not response.changed:
+        return response
+    
+    try:
+        async with session_factory() as session:
+            new = await new_job_postings(session, tracked_page_id, response)
+        enriched = await enricher.enrich(new)
+    except Exception as e:
+        logger.error(f"Failed to enrich job postings of tracked page {tracked_page_id}: {str(e)}")
+        return response
+    
+    # enrich 回傳與輸入順序相同的副本
+    replacements = {id(old): posting for old, posting in zip(new, enriched)}
+    return response.model_copy(update={
+        "job_postings": [replacements.get(id(posting), posting) for posting in response.job_postings],
+    })
@@ -0,0 +1,3 @@
+"""
+Deterministic job posting extractors for ATS job boards and schema.org JSON-LD.
+"""
@@ -0,0 +1,232 @@
+"""
+Extractors for the public job board APIs of Greenhouse, Lever, Ashby and Workable.
+"""
+import re
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+from urllib.parse import parse_qs, quote, urlsplit
+
+from app.services.crawler.extractors.base import ExtractorContext, StructuredExtractor, path_segments, url_host
+from app.services.crawler.extractors.jsonld import html_to_text
+from app.services.crawler.models import JobPosting
+
+_BOARD_TOKEN = r"([A-Za-z0-9][\w.-]*)"
+
+# 頁面內容中的一般連結至少要有這麼多筆、且全部指向同一個職缺板，才視為本公司的職缺板；
+# 只連到另一家公司的單一職缺時改由 LLM 處理
+MIN_BOARD_LINKS = 2
+
+
+def _join(*parts: Optional[str]) -> Optional[str]:
+    parts = [part.strip() for part in parts if part and part.strip()]
+    return "\n\n".join(parts) or None
+
+
+def _single_board(boards: Iterable[Hashable]) -> Optional[Any]:
+    # 所有連結一致時回傳該職缺板，否則 None
+    boards = list(boards)
+    if len(boards) < MIN_BOARD_LINKS or len(set(boards)) != 1:
+        return None
+    return boards[0]
+
+
+def _name(value: Any) -> Optional[str]:
+    if isinstance(value, dict):
+        value = value.get("name")
+    return value.strip() if isinstance(value, str) and value.strip() else None
+
+
+class GreenhouseExtractor(StructuredExtractor):
+    """
+    Greenhouse hosted boards (``boards.greenhouse.io/<board>``) and embedded boards.
+    """
+    
+    name = "greenhouse"
+    
+    API_URL = "https://boards-api.greenhouse.io/v1/boards/{board}/jobs?content=true"
+    HOSTS = ("boards.greenhouse.io", "job-boards.greenhouse.io")
+    _EMBED_RE = re.compile(
+        r"(?:job-)?boards\.greenhouse\.io/embed/job_board(?:/js)?\?(?:[^\"'<>\s]*?&(?:amp;)?)?for=" + _BOARD_TOKEN
+    )
+    _LINK_RE = re.compile(r"(?:job-)?boards\.greenhouse\.io/(?!embed/)" + _BOARD_TOKEN + r"/jobs/\d+")
+    
+    def detect(self, url: str, content: Optional[str]) -> Optional[str]:
+        board = None
+        if content is None:
+            if url_host(url) in self.HOSTS:
+                segments = path_segments(url)
+                if segments and segments[0] == "embed":
+                    board = (parse_qs(urlsplit(url).query).get("for") or [None])[0]
+                elif segments:
+                    board = segments[0]
+        else:
+            match = self._EMBED_RE.search(content)
+            board = match.group(1) if match else _single_board(
+                m.group(1).lower() for m in self._LINK_RE.finditer(content)
+            )
+        return self.API_URL.format(board=quote(board.lower())) if board else None
+    
+    async def extract(self, source: str, context: ExtractorContext) -> List[JobPosting]:
+        payload = await context.get_json(source)
+        return [
+            JobPosting(
+                company=context.company_name,
+                title=job["title"].strip(),
+                url=job["absolute_url"],
+                description=html_to_text(job["content"]) if job.get("content") else None,
+                location=_name(job.get("location")),
+                department=", ".join(filter(None, map(_name, job.get("departments") or []))) or None,
+            )
+            for job in payload.get("jobs", [])
+            if job.get("title") and job.get("absolute_url")
+        ]
+
+
+class LeverExtractor(StructuredExtractor):
+    """
+    Lever hosted job sites (``jobs.lever.co/<company>``, including the EU region).
+    """
+    
+    name = "lever"
+    
+    API_HOSTS = {"jobs.lever.co": "api.lever.co", "jobs.eu.lever.co": "api.eu.lever.co"}
+    # 內嵌的職缺板 iframe，或 lever-jobs-embed 小工具的 accountName 設定
+    _EMBED_RE = re.compile(r"<iframe[^>]+src=[\"']https?://(jobs(?:\.eu)?\.lever\.co)/" + _BOARD_TOKEN, re.IGNORECASE)
+    _WIDGET_RE = re.compile(r"leverJobsOptions\s*=\s*\{[^}]*?accountName[\"']?\s*:\s*[\"']" + _BOARD_TOKEN)
+    _LINK_RE = re.compile(r"(jobs(?:\.eu)?\.lever\.co)/" + _BOARD_TOKEN)
+    
+    def detect(self, url: str, content: Optional[str]) -> Optional[str]:
+        if content is None:
+            host, segments = url_host(url), path_segments(url)
+            company = segments[0] if host in self.API_HOSTS and segments else None
+        else:
+            embed, widget = self._EMBED_RE.search(content), self._WIDGET_RE.search(content)
+            if embed:
+                host, company = embed.group(1).lower(), embed.group(2)
+            elif widget:
+                host, company = "jobs.lever.co", widget.group(1)
+            else:
+                host, company = _single_board(
+                    (m.group(1).lower(), m.group(2).lower()) for m in self._LINK_RE.finditer(content)
+                ) or (None, None)
+        if not company:
+            return None
+        return f"https://{self.API_HOSTS[host]}/v0/postings/{quote(company.lower())}?mode=json"
+    
+    async def extract(self, source: str, context: ExtractorContext) -> List[JobPosting]:
+        postings = await context.get_json(source)
+        results = []
+        for posting in postings:
+            if not posting.get("text") or not posting.get("hostedUrl"):
+                continue
+            categories: Dict[str, Any] = posting.get("categories") or {}
+            lists = [
+                _join(item.get("text"), html_to_text(item.get("content") or ""))
+                for item in posting.get("lists") or []
+            ]
+            results.append(JobPosting(
+                company=context.company_name,
+                title=posting["text"].strip(),
+                url=posting["hostedUrl"],
+                description=_join(posting.get("descriptionPlain"), *lists, posting.get("additionalPlain")),
+                location=_name(categories.get("location")),
+                department=_name(categories.get("department")) or _name(categories.get("team")),
+            ))
+        return results
+
+
+class AshbyExtractor(StructuredExtractor):
+    """
+    Ashby hosted job boards (``jobs.ashbyhq.com/<organization>``) and embeds.
+    """
+    
+    name = "ashby"
+    
+    API_URL = "https://api.ashbyhq.com/posting-api/job-board/{board}?includeCompensation=false"
+    # 內嵌腳本 jobs.ashbyhq.com/<board>/embed 或 iframe
+    _EMBED_RE = re.compile(
+        r"jobs\.ashbyhq\.com/" + _BOARD_TOKEN + r"/embed|<iframe[^>]+src=[\"']https?://jobs\.ashbyhq\.com/" + _BOARD_TOKEN,
+        re.IGNORECASE,
+    )
+    _LINK_RE = re.compile(r"jobs\.ashbyhq\.com/" + _BOARD_TOKEN)
+    
+    def detect(self, url: str, content: Optional[str]) -> Optional[str]:
+        if content is None:
+            segments = path_segments(url)
+            board = segments[0] if url_host(url) == "jobs.ashbyhq.com" and segments else None
+        else:
+            match = self._EMBED_RE.search(content)
+            board = (match.group(1) or match.group(2)) if match else _single_board(
+                m.group(1) for m in self._LINK_RE.finditer(content)
+            )
+        return self.API_URL.format(board=quote(board)) if board else None
+    
+    async def extract(self, source: str, context: ExtractorContext) -> List[JobPosting]:
+        payload = await context.get_json(source)
+        results = []
+        for job in payload.get("jobs", []):
+            if not job.get("title") or not job.get("jobUrl") or job.get("isListed") is False:
+                continue
+            description = job.get("descriptionPlain") or (
+                html_to_text(job["descriptionHtml"]) if job.get("descriptionHtml") else None
+            )
+            location = _name(job.get("location"))
+            if job.get("isRemote") and location and "remote" not in location.lower():
+                location = f"{location} (Remote)"
+            results.append(JobPosting(
+                company=context.company_name,
+                title=job["title"].strip(),
+                url=job["jobUrl"],
+                description=description,
+                location=location,
+                department=_name(job.get("department")) or _name(job.get("team")),
+            ))
+        return results
+
+
+class WorkableExtractor(StructuredExtractor):
+    """
+    Workable career sites (``apply.workable.com/<account>`` or ``<account>.workable.com``).
+    """
+    
+    name = "workable"
+    
+    API_URL = "https://apply.workable.com/api/v1/widget/accounts/{account}?details=true"
+    _EMBED_RE = re.compile(r"<iframe[^>]+src=[\"']https?://apply\.workable\.com/(?!api/)" + _BOARD_TOKEN, re.IGNORECASE)
+    _LINK_RE = re.compile(r"apply\.workable\.com/(?!api/)" + _BOARD_TOKEN)
+    _RESERVED_SUBDOMAINS = ("apply", "www", "jobs", "resources", "help", "api")
+    
+    def detect(self, url: str, content: Optional[str]) -> Optional[str]:
+        account = None
+        if content is None:
+            host, segments = url_host(url), path_segments(url)
+            if host == "apply.workable.com" and segments and segments[0] != "api":
+                account = segments[0]
+            elif host.endswith(".workable.com") and host.count(".") == 2:
+                subdomain = host.split(".")[0]
+                account = subdomain if subdomain not in self._RESERVED_SUBDOMAINS else None
+        else:
+            match = self._EMBED_RE.search(content)
+            account = match.group(1) if match else _single_board(
+                m.group(1).lower() for m in self._LINK_RE.finditer(content)
+            )
+        return self.API_URL.format(account=quote(account.lower())) if account else None
+    
+    async def extract(self, source: str, context: ExtractorContext) -> List[JobPosting]:
+        payload = await context.get_json(source)
+        results = []
+        for job in payload.get("jobs", []):
+            url = job.get("url") or job.get("shortlink")
+            if not job.get("title") or not url:
+                continue
+            location = ", ".join(filter(None, (job.get("city"), job.get("state"), job.get("country")))) or None
+            if job.get("telecommuting"):
+                location = f"{location} (Remote)" if location else "Remote"
+            results.append(JobPosting(
+                company=context.company_name,
+                title=job["title"].strip(),
+                url=url,
+                description=html_to_text(job["description"]) if job.get("description") else None,
+                location=location,
+                department=_name(job.get("department")),
+            ))
+        return results
@@ -0,0 +1,101 @@
+"""
+Common interface for deterministic (non-LLM) job posting extractors.
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.services.crawler.models import JobPosting
+
+
+@dataclass
+class ExtractorContext:
+    """
+    Page being extracted and the HTTP access available to an extractor.
+    """
+    url: str
+    company_name: str
+    client: httpx.AsyncClient
+    timeout: float
+    # 頁面 HTML；僅在需要從頁面內容判斷時才會抓取
+    content: Optional[str] = None
+    
+    async def get_json(self, api_url: str) -> Any:
+        """
+        Fetch a JSON document from a public job board API.
+        
+        Args:
+            api_url: API URL.
+        
+        Returns:
+            Any: Decoded JSON.
+        
+        Raises:
+            httpx.HTTPError: If the request fails or returns an error status.
+        """
+        response = await self.client.get(api_url, headers={"Accept": "application/json"}, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+
+def path_segments(url: str) -> List[str]:
+    """
+    Non-empty path segments of a URL.
+    """
+    return [segment for segment in urlsplit(url).path.split("/") if segment]
+
+
+def url_host(url: str) -> str:
+    """
+    Lowercase host of a URL without a leading ``www.``.
+    """
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class StructuredExtractor(ABC):
+    """
+    Extractor reading job postings from a machine-readable source instead of the LLM.
+    
+    ``detect`` runs first with the page URL only and, if no extractor matched, again
+    with the page HTML for extractors that set ``needs_content`` or can also spot an
+    embedded job board in the markup.
+    """
+    
+    # 來源名稱，記錄在回應的 provider 欄位
+    name: str = "structured"
+    # 只能從頁面內容判斷 (不看網址) 時為 True
+    needs_content: bool = False
+    
+    @abstractmethod
+    def detect(self, url: str, content: Optional[str]) -> Optional[str]:
+        """
+        Decide whether this extractor handles a career page.
+        
+        Args:
+            url: URL of the career page.
+            content: HTML of the page, or None during the URL-only pass.
+        
+        Returns:
+            Optional[str]: Source to extract from (typically the job board API URL),
+                           or None if the page is not handled.
+        """
+    
+    @abstractmethod
+    async def extract(self, source: str, context: ExtractorContext) -> List[JobPosting]:
+        """
+        Read the job postings of a detected source.
+        
+        Args:
+            source: Value returned by ``detect``.
+            context: Page and HTTP access.
+        
+        Returns:
+            List[JobPosting]: Postings, possibly empty when the board has no openings.
+        
+        Raises:
+            Exception: If the source cannot be read; the caller falls back to the LLM.
+        """
@@ -0,0 +1,197 @@
+"""
+schema.org ``JobPosting`` JSON-LD parsing and the JSON-LD fast-path extractor.
+"""
+import html
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.services.crawler.extractors.base import ExtractorContext, StructuredExtractor
+from app.services.crawler.models import JobPosting
+
+_JSON_LD_RE = re.compile(
+    r"<script[^>]+type\s*=\s*[\"']application/ld\+json[\"'][^>]*>(.*?)</script\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+_BLOCK_TAG_RE = re.compile(r"<\s*(br|/p|/div|/li|/h[1-6])\b[^>]*>", re.IGNORECASE)
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACES_RE = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES_RE = re.compile(r"\n\s*\n+")
+
+
+def html_to_text(content: str) -> str:
+    """
+    Convert an HTML fragment to plain text, keeping paragraph breaks.
+    
+    Args:
+        content: HTML fragment.
+    
+    Returns:
+        str: Plain text.
+    """
+    if "<" not in content:
+        # JSON-LD 與 ATS API 中的 HTML 常以實體編碼
+        content = html.unescape(content)
+    content = _BLOCK_TAG_RE.sub("\n", content)
+    content = html.unescape(_TAG_RE.sub(" ", content))
+    lines = (_SPACES_RE.sub(" ", line).strip() for line in content.split("\n"))
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip()
+
+
+def iter_json_ld(content: str) -> Iterable[Dict[str, Any]]:
+    """
+    Yield every JSON-LD object of a page, including nested lists, ``@graph`` and ``ItemList`` entries.
+    
+    Args:
+        content: Raw HTML.
+    
+    Returns:
+        Iterable[Dict[str, Any]]: JSON-LD objects; invalid blocks are skipped.
+    """
+    for match in _JSON_LD_RE.finditer(content):
+        try:
+            data = json.loads(match.group(1).strip())
+        except ValueError:
+            continue
+        stack = [data]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, list):
+                stack.extend(reversed(item))
+            elif isinstance(item, dict):
+                if "@graph" in item:
+                    stack.append(item["@graph"])
+                if "itemListElement" in item:
+                    stack.append(item["itemListElement"])
+                if isinstance(item.get("item"), dict):
+                    stack.append(item["item"])
+                yield item
+
+
+def is_job_posting(item: Dict[str, Any]) -> bool:
+    """
+    Whether a JSON-LD object is a schema.org ``JobPosting``.
+    """
+    types = item.get("@type")
+    types = types if isinstance(types, list) else [types]
+    return "JobPosting" in types
+
+
+def json_ld_text(value: Any) -> Optional[str]:
+    """
+    Plain text of a JSON-LD value (string, named object or list of them).
+    """
+    if isinstance(value, dict):
+        value = value.get("name")
+    if isinstance(value, list):
+        value = ", ".join(str(v.get("name") if isinstance(v, dict) else v) for v in value if v)
+    if not value or not isinstance(value, str):
+        return None
+    value = html_to_text(value)
+    return value or None
+
+
+def json_ld_location(posting: Dict[str, Any]) -> Optional[str]:
+    """
+    Location of a ``JobPosting``, from ``jobLocation`` addresses and ``jobLocationType``.
+    """
+    locations = posting.get("jobLocation") or []
+    if isinstance(locations, dict):
+        locations = [locations]
+    
+    names: List[str] = []
+    for location in locations:
+        if not isinstance(location, dict):
+            continue
+        address = location.get("address")
+        if isinstance(address, dict):
+            parts = [address.get(key) for key in ("addressLocality", "addressRegion", "addressCountry")]
+            parts = [json_ld_text(part) for part in parts]
+            name = ", ".join(part for part in parts if part)
+        else:
+            name = json_ld_text(address) or json_ld_text(location.get("name"))
+        if name and name not in names:
+            names.append(name)
+    
+    if posting.get("jobLocationType") == "TELECOMMUTE":
+        names.append("Remote")
+    return "; ".join(names) or None
+
+
+def job_posting_fields(posting: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Description, location and department of a ``JobPosting`` object.
+    
+    schema.org has no department property; ``occupationalCategory`` (or ``industry``)
+    is the closest match that career sites fill in.
+    
+    Args:
+        posting: JSON-LD ``JobPosting`` object.
+    
+    Returns:
+        Tuple[Optional[str], Optional[str], Optional[str]]: Description, location and department.
+    """
+    department = json_ld_text(posting.get("occupationalCategory")) or json_ld_text(posting.get("industry"))
+    return json_ld_text(posting.get("description")), json_ld_location(posting), department
+
+
+def _is_job_posting_list(item: Dict[str, Any]) -> bool:
+    """
+    Whether a JSON-LD object is an ``ItemList`` of ``JobPosting`` entries.
+    """
+    types = item.get("@type")
+    types = types if isinstance(types, list) else [types]
+    if "ItemList" not in types:
+        return False
+    elements = item.get("itemListElement") or []
+    elements = elements if isinstance(elements, list) else [elements]
+    for element in elements:
+        if isinstance(element, dict) and isinstance(element.get("item"), dict):
+            element = element["item"]
+        if isinstance(element, dict) and is_job_posting(element):
+            return True
+    return False
+
+
+class SchemaOrgExtractor(StructuredExtractor):
+    """
+    Career pages listing their jobs as schema.org ``JobPosting`` JSON-LD.
+    
+    Only matches when the page holds an ``ItemList`` of ``JobPosting`` entries or at
+    least ``MIN_POSTINGS`` postings with their own URL. A job detail page, or a listing
+    page marking up a single featured job, falls through to the next extractor or the
+    LLM, since its JSON-LD does not describe the whole job list.
+    """
+    
+    name = "schema.org"
+    needs_content = True
+    # 少於此數量的 JobPosting 多為詳細頁面或精選職缺，不代表完整列表
+    MIN_POSTINGS = 2
+    
+    def detect(self, url: str, content: Optional[str]) -> Optional[str]:
+        if not content or "JobPosting" not in content:
+            return None
+        
+        posting_urls = set()
+        for item in iter_json_ld(content):
+            if _is_job_posting_list(item):
+                return url
+            if is_job_posting(item) and item.get("url"):
+                posting_urls.add(str(item["url"]))
+        return url if len(posting_urls) >= self.MIN_POSTINGS else None
+    
+    async def extract(self, source: str, context: ExtractorContext) -> List[JobPosting]:
+        postings = []
+        for item in iter_json_ld(context.content or ""):
+            if not is_job_posting(item) or not item.get("url") or not item.get("title"):
+                continue
+            description, location, department = job_posting_fields(item)
+            postings.append(JobPosting(
+                company=context.company_name,
+                title=html_to_text(str(item["title"])),
+                url=str(item["url"]),
+                description=description,
+                location=location,
+                department=department,
+            ))
+        return postings
@@ -0,0 +1,163 @@
+"""
+Registry running the deterministic extractors before the LLM providers.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.services.crawler.base import canonicalize_job_postings, extract_company_from_url
+from app.services.crawler.extractors.ats import AshbyExtractor, GreenhouseExtractor, LeverExtractor, WorkableExtractor
+from app.services.crawler.extractors.base import ExtractorContext, StructuredExtractor
+from app.services.crawler.extractors.jsonld import SchemaOrgExtractor
+from app.services.crawler.models import JobPostingsResponse
+from app.services.crawler.ratelimit import PolitenessScheduler
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+
+class ExtractorRegistry:
+    """
+    Ordered set of structured extractors with a shared fast path.
+    
+    The URL-only pass costs nothing; if no extractor claims the page by URL, the page
+    HTML (from the change check or a rate limited fetch) is inspected for embedded job
+    boards and JSON-LD. Failures are logged and reported as a miss, so the caller can
+    fall back to the LLM extraction.
+    """
+    
+    def __init__(self, extractors: Sequence[StructuredExtractor], client: httpx.AsyncClient,
+                 scheduler: Optional[PolitenessScheduler] = None, timeout: float = 15.0,
+                 fetch_pages: bool = True):
+        """
+        Initialize the registry.
+        
+        Args:
+            extractors: Extractors in priority order.
+            client: Shared HTTP client.
+            scheduler: Per-domain rate limiter for career page fetches.
+            timeout: Timeout in seconds for one API request or page fetch.
+            fetch_pages: Whether to fetch the page HTML when the URL alone does not match.
+        """
+        self.extractors: List[StructuredExtractor] = list(extractors)
+        self._client = client
+        self._scheduler = scheduler
+        self.timeout = timeout
+        self.fetch_pages = fetch_pages
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._misses = 0
+    
+    def register(self, extractor: StructuredExtractor, first: bool = False) -> None:
+        """
+        Add an extractor.
+        
+        Args:
+            extractor: Extractor to add.
+            first: If True, try it before the existing extractors.
+        """
+        if first:
+            self.extractors.insert(0, extractor)
+        else:
+            self.extractors.append(extractor)
+    
+    async def extract(self, url: str, company_name: Optional[str] = None,
+                      content: Optional[str] = None) -> Optional[JobPostingsResponse]:
+        """
+        Extract job postings through the first matching extractor.
+        
+        Args:
+            url: URL of the career page.
+            company_name: Name of the company. If not provided, will be extracted from the URL.
+            content: Page HTML if already fetched (e.g. by the change check).
+        
+        Returns:
+            Optional[JobPostingsResponse]: Postings, or None if no extractor matched or
+                                           the matching extractor failed.
+        """
+        context = ExtractorContext(
+            url=url,
+            company_name=company_name or extract_company_from_url(url),
+            client=self._client,
+            timeout=self.timeout,
+            content=content,
+        )
+        
+        match = self._detect(url, None)
+        if match is None:
+            if context.content is None and self.fetch_pages:
+                context.content = await self._fetch_page(url)
+            if context.content is not None:
+                match = self._detect(url, context.content)
+        
+        if match is None:
+            self._misses += 1
+            return None
+        
+        extractor, source = match
+        stats = self._stats.setdefault(extractor.name, {"hits": 0, "failures": 0})
+        started = time.perf_counter()
+        try:
+            postings = await extractor.extract(source, context)
+        except Exception as e:
+            stats["failures"] += 1
+            logger.warning(f"{extractor.name} extractor failed for {url}, falling back to LLM: {str(e)}")
+            return None
+        
+        stats["hits"] += 1
+        postings = canonicalize_job_postings(postings, url)
+        logger.info(
+            f"Extracted {len(postings)} job postings from {url} via {extractor.name} "
+            f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+        return JobPostingsResponse(job_postings=postings, url=url, provider=extractor.name)
+    
+    def stats(self) -> Dict:
+        """
+        Get per-extractor hit and failure counters.
+        """
+        return {"extractors": dict(self._stats), "misses": self._misses}
+    
+    def _detect(self, url: str, content: Optional[str]) -> Optional[Tuple[StructuredExtractor, str]]:
+        for extractor in self.extractors:
+            if content is None and extractor.needs_content:
+                continue
+            source = extractor.detect(url, content)
+            if source is not None:
+                return extractor, source
+        return None
+    
+    async def _fetch_page(self, url: str) -> Optional[str]:
+        try:
+            if self._scheduler is not None:
+                await self._scheduler.acquire([url])
+            async with asyncio.timeout(self.timeout):
+                response = await self._client.get(url)
+            response.raise_for_status()
+        except (httpx.HTTPError, asyncio.TimeoutError) as e:
+            logger.info(f"Could not fetch {url} for structured extraction: {str(e)}")
+            return None
+        return response.text
+
+
+def create_default_registry(client: httpx.AsyncClient, scheduler: PolitenessScheduler) -> ExtractorRegistry:
+    """
+    Create the registry with the built-in extractors, ATS APIs before JSON-LD.
+    
+    Args:
+        client: Shared HTTP client.
+        scheduler: Per-domain rate limiter for career page fetches.
+    
+    Returns:
+        ExtractorRegistry: Configured registry.
+    """
+    return ExtractorRegistry(
+        [GreenhouseExtractor(), LeverExtractor(), AshbyExtractor(), WorkableExtractor(), SchemaOrgExtractor()],
+        client=client,
+        scheduler=scheduler,
+        timeout=settings.STRUCTURED_EXTRACTION_TIMEOUT,
+        fetch_pages=settings.STRUCTURED_EXTRACTION_FETCH_PAGES,
+    )
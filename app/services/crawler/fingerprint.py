@@ -0,0 +1,231 @@
+"""
+Cheap change detection for career pages, run before the LLM extraction.
+"""
+import asyncio
+import hashlib
+import html
+import logging
+import re
+import time
+from typing import Optional, Tuple
+
+import httpx
+from pydantic import BaseModel
+
+from app.services.crawler.cache import ExtractionCache
+from app.services.crawler.models import JobPostingsResponse
+from app.services.crawler.ratelimit import PolitenessScheduler
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+# 移除不影響職缺內容的區塊
+_NOISE_BLOCK_RE = re.compile(
+    r"<(script|style|noscript|svg|template)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL
+)
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_WHITESPACE_RE = re.compile(r"\s+")
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class PageFingerprint(BaseModel):
+    """
+    Fingerprint of a fetched career page.
+    """
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: str
+    # 只在設定 simhash 容許值時計算
+    simhash: Optional[int] = None
+    content_length: int
+    checked_at: float
+
+
+class FingerprintRecord(BaseModel):
+    """
+    Stored fingerprint together with the extraction result it produced.
+    """
+    fingerprint: PageFingerprint
+    result: JobPostingsResponse
+
+
+class ChangeCheck(BaseModel):
+    """
+    Outcome of a change check.
+    """
+    changed: bool
+    fingerprint: Optional[PageFingerprint] = None
+    previous_result: Optional[JobPostingsResponse] = None
+    # 頁面已變更時的 HTML，供結構化提取沿用而不必再次抓取
+    content: Optional[str] = None
+
+
+def normalize_page_text(content: str) -> str:
+    """
+    Reduce an HTML page to lowercase visible text with collapsed whitespace.
+    
+    Args:
+        content: Raw HTML.
+        
+    Returns:
+        str: Normalized text.
+    """
+    content = _NOISE_BLOCK_RE.sub(" ", content)
+    content = _COMMENT_RE.sub(" ", content)
+    content = _TAG_RE.sub(" ", content)
+    content = html.unescape(content)
+    return _WHITESPACE_RE.sub(" ", content).strip().lower()
+
+
+def simhash64(text: str, shingle_size: int = 3) -> int:
+    """
+    Compute a 64-bit simhash over word shingles.
+    
+    Near-duplicate texts produce hashes with a small Hamming distance. Note that on a
+    long listing a single added posting also barely moves the hash.
+    
+    Args:
+        text: Normalized text.
+        shingle_size: Number of words per shingle.
+        
+    Returns:
+        int: Unsigned 64-bit simhash.
+    """
+    tokens = _TOKEN_RE.findall(text)
+    if len(tokens) < shingle_size:
+        shingles = [" ".join(tokens)] if tokens else []
+    else:
+        shingles = [" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)]
+    
+    weights = [0] * 64
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """
+    Count differing bits between two 64-bit hashes.
+    """
+    return bin(a ^ b).count("1")
+
+
+class ChangeDetector:
+    """
+    Detect whether a career page changed since its last extraction.
+    
+    Uses a conditional GET (ETag / Last-Modified) when the server supports it, and
+    otherwise compares a hash of the normalized page text. A simhash tolerance can be
+    enabled for pages with volatile markup.
+    Records expire after ``max_age_seconds``, which forces a periodic re-extraction
+    even for pages whose HTML never changes (e.g. client-rendered job boards).
+    """
+    
+    def __init__(self, client: httpx.AsyncClient, store: ExtractionCache,
+                 simhash_threshold: Optional[int] = None, min_content_length: int = 500,
+                 scheduler: Optional[PolitenessScheduler] = None):
+        """
+        Initialize the change detector.
+        
+        Args:
+            client: Shared HTTP client used for the pre-check fetch.
+            store: Cache holding fingerprint records.
+            simhash_threshold: Maximum simhash Hamming distance still considered unchanged,
+                               or None to require an identical content hash.
+            min_content_length: Pages with less visible text than this are treated as
+                                changed, since they are likely JavaScript shells.
+            scheduler: Per-domain rate limiter for the pre-check fetch.
+        """
+        self._client = client
+        self._store = store
+        self.simhash_threshold = simhash_threshold
+        self.min_content_length = min_content_length
+        self._scheduler = scheduler
+    
+    async def check(self, key: str, url: str) -> ChangeCheck:
+        """
+        Fetch a page and compare it with the stored fingerprint.
+        
+        Args:
+            key: Store key for the page (URL plus extraction options).
+            url: URL of the career page.
+            
+        Returns:
+            ChangeCheck: Whether the page changed, the new fingerprint and, if unchanged,
+                         the previous extraction result.
+        """
+        previous = await self._load(key)
+        
+        headers = {}
+        if previous is not None:
+            if previous.fingerprint.etag:
+                headers["If-None-Match"] = previous.fingerprint.etag
+            if previous.fingerprint.last_modified:
+                headers["If-Modified-Since"] = previous.fingerprint.last_modified
+        
+        try:
+            if self._scheduler is not None:
+                await self._scheduler.acquire([url])
+            response = await self._client.get(url, headers=headers)
+        except httpx.HTTPError as e:
+            logger.warning(f"Change check fetch failed for URL {url}: {str(e)}")
+            return ChangeCheck(changed=True)
+        
+        if response.status_code == 304 and previous is not None:
+            logger.info(f"Page not modified (304): {url}")
+            return ChangeCheck(changed=False, fingerprint=previous.fingerprint, previous_result=previous.result)
+        
+        if response.status_code >= 400:
+            logger.warning(f"Change check got HTTP {response.status_code} for URL {url}")
+            return ChangeCheck(changed=True)
+        
+        # 正規化與雜湊為純 Python 運算，移至執行緒避免大型頁面阻塞事件迴圈
+        fingerprint, text_length = await asyncio.to_thread(self._fingerprint, url, response)
+        if previous is None or text_length < self.min_content_length:
+            return ChangeCheck(changed=True, fingerprint=fingerprint, content=response.text)
+        
+        unchanged = fingerprint.content_hash == previous.fingerprint.content_hash
+        if (not unchanged and self.simhash_threshold is not None
+                and fingerprint.simhash is not None and previous.fingerprint.simhash is not None):
+            unchanged = hamming_distance(fingerprint.simhash, previous.fingerprint.simhash) <= self.simhash_threshold
+        if unchanged:
+            logger.info(f"Page content unchanged: {url}")
+            return ChangeCheck(changed=False, fingerprint=fingerprint, previous_result=previous.result)
+        
+        return ChangeCheck(changed=True, fingerprint=fingerprint, content=response.text)
+    
+    async def record(self, key: str, fingerprint: PageFingerprint, result: JobPostingsResponse) -> None:
+        """
+        Store a fingerprint with the extraction result it produced.
+        
+        Args:
+            key: Store key for the page.
+            fingerprint: Fingerprint from the preceding change check.
+            result: Extraction result for the page.
+        """
+        record = FingerprintRecord(fingerprint=fingerprint, result=result)
+        await self._store.set(key, record.model_dump_json())
+    
+    async def _load(self, key: str) -> Optional[FingerprintRecord]:
+        payload = await self._store.get(key)
+        if payload is None:
+            return None
+        return FingerprintRecord.model_validate_json(payload)
+    
+    def _fingerprint(self, url: str, response: httpx.Response) -> Tuple[PageFingerprint, int]:
+        text = normalize_page_text(response.text)
+        fingerprint = PageFingerprint(
+            url=url,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            content_hash=hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            simhash=simhash64(text) if self.simhash_threshold is not None else None,
+            content_length=len(text),
+            checked_at=time.time(),
+        )
+        return fingerprint, len(text)
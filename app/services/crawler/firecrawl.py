@@ -1,55 +1,90 @@
 """
 FireCrawl API service for web content extraction and job posting crawling.
 """
+import asyncio
+import hashlib
 import json
 import logging
 import os
 from typing import Any, Dict, List, Optional
 
-from fastapi import HTTPException
-from pydantic import BaseModel, HttpUrl
+import httpx
+from pydantic import BaseModel
 
 from app.core.config import settings
+from app.services.crawler.archive import ArchivedResponse, ResponseArchive
+from app.services.crawler.base import (
+    CrawlerProvider,
+    canonicalize_job_postings,
+    extract_company_from_url,
+    provider_error_from_exception,
+)
+from app.services.crawler.http_client import create_http_client
+from app.services.crawler.models import JobPosting, JobPostingsResponse
 
 # 設置日誌記錄器
 logger = logging.getLogger(__name__)
 
-# 導入 FireCrawl 庫
-from firecrawl import FirecrawlApp
 
+# 直接使用成功的測試檔案中的模型和參數
+class NestedModel1(BaseModel):
+    job_title: str
+    job_url: str
 
-class JobPosting(BaseModel):
-    """
-    Job posting data model.
-    """
-    company: str
-    title: str
-    url: str
-    description: Optional[str] = None
-    location: Optional[str] = None
-    department: Optional[str] = None
 
+class ExtractSchema(BaseModel):
+    jobs: list[NestedModel1]
 
-class JobPostingsResponse(BaseModel):
-    """
-    Response model for job postings extraction.
-    """
-    job_postings: List[JobPosting]
-    url: str
-    status_code: int = 200
+
+class BatchPageModel(BaseModel):
+    page_url: str
+    jobs: list[NestedModel1]
+
+
+class BatchExtractSchema(BaseModel):
+    pages: list[BatchPageModel]
+
+
+EXTRACT_PROMPT = 'Extract job titles and their corresponding URLs from all career pages.'
+BATCH_EXTRACT_PROMPT = (
+    'For each career page URL, extract job titles and their corresponding URLs. '
+    'Return one entry per page with page_url set to the exact career page URL the jobs were found on.'
+)
+
+# 提取 prompt 與 schema 的雜湊值，用於快取鍵與版本識別
+EXTRACT_OPTIONS_HASH = hashlib.sha256(
+    json.dumps(
+        {'prompt': EXTRACT_PROMPT, 'schema': ExtractSchema.model_json_schema()},
+        sort_keys=True,
+    ).encode('utf-8')
+).hexdigest()
+BATCH_EXTRACT_OPTIONS_HASH = hashlib.sha256(
+    json.dumps(
+        {'prompt': BATCH_EXTRACT_PROMPT, 'schema': BatchExtractSchema.model_json_schema()},
+        sort_keys=True,
+    ).encode('utf-8')
+).hexdigest()
 
 
-class FirecrawlService:
+class FirecrawlService(CrawlerProvider):
     """
     Service for extracting job postings using FireCrawl API.
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    name = "firecrawl"
+    
+    def __init__(self, api_key: Optional[str] = None, timeout: Optional[float] = None,
+                 client: Optional[httpx.AsyncClient] = None, archive: Optional[ResponseArchive] = None):
         """
         Initialize the FireCrawl service.
         
         Args:
             api_key: FireCrawl API key, defaults to the one in settings.
+            timeout: Default per-call extraction timeout in seconds, defaults to
+                     FIRECRAWL_EXTRACT_TIMEOUT.
+            client: Shared HTTP client. If not provided, the service creates and
+                    owns its own pooled client.
+            archive: Archive receiving the raw extract responses, if any.
             
         Raises:
             ValueError: If no valid API key is provided or configured.
@@ -65,27 +100,54 @@ class FirecrawlService:
                 "The key should start with 'fc-'."
             )
         
-        # 初始化 FireCrawl 客戶端
-        self._client = FirecrawlApp(api_key=self.api_key)
+        self.timeout = timeout or settings.FIRECRAWL_EXTRACT_TIMEOUT
+        self.cost = settings.FIRECRAWL_PROVIDER_COST
+        self.poll_interval = settings.FIRECRAWL_POLL_INTERVAL
+        
+        self.api_url = settings.FIRECRAWL_API_URL.rstrip("/")
+        self._headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}",
+        }
+        
+        # 使用共用的非同步 HTTP 客戶端 (連線池)，避免每次請求重新建立連線
+        self._owns_client = client is None
+        self._client = client or create_http_client()
+        self.archive = archive
+        
+        # 限制單一 worker 同時進行中的提取任務數量
+        self._semaphore = asyncio.Semaphore(settings.FIRECRAWL_MAX_CONCURRENT_EXTRACTIONS)
         logger.info("FireCrawl client initialized successfully")
     
-    async def extract_job_postings(self, url: str, company_name: Optional[str] = None, debug_mode: bool = False, 
-                           append_positions_tag: bool = False) -> JobPostingsResponse:
+    async def aclose(self) -> None:
+        """
+        Close the underlying HTTP client if it is owned by this service.
+        """
+        if self._owns_client:
+            await self._client.aclose()
+    
+    async def extract_job_postings(self, url: str, company_name: Optional[str] = None,
+                           append_positions_tag: bool = False,
+                           timeout: Optional[float] = None) -> JobPostingsResponse:
         """
         Extract job postings from a company's career page.
         
         Args:
             url: The URL of the career page to extract job postings from.
             company_name: The name of the company. If not provided, will be extracted from the URL domain.
-            debug_mode: If True, save raw responses to file for analysis.
             append_positions_tag: If True, append "#positions" to the URL to improve crawling success for some sites.
+            timeout: Timeout in seconds for the whole extraction (submit and polling),
+                     defaults to the service timeout.
             
         Returns:
             JobPostingsResponse: Structured response with extracted job postings.
             
         Raises:
-            HTTPException: If the API request fails.
+            ProviderError: If the API request fails (500/502) or times out (504).
+            asyncio.CancelledError: If the awaiting task is cancelled; the in-flight
+                                    HTTP request and polling loop are aborted.
         """
+        requested_company_name = company_name
         try:
             # 如果沒有提供公司名稱，從 URL 中提取域名作為公司名稱
             if not company_name:
@@ -100,132 +162,264 @@ class FirecrawlService:
             
             logger.info(f"Extracting job postings from URL: {url}")
             
-            # 直接使用成功的測試檔案中的模型和參數
-            class NestedModel1(BaseModel):
-                job_title: str
-                job_url: str
-
-            class ExtractSchema(BaseModel):
-                jobs: list[NestedModel1]
-            
             # 構建請求選項
             options = {
-                'prompt': 'Extract job titles and their corresponding URLs from all career pages.',
+                'prompt': EXTRACT_PROMPT,
                 'schema': ExtractSchema.model_json_schema(),
             }
             
             # 發送請求到 FireCrawl API
             logger.info("Sending request to FireCrawl API...")
-            response = self._client.extract([url], options)
+            async with asyncio.timeout(timeout or self.timeout):
+                response = await self._extract([url], options)
             
-            # Debug 模式：保存原始回應到檔案
-            if debug_mode:
-                self._save_debug_response(url, json.dumps(response, indent=2))
+            # 封存原始回應，之後可重新解析而不必重新爬取
+            self._archive_response(original_url, response, EXTRACT_OPTIONS_HASH, company_name=requested_company_name)
             
             # 處理回應並轉換結構
-            job_postings = []
-            
-            # 檢查回應是否有效 (參考測試檔案的成功回應格式)
-            if response and 'data' in response and 'jobs' in response['data']:
-                jobs = response['data']['jobs']
-                
-                for job in jobs:
-                    job_posting = JobPosting(
-                        company=company_name,
-                        title=job.get('job_title', ''),
-                        url=job.get('job_url', ''),
-                        description=None,
-                        location=None,
-                        department=None
-                    )
-                    job_postings.append(job_posting)
+            job_postings = self._parse_extract_response(response, company_name, original_url)
             
             logger.info(f"Successfully extracted {len(job_postings)} job postings from URL: {url}")
             
             # 構建回應
             return JobPostingsResponse(
                 job_postings=job_postings,
-                url=original_url
+                url=original_url,
+                provider=self.name
             )
             
         except Exception as e:
             logger.error(f"Error extracting job postings from URL {url}: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to extract job postings: {str(e)}"
-            )
+            raise provider_error_from_exception(self.name, url, e)
     
-    def _save_debug_response(self, url: str, response_text: str) -> None:
+    async def extract_job_postings_batch(self, urls: List[str], append_positions_tag: bool = False,
+                                         timeout: Optional[float] = None) -> Dict[str, JobPostingsResponse]:
         """
-        Save response to a debug file for analysis.
+        Extract job postings from several career pages with a single FireCrawl request.
+        
+        FireCrawl merges multi-URL extractions into one result, so the batch schema asks
+        for the jobs grouped by source page. Pages that cannot be attributed back to one of
+        the requested URLs are left out of the result; callers should extract them one by one.
         
         Args:
-            url: The URL of the requested page.
-            response_text: The response text to save.
+            urls: Career page URLs to extract in one request.
+            append_positions_tag: If True, append "#positions" to each URL.
+            timeout: Timeout in seconds for the whole request, defaults to FIRECRAWL_BATCH_EXTRACT_TIMEOUT.
+            
+        Returns:
+            Dict[str, JobPostingsResponse]: Extraction results keyed by the requested URL.
+            
+        Raises:
+            ProviderError: If the API request fails (500/502) or times out (504).
         """
+        if len(urls) == 1:
+            # 單一 URL 無需歸屬，直接使用一般提取
+            result = await self.extract_job_postings(
+                urls[0], append_positions_tag=append_positions_tag, timeout=timeout
+            )
+            return {urls[0]: result}
+        
+        request_urls = [
+            url + "#positions" if append_positions_tag and "#positions" not in url else url
+            for url in urls
+        ]
+        
+        options = {
+            'prompt': BATCH_EXTRACT_PROMPT,
+            'schema': BatchExtractSchema.model_json_schema(),
+        }
+        
         try:
-            # 確保 data 目錄存在
-            data_dir = "./data"
-            os.makedirs(data_dir, exist_ok=True)
+            logger.info(f"Sending batch extract request for {len(urls)} URLs to FireCrawl API...")
+            async with asyncio.timeout(timeout or settings.FIRECRAWL_BATCH_EXTRACT_TIMEOUT):
+                response = await self._extract(request_urls, options)
+        except Exception as e:
+            logger.error(f"Error extracting job postings from {len(urls)} URLs: {str(e)}")
+            raise provider_error_from_exception(self.name, f"{len(urls)} URLs", e)
+        
+        self._archive_response(urls[0], response, BATCH_EXTRACT_OPTIONS_HASH, urls=urls)
+        results = self._parse_batch_response(response, urls)
+        
+        logger.info(f"Batch extraction attributed {len(results)}/{len(urls)} URLs")
+        return results
+    
+    @classmethod
+    def parse_archived(cls, record: ArchivedResponse) -> Dict[str, JobPostingsResponse]:
+        """
+        Convert an archived FireCrawl extract response into job postings again.
+        
+        Args:
+            record: Archived single-page or batch extract response.
+            
+        Returns:
+            Dict[str, JobPostingsResponse]: Results keyed by the requested page URL.
+        """
+        if record.kind == "batch":
+            return cls._parse_batch_response(record.payload, record.urls)
+        
+        company_name = record.company_name or extract_company_from_url(record.url)
+        job_postings = cls._parse_extract_response(record.payload, company_name, record.url)
+        return {record.url: JobPostingsResponse(job_postings=job_postings, url=record.url, provider=cls.name)}
+    
+    @classmethod
+    def _parse_extract_response(cls, response: Optional[Dict[str, Any]], company_name: str,
+                                page_url: str) -> List[JobPosting]:
+        """
+        Convert a completed single-page extract payload into job postings.
+        
+        Args:
+            response: Completed extract job payload.
+            company_name: Company name to attach to every posting.
+            page_url: URL of the career page.
             
-            # 從 URL 提取文件名
-            domain = url.split("//")[-1].split("/")[0]
-            filename = f"{data_dir}/{domain}_firecrawl_debug.json"
+        Returns:
+            List[JobPosting]: Converted job postings, empty if the payload has no jobs.
+        """
+        # 檢查回應是否有效 (參考測試檔案的成功回應格式)
+        if response and 'data' in response and 'jobs' in response['data']:
+            return cls._build_job_postings(response['data']['jobs'], company_name, page_url)
+        return []
+    
+    @classmethod
+    def _parse_batch_response(cls, response: Optional[Dict[str, Any]],
+                              urls: List[str]) -> Dict[str, JobPostingsResponse]:
+        """
+        Attribute the pages of a completed batch extract payload to the requested URLs.
+        
+        Args:
+            response: Completed batch extract job payload.
+            urls: Requested career page URLs.
             
-            # 保存回應
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(response_text)
-                
-            logger.info(f"Saved debug response to {filename}")
+        Returns:
+            Dict[str, JobPostingsResponse]: Results keyed by the requested URL; unattributed
+                                            pages are left out.
+        """
+        # 以正規化後的頁面 URL 對應回原始請求 URL；只差在協定或結尾斜線的 URL 共用同一頁面結果
+        urls_by_key: Dict[str, List[str]] = {}
+        for url in urls:
+            urls_by_key.setdefault(cls._page_key(url), []).append(url)
+        
+        results: Dict[str, JobPostingsResponse] = {}
+        pages = (response or {}).get('data', {}).get('pages', [])
+        for page in pages:
+            page_urls = urls_by_key.get(cls._page_key(page.get('page_url', '')))
+            if not page_urls:
+                logger.warning(f"Ignoring unattributed page in batch response: {page.get('page_url')}")
+                continue
             
-        except Exception as e:
-            logger.error(f"Failed to save debug response: {str(e)}")
+            for url in page_urls:
+                company_name = extract_company_from_url(url)
+                job_postings = cls._build_job_postings(page.get('jobs', []), company_name, url)
+                if url in results:
+                    # 同一頁面被拆成多個項目時合併
+                    results[url].job_postings.extend(job_postings)
+                else:
+                    results[url] = JobPostingsResponse(job_postings=job_postings, url=url, provider=cls.name)
+        return results
     
-    def _extract_company_from_url(self, url: str) -> str:
+    @staticmethod
+    def _build_job_postings(jobs: List[Dict[str, Any]], company_name: str,
+                            page_url: str) -> List[JobPosting]:
         """
-        Extract company name from URL domain.
+        Convert extracted job entries into job posting models with canonical URLs.
         
         Args:
-            url: The URL to extract company name from.
+            jobs: Job entries from the FireCrawl extract payload.
+            company_name: Company name to attach to every posting.
+            page_url: URL of the career page, used to resolve relative job URLs.
             
         Returns:
-            str: Extracted company name.
+            List[JobPosting]: Converted job postings, without duplicates.
         """
-        try:
-            # 從 URL 中提取域名
-            domain = url.split("//")[-1].split("/")[0]
+        return canonicalize_job_postings([
+            JobPosting(
+                company=company_name,
+                title=job.get('job_title', ''),
+                url=job.get('job_url', ''),
+                description=None,
+                location=None,
+                department=None
+            )
+            for job in jobs
+        ], page_url)
+    
+    @staticmethod
+    def _page_key(url: str) -> str:
+        """
+        Build a comparison key for a page URL, ignoring scheme, case, fragment and trailing slash.
+        
+        Args:
+            url: Page URL.
+            
+        Returns:
+            str: Normalized key.
+        """
+        url = url.split("#")[0].strip().rstrip("/")
+        return url.split("//")[-1].lower()
+    
+    async def _extract(self, urls: List[str], options: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Submit an extract job to FireCrawl and poll until it finishes.
+        
+        Args:
+            urls: URLs to extract from.
+            options: Extraction options (prompt and schema).
+            
+        Returns:
+            Dict[str, Any]: The completed extract job payload, including ``data``.
             
-            # 移除 www. 前綴和頂級域名
-            parts = domain.split(".")
-            if parts[0] == "www":
-                parts = parts[1:]
+        Raises:
+            httpx.HTTPStatusError: If FireCrawl returns an error status.
+            RuntimeError: If the extract job is rejected, fails or is cancelled.
+        """
+        async with self._semaphore:
+            response = await self._client.post(
+                f"{self.api_url}/v1/extract",
+                json={"urls": urls, **options},
+                headers=self._headers,
+            )
+            response.raise_for_status()
+            payload = response.json()
             
-            # 取出可能的公司名稱部分
-            company = parts[0]
+            if not payload.get("success"):
+                raise RuntimeError(f"FireCrawl rejected extract request: {payload.get('error')}")
             
-            # 將首字母大寫
-            return company.capitalize()
+            # 部分情況下 API 會直接回傳完成的結果
+            if payload.get("status") == "completed" or "id" not in payload:
+                return payload
             
-        except Exception as e:
-            logger.warning(f"Failed to extract company name from URL {url}: {str(e)}")
-            return "Unknown"
+            job_id = payload["id"]
+            while True:
+                status_response = await self._client.get(
+                    f"{self.api_url}/v1/extract/{job_id}",
+                    headers=self._headers,
+                )
+                status_response.raise_for_status()
+                status_data = status_response.json()
+                
+                job_status = status_data.get("status")
+                if job_status == "completed":
+                    return status_data
+                if job_status in ("failed", "cancelled"):
+                    raise RuntimeError(f"FireCrawl extract job {job_id} {job_status}: {status_data.get('error')}")
+                
+                await asyncio.sleep(self.poll_interval)
 
 
 # main
 if __name__ == "__main__":
-    import asyncio
-    
     async def main():
         print("Starting FireCrawl Service test...")
-        firecrawl_service = FirecrawlService()
+        archive = ResponseArchive(settings.RESPONSE_ARCHIVE_DIR, settings.RESPONSE_ARCHIVE_MAX_FILE_MB * 1024 * 1024)
+        firecrawl_service = FirecrawlService(archive=archive)
         
         # 測試職位提取功能
         test_url = "https://supabase.com/careers#positions"
         
-        # 啟用 debug 模式保存原始回應
+        # 原始回應寫入回應封存，可用 app.services.crawler.replay 重新解析
         print(f"Extracting job postings from {test_url}...")
         try:
-            result = await firecrawl_service.extract_job_postings(test_url, debug_mode=True)
+            result = await firecrawl_service.extract_job_postings(test_url)
             
             # 確保 data 目錄存在
             os.makedirs("./data", exist_ok=True)
@@ -259,6 +453,9 @@ if __name__ == "__main__":
             
         except Exception as e:
             print(f"Error occurred: {str(e)}")
+        finally:
+            await firecrawl_service.aclose()
+            await archive.aclose()
     
     # 執行異步主程序
     asyncio.run(main()) 
\ No newline at end of file
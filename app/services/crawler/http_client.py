@@ -0,0 +1,28 @@
+"""
+Shared HTTP client factory for crawler providers.
+"""
+import httpx
+
+from app.core.config import settings
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Create a keep-alive HTTP client with the configured connection pool limits.
+    
+    The client is meant to be created once per process and shared by all crawler
+    providers, so connections (and TLS sessions) are reused across requests.
+    
+    Returns:
+        httpx.AsyncClient: Pooled asynchronous HTTP client.
+    """
+    limits = httpx.Limits(
+        max_connections=settings.CRAWLER_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.CRAWLER_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.CRAWLER_HTTP_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(
+        settings.FIRECRAWL_REQUEST_TIMEOUT,
+        pool=settings.CRAWLER_HTTP_POOL_TIMEOUT,
+    )
+    return httpx.AsyncClient(limits=limits, timeout=timeout, follow_redirects=True)
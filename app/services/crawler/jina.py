@@ -0,0 +1,231 @@
+"""
+Jina AI Reader service for job posting crawling.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+from app.services.crawler.archive import ArchivedResponse, ResponseArchive
+from app.services.crawler.base import CrawlerProvider, extract_company_from_url, provider_error_from_exception
+from app.services.crawler.http_client import create_http_client
+from app.services.crawler.models import JobPosting, JobPostingsResponse
+from app.utils.urls import canonicalize_job_url, canonicalize_url, job_url_key
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+# Markdown 連結: [text](url "title")
+_MARKDOWN_LINK_RE = re.compile(r"\[([^\[\]]{2,200})\]\(\s*<?([^)\s>]+)>?(?:\s+\"[^\"]*\")?\s*\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+_MARKUP_RE = re.compile(r"[*_`#>]|!\[[^\]]*\]\([^)]*\)")
+
+# 職缺詳細頁面的常見 URL 樣式
+JOB_LINK_PATTERNS = re.compile(
+    r"/(jobs?|careers?|positions?|openings?|vacanc(y|ies)|opportunit(y|ies)|roles?)/[^/?#]+"
+    r"|greenhouse\.io/|lever\.co/|ashbyhq\.com/|workable\.com/|smartrecruiters\.com/"
+    r"|myworkdayjobs\.com/|recruitee\.com/|bamboohr\.com/careers/|[?&](gh_jid|jobId|job_id)=",
+    re.IGNORECASE,
+)
+
+# Reader 請求選項 (不含金鑰)；選項改變時回應格式可能不同，雜湊值記錄在回應封存中
+READER_HEADERS = {
+    "Accept": "application/json",
+    "X-With-Links-Summary": "true",
+}
+READER_OPTIONS_HASH = hashlib.sha256(json.dumps(READER_HEADERS, sort_keys=True).encode("utf-8")).hexdigest()
+
+# 非職缺的導覽連結文字
+NAVIGATION_TEXT = {
+    "apply", "apply now", "careers", "jobs", "job openings", "open positions", "open roles",
+    "view all jobs", "see all jobs", "view jobs", "see open roles", "learn more", "read more",
+    "back", "next", "previous", "home", "here", "more", "all jobs", "join us",
+}
+
+
+class JinaReaderService(CrawlerProvider):
+    """
+    Service for extracting job postings using the Jina AI Reader API.
+    
+    The Reader converts a career page into Markdown; job postings are then picked out of
+    its links with URL and link-text heuristics, which is much cheaper than an LLM
+    extraction and works well for listing pages that link to one page per job.
+    """
+    
+    name = "jina"
+    
+    def __init__(self, api_key: Optional[str] = None, timeout: Optional[float] = None,
+                 client: Optional[httpx.AsyncClient] = None, archive: Optional[ResponseArchive] = None):
+        """
+        Initialize the Jina Reader service.
+        
+        Args:
+            api_key: Jina AI API key, defaults to the one in settings.
+            timeout: Default per-call timeout in seconds, defaults to JINA_REQUEST_TIMEOUT.
+            client: Shared HTTP client. If not provided, the service creates and
+                    owns its own pooled client.
+            archive: Archive receiving the raw Reader responses, if any.
+            
+        Raises:
+            ValueError: If no valid API key is provided or configured.
+        """
+        self.api_key = api_key or settings.JINA_AI_API_KEY
+        
+        # 驗證 API 密鑰格式
+        if not self.api_key or not self.api_key.startswith('jina_'):
+            raise ValueError(
+                "Invalid or missing Jina AI API key. "
+                "Please set a valid JINA_AI_API_KEY in your .env file. "
+                "The key should start with 'jina_'."
+            )
+        
+        self.timeout = timeout or settings.JINA_REQUEST_TIMEOUT
+        self.cost = settings.JINA_PROVIDER_COST
+        self.reader_url = settings.JINA_READER_URL.rstrip("/")
+        self._headers = {"Authorization": f"Bearer {self.api_key}", **READER_HEADERS}
+        
+        self._owns_client = client is None
+        self._client = client or create_http_client()
+        self.archive = archive
+        logger.info("Jina Reader client initialized successfully")
+    
+    async def aclose(self) -> None:
+        """
+        Close the underlying HTTP client if it is owned by this service.
+        """
+        if self._owns_client:
+            await self._client.aclose()
+    
+    async def extract_job_postings(self, url: str, company_name: Optional[str] = None,
+                                   append_positions_tag: bool = False,
+                                   timeout: Optional[float] = None) -> JobPostingsResponse:
+        """
+        Extract job postings from a company's career page.
+        
+        Args:
+            url: The URL of the career page to extract job postings from.
+            company_name: The name of the company. If not provided, will be extracted from the URL domain.
+            append_positions_tag: Ignored by the Reader, kept for interface compatibility.
+            timeout: Timeout in seconds for the request, defaults to the service timeout.
+            
+        Returns:
+            JobPostingsResponse: Structured response with extracted job postings.
+            
+        Raises:
+            ProviderError: If the API request fails (500/502) or times out (504).
+        """
+        requested_company_name = company_name
+        if not company_name:
+            company_name = self._extract_company_from_url(url)
+        
+        try:
+            logger.info(f"Reading career page with Jina Reader: {url}")
+            async with asyncio.timeout(timeout or self.timeout):
+                response = await self._client.get(f"{self.reader_url}/{url}", headers=self._headers)
+                response.raise_for_status()
+            payload = response.json()
+        except Exception as e:
+            logger.error(f"Error reading URL {url} with Jina Reader: {str(e)}")
+            raise provider_error_from_exception(self.name, url, e)
+        
+        # 封存原始回應，之後可重新解析而不必重新讀取頁面
+        self._archive_response(url, payload, READER_OPTIONS_HASH, company_name=requested_company_name)
+        job_postings = self._parse_reader_response(payload, url, company_name)
+        
+        logger.info(f"Successfully extracted {len(job_postings)} job postings from URL: {url}")
+        return JobPostingsResponse(job_postings=job_postings, url=url, provider=self.name)
+    
+    @classmethod
+    def parse_archived(cls, record: ArchivedResponse) -> Dict[str, JobPostingsResponse]:
+        """
+        Convert an archived Reader response into job postings again.
+        
+        Args:
+            record: Archived Reader response.
+            
+        Returns:
+            Dict[str, JobPostingsResponse]: Result keyed by the requested page URL.
+        """
+        company_name = record.company_name or extract_company_from_url(record.url)
+        job_postings = cls._parse_reader_response(record.payload, record.url, company_name)
+        return {record.url: JobPostingsResponse(job_postings=job_postings, url=record.url, provider=cls.name)}
+    
+    @classmethod
+    def _parse_reader_response(cls, payload: Optional[Dict], page_url: str, company_name: str) -> List[JobPosting]:
+        """
+        Convert a Reader JSON payload into job postings.
+        
+        Args:
+            payload: Decoded Reader response.
+            page_url: URL of the career page.
+            company_name: Company name to attach to every posting.
+            
+        Returns:
+            List[JobPosting]: Job postings in page order, without duplicates.
+        """
+        data = (payload or {}).get("data") or {}
+        return cls._build_job_postings(
+            page_url,
+            company_name,
+            data.get("content") or "",
+            data.get("links") or {},
+        )
+    
+    @classmethod
+    def _build_job_postings(cls, page_url: str, company_name: str, content: str,
+                            links: object) -> List[JobPosting]:
+        """
+        Pick job posting links out of the Reader output.
+        
+        Args:
+            page_url: URL of the career page, used to resolve relative links.
+            company_name: Company name to attach to every posting.
+            content: Markdown content of the page.
+            links: Links summary, either a ``{text: url}`` mapping or a list of ``[text, url]`` pairs.
+            
+        Returns:
+            List[JobPosting]: Job postings in page order, without duplicates.
+        """
+        candidates: List[tuple] = [(m.group(1), m.group(2)) for m in _MARKDOWN_LINK_RE.finditer(content)]
+        if isinstance(links, dict):
+            candidates.extend(links.items())
+        elif isinstance(links, list):
+            candidates.extend(tuple(item[:2]) for item in links if isinstance(item, (list, tuple)) and len(item) >= 2)
+        
+        page_key = canonicalize_url(page_url)
+        seen: Dict[str, JobPosting] = {}
+        for text, href in candidates:
+            title = cls._clean_title(text)
+            job_url = canonicalize_job_url(href, page_url)
+            key = job_url_key(job_url)
+            
+            if job_url is None or key == page_key or key in seen:
+                continue
+            if not cls._looks_like_job(title, job_url):
+                continue
+            
+            seen[key] = JobPosting(company=company_name, title=title, url=job_url)
+        
+        return list(seen.values())
+    
+    @staticmethod
+    def _clean_title(text: str) -> str:
+        text = _MARKUP_RE.sub(" ", text)
+        return _WHITESPACE_RE.sub(" ", text).strip()
+    
+    @staticmethod
+    def _looks_like_job(title: str, job_url: str) -> bool:
+        """
+        Decide whether a link points to an individual job posting.
+        """
+        if not 3 <= len(title) <= 150 or title.lower() in NAVIGATION_TEXT:
+            return False
+        if urlsplit(job_url).scheme not in ("http", "https"):
+            return False
+        return bool(JOB_LINK_PATTERNS.search(job_url))
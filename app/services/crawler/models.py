@@ -0,0 +1,39 @@
+"""
+Data models shared by the crawler providers.
+"""
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class JobPosting(BaseModel):
+    """
+    Job posting data model.
+    """
+    company: str
+    title: str
+    url: str
+    description: Optional[str] = None
+    location: Optional[str] = None
+    department: Optional[str] = None
+
+
+class JobPostingsResponse(BaseModel):
+    """
+    Response model for job postings extraction.
+    """
+    job_postings: List[JobPosting]
+    url: str
+    status_code: int = 200
+    # 頁面自上次提取後未變更時為 False (沿用上次結果)
+    changed: bool = True
+    # 產生此結果的爬蟲服務名稱
+    provider: Optional[str] = None
+
+
+class BatchJobPostingsResponse(BaseModel):
+    """
+    Response model for a batch extraction, with per-URL results and errors.
+    """
+    results: Dict[str, JobPostingsResponse] = {}
+    errors: Dict[str, str] = {}
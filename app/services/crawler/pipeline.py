@@ -0,0 +1,287 @@
+"""
+Streaming pipeline of async stages joined by bounded queues.
+"""
+import asyncio
+import inspect
+import logging
+import time
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+# 串流結束標記，每個下游 worker 各收到一個
+_DONE = object()
+
+
+class Stage:
+    """
+    One step of a pipeline.
+    
+    ``fn`` is called per item and may be:
+    
+    - a coroutine function returning one output (``None`` drops the item),
+    - an async generator function yielding any number of outputs, or
+    - with ``batch_size > 1``, a coroutine function taking a list of up to
+      ``batch_size`` items and returning an iterable of outputs.
+    
+    An exception raised for an item (or batch) is logged and counted, and the item is
+    dropped; the pipeline keeps going.
+    """
+    
+    def __init__(self, name: str, fn: Callable, concurrency: int = 1, queue_size: Optional[int] = None,
+                 batch_size: int = 1, batch_timeout: float = 0.5):
+        """
+        Initialize the stage.
+        
+        Args:
+            name: Stage name used in stats and logs.
+            fn: Item (or batch) handler, see the class docstring.
+            concurrency: Number of workers running ``fn`` at the same time.
+            queue_size: Capacity of the stage's input queue, defaults to the pipeline's.
+            batch_size: Maximum items handed to ``fn`` at once; 1 disables batching.
+            batch_timeout: Seconds to wait for a batch to fill before running a partial one.
+        """
+        self.name = name
+        self.fn = fn
+        self.concurrency = max(1, concurrency)
+        self.queue_size = queue_size
+        self.batch_size = max(1, batch_size)
+        self.batch_timeout = batch_timeout
+        self.streaming = inspect.isasyncgenfunction(fn)
+        
+        self.received = 0
+        self.emitted = 0
+        self.errors = 0
+        # 執行 fn 的時間，以及等待下游佇列空位 (背壓) 的時間
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.max_queue_depth = 0
+        self.inbox: Optional[asyncio.Queue] = None
+
+
+class Pipeline:
+    """
+    Run items from an async source through a chain of stages.
+    
+    Every stage reads from its own bounded queue, so a slow stage fills its queue and
+    then blocks the stage before it, all the way back to the source. At most
+    ``queue_size + concurrency x batch_size`` items per stage are in memory at any time,
+    no matter how many items the source produces.
+    
+    Iterate over the pipeline to consume the outputs of the last stage, or call
+    ``run`` to drain it. A pipeline runs once.
+    """
+    
+    def __init__(self, source: AsyncIterable, stages: Sequence[Stage], queue_size: int = 100,
+                 progress_interval: Optional[float] = None, name: str = "pipeline"):
+        """
+        Initialize the pipeline.
+        
+        Args:
+            source: Async iterable producing the input items.
+            stages: Stages in processing order.
+            queue_size: Default capacity of each stage's input queue and of the output queue.
+            progress_interval: Seconds between progress log lines, or None to disable them.
+            name: Pipeline name used in logs.
+        """
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.source = source
+        self.stages = list(stages)
+        self.queue_size = queue_size
+        self.progress_interval = progress_interval
+        self.name = name
+        
+        self.produced = 0
+        self._output: Optional[asyncio.Queue] = None
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._tasks: List[asyncio.Task] = []
+        self._source_error: Optional[BaseException] = None
+    
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        if self._started_at is not None:
+            raise RuntimeError(f"{self.name} has already run")
+        self._start()
+        try:
+            while True:
+                item = await self._output.get()
+                if item is _DONE:
+                    break
+                yield item
+            if self._source_error is not None:
+                raise self._source_error
+        finally:
+            self._finished_at = time.perf_counter()
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            logger.info(f"{self.name} finished: {self._summary()}")
+    
+    async def run(self) -> Dict[str, Any]:
+        """
+        Run the pipeline to completion, discarding the outputs of the last stage.
+        
+        Returns:
+            Dict[str, Any]: Final stats, see ``stats``.
+        
+        Raises:
+            Exception: The exception raised by the source, after the items read
+                       before it have gone through the pipeline.
+        """
+        async for _ in self:
+            pass
+        return self.stats()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get per-stage counters, throughput and queue depth.
+        
+        Returns:
+            Dict[str, Any]: ``elapsed`` seconds, ``produced`` source items and a
+                            ``stages`` mapping of stage name to its counters.
+        """
+        if self._started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self._finished_at or time.perf_counter()) - self._started_at
+        return {
+            "elapsed": round(elapsed, 3),
+            "produced": self.produced,
+            "stages": {
+                stage.name: {
+                    "concurrency": stage.concurrency,
+                    "batch_size": stage.batch_size,
+                    "received": stage.received,
+                    "emitted": stage.emitted,
+                    "errors": stage.errors,
+                    "throughput": round(stage.received / elapsed, 2) if elapsed else 0.0,
+                    "queue_depth": stage.inbox.qsize() if stage.inbox is not None else 0,
+                    "max_queue_depth": stage.max_queue_depth,
+                    "busy_seconds": round(stage.busy_seconds, 3),
+                    "blocked_seconds": round(stage.blocked_seconds, 3),
+                }
+                for stage in self.stages
+            },
+        }
+    
+    def _start(self) -> None:
+        self._started_at = time.perf_counter()
+        for stage in self.stages:
+            stage.inbox = asyncio.Queue(maxsize=stage.queue_size or self.queue_size)
+        self._output = asyncio.Queue(maxsize=self.queue_size)
+        
+        self._tasks.append(asyncio.create_task(self._feed()))
+        for index, stage in enumerate(self.stages):
+            downstream = self.stages[index + 1] if index + 1 < len(self.stages) else None
+            outbox = downstream.inbox if downstream is not None else self._output
+            consumers = downstream.concurrency if downstream is not None else 1
+            remaining = [stage.concurrency]
+            for _ in range(stage.concurrency):
+                self._tasks.append(asyncio.create_task(self._work(stage, outbox, downstream, consumers, remaining)))
+        if self.progress_interval:
+            self._tasks.append(asyncio.create_task(self._report()))
+    
+    async def _feed(self) -> None:
+        first = self.stages[0]
+        try:
+            async for item in self.source:
+                self.produced += 1
+                await first.inbox.put(item)
+                first.max_queue_depth = max(first.max_queue_depth, first.inbox.qsize())
+        except Exception as e:
+            # 來源失敗時讓已讀取的項目處理完，再由迭代者拋出
+            logger.error(f"{self.name} source failed after {self.produced} items: {str(e)}")
+            self._source_error = e
+        # 取消時不送出結束標記 (佇列可能已滿)
+        for _ in range(first.concurrency):
+            await first.inbox.put(_DONE)
+    
+    async def _work(self, stage: Stage, outbox: asyncio.Queue, downstream: Optional[Stage],
+                    consumers: int, remaining: List[int]) -> None:
+        done = False
+        while not done:
+            batch, done = await self._take(stage)
+            if batch:
+                await self._process(stage, batch, outbox, downstream)
+        
+        # 本階段最後一個 worker 結束時通知下游
+        remaining[0] -= 1
+        if remaining[0] == 0:
+            for _ in range(consumers):
+                await outbox.put(_DONE)
+    
+    async def _take(self, stage: Stage) -> Tuple[List[Any], bool]:
+        item = await stage.inbox.get()
+        if item is _DONE:
+            return [], True
+        batch = [item]
+        if stage.batch_size == 1:
+            return batch, False
+        
+        deadline = time.monotonic() + stage.batch_timeout
+        while len(batch) < stage.batch_size:
+            if stage.inbox.empty():
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(stage.inbox.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = stage.inbox.get_nowait()
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+    
+    async def _process(self, stage: Stage, batch: List[Any], outbox: asyncio.Queue,
+                       downstream: Optional[Stage]) -> None:
+        stage.received += len(batch)
+        started = time.perf_counter()
+        blocked = 0.0
+        try:
+            if stage.batch_size > 1:
+                outputs = list(await stage.fn(batch) or [])
+                stage.busy_seconds += time.perf_counter() - started
+                for output in outputs:
+                    await self._emit(stage, output, outbox, downstream)
+            elif stage.streaming:
+                # 產生器在輸出時即送往下游，下游滿載時暫停產生
+                async for output in stage.fn(batch[0]):
+                    emit_started = time.perf_counter()
+                    await self._emit(stage, output, outbox, downstream)
+                    blocked += time.perf_counter() - emit_started
+                stage.busy_seconds += time.perf_counter() - started - blocked
+            else:
+                output = await stage.fn(batch[0])
+                stage.busy_seconds += time.perf_counter() - started
+                if output is not None:
+                    await self._emit(stage, output, outbox, downstream)
+        except Exception as e:
+            stage.errors += 1
+            logger.error(f"{self.name} stage {stage.name} failed on {len(batch)} items: {str(e)}")
+    
+    async def _emit(self, stage: Stage, output: Any, outbox: asyncio.Queue, downstream: Optional[Stage]) -> None:
+        started = time.perf_counter()
+        await outbox.put(output)
+        stage.blocked_seconds += time.perf_counter() - started
+        stage.emitted += 1
+        if downstream is not None:
+            downstream.max_queue_depth = max(downstream.max_queue_depth, outbox.qsize())
+    
+    async def _report(self) -> None:
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            logger.info(f"{self.name} progress: {self._summary()}")
+    
+    def _summary(self) -> str:
+        stats = self.stats()
+        stages = ", ".join(
+            f"{name} {values['received']}/{values['emitted']} "
+            f"(q={values['queue_depth']}, err={values['errors']}, {values['throughput']}/s)"
+            for name, values in stats["stages"].items()
+        )
+        return f"{stats['produced']} items in {stats['elapsed']:.1f}s; {stages}"
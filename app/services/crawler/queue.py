@@ -0,0 +1,354 @@
+"""
+Durable crawl job queue backed by the database.
+"""
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional, Set
+
+from sqlalchemy import and_, create_engine, event, func, or_, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.db.base import Base
+from app.models.crawl_job import (
+    CRAWL_JOB_ACTIVE_STATUSES,
+    CRAWL_JOB_FAILED,
+    CRAWL_JOB_QUEUED,
+    CRAWL_JOB_RUNNING,
+    CRAWL_JOB_SUCCEEDED,
+    CrawlJob,
+)
+from app.schemas.crawl_job import CrawlJobRead
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+
+def utcnow() -> datetime:
+    """
+    Current time in UTC.
+    """
+    return datetime.now(timezone.utc)
+
+
+def _insert(session: Session):
+    # 依資料庫方言選擇支援 ON CONFLICT 的 insert
+    if session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def create_queue_session_factory(database_url: Optional[str] = None) -> sessionmaker:
+    """
+    Create the session factory used by the crawl queue.
+    
+    When CRAWL_QUEUE_DATABASE_URL is set the queue gets its own engine; a SQLite URL
+    gives a local stand-in whose table is created on the fly. Otherwise the queue
+    shares the application database.
+    
+    Args:
+        database_url: Queue database URL, defaults to CRAWL_QUEUE_DATABASE_URL.
+        
+    Returns:
+        sessionmaker: Session factory bound to the queue database.
+    """
+    database_url = database_url or settings.CRAWL_QUEUE_DATABASE_URL
+    if not database_url:
+        from app.db.session import SessionLocal
+        return SessionLocal
+    
+    if database_url.startswith("sqlite"):
+        path = database_url.split("///", 1)[-1]
+        if path and path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        engine = create_engine(database_url, connect_args={"check_same_thread": False, "timeout": 30})
+        
+        @event.listens_for(engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, _):
+            # WAL 讓多個 worker 處理程序可同時讀取
+            dbapi_connection.execute("PRAGMA journal_mode=WAL")
+            dbapi_connection.execute("PRAGMA busy_timeout=30000")
+        
+        Base.metadata.create_all(engine, tables=[CrawlJob.__table__])
+    else:
+        engine = create_engine(database_url, pool_pre_ping=True)
+    
+    return sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+
+class CrawlQueue:
+    """
+    Database-backed crawl queue.
+    
+    Workers claim jobs with ``SELECT ... FOR UPDATE SKIP LOCKED`` on PostgreSQL; the
+    claim is also guarded by a conditional update so the SQLite stand-in (which ignores
+    row locks) never hands the same job to two workers. A claimed job is leased for
+    ``lease_seconds``; jobs whose worker died are reclaimed once the lease expires.
+    """
+    
+    def __init__(self, session_factory: sessionmaker, lease_seconds: float = 300.0,
+                 max_attempts: int = 3, retry_delay: float = 60.0):
+        """
+        Initialize the queue.
+        
+        Args:
+            session_factory: Session factory bound to the queue database.
+            lease_seconds: How long a claimed job stays reserved without a heartbeat.
+            max_attempts: Attempts before a job is marked as failed.
+            retry_delay: Base delay in seconds before a failed attempt is retried.
+        """
+        self._session_factory = session_factory
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+    
+    @property
+    def session_factory(self) -> sessionmaker:
+        """
+        Session factory bound to the queue database.
+        """
+        return self._session_factory
+    
+    def active_page_ids(self, page_ids: Iterable[uuid.UUID]) -> Set[uuid.UUID]:
+        """
+        Get which of the given tracked pages have a queued or running job.
+        
+        Args:
+            page_ids: IDs of tracked pages.
+            
+        Returns:
+            Set[uuid.UUID]: IDs of the pages with an active job.
+        """
+        page_ids = list(page_ids)
+        if not page_ids:
+            return set()
+        
+        with self._session_factory() as session:
+            return set(session.scalars(
+                select(CrawlJob.tracked_page_id).where(
+                    CrawlJob.tracked_page_id.in_(page_ids),
+                    CrawlJob.status.in_(CRAWL_JOB_ACTIVE_STATUSES),
+                )
+            ))
+    
+    def enqueue(self, url: str, company_name: Optional[str] = None, append_positions_tag: bool = False,
+                force_refresh: bool = False, tracked_page_id: Optional[uuid.UUID] = None,
+                priority: int = 0) -> CrawlJobRead:
+        """
+        Add a crawl job to the queue.
+        
+        Args:
+            url: URL of the career page.
+            company_name: Name of the company.
+            append_positions_tag: If True, append "#positions" to the URL.
+            force_refresh: If True, bypass the cache and change detection.
+            tracked_page_id: Tracked page the job belongs to, if any.
+            priority: Higher priorities are claimed first.
+            
+        Returns:
+            CrawlJobRead: The queued job.
+        """
+        with self._session_factory() as session, session.begin():
+            job = CrawlJob(
+                url=url,
+                company_name=company_name,
+                append_positions_tag=append_positions_tag,
+                force_refresh=force_refresh,
+                tracked_page_id=tracked_page_id,
+                priority=priority,
+                max_attempts=self.max_attempts,
+                available_at=utcnow(),
+            )
+            session.add(job)
+            session.flush()
+            return CrawlJobRead.model_validate(job)
+    
+    def enqueue_pages(self, pages: Iterable[Dict[str, Any]], priority: int = 0) -> int:
+        """
+        Enqueue crawl jobs for tracked pages that do not already have an active job.
+        
+        Args:
+            pages: Dicts with ``id``, ``url`` and ``company_name`` of tracked pages.
+            priority: Priority of the new jobs.
+            
+        Returns:
+            int: Number of jobs enqueued.
+        """
+        # 同一頁面只取第一筆
+        unique: Dict[Any, Dict[str, Any]] = {}
+        for page in pages:
+            unique.setdefault(page["id"], page)
+        if not unique:
+            return 0
+        
+        now = utcnow()
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "url": page["url"],
+                "company_name": page.get("company_name"),
+                "tracked_page_id": page["id"],
+                "priority": priority,
+                "max_attempts": self.max_attempts,
+                "available_at": now,
+            }
+            for page in unique.values()
+        ]
+        # 已有進行中工作的頁面由部分唯一索引擋下，併發的排程器不會因此失敗
+        with self._session_factory() as session, session.begin():
+            insert = _insert(session)
+            result = session.execute(
+                insert(CrawlJob).values(rows).on_conflict_do_nothing(
+                    index_elements=["tracked_page_id"],
+                    index_where=CrawlJob.status.in_(CRAWL_JOB_ACTIVE_STATUSES),
+                )
+            )
+        return result.rowcount
+    
+    def claim(self, worker_id: str) -> Optional[CrawlJobRead]:
+        """
+        Claim the next available job.
+        
+        Args:
+            worker_id: Identifier of the claiming worker.
+            
+        Returns:
+            Optional[CrawlJobRead]: The claimed job, or None if the queue is empty.
+        """
+        # 少數情況下候選工作會被其他 worker 搶先領取，重試幾次
+        for _ in range(5):
+            now = utcnow()
+            with self._session_factory() as session, session.begin():
+                job = session.scalars(
+                    select(CrawlJob)
+                    .where(or_(
+                        and_(CrawlJob.status == CRAWL_JOB_QUEUED, CrawlJob.available_at <= now),
+                        and_(CrawlJob.status == CRAWL_JOB_RUNNING, CrawlJob.locked_until < now),
+                    ))
+                    .order_by(CrawlJob.priority.desc(), CrawlJob.available_at)
+                    .limit(1)
+                    .with_for_update(skip_locked=True)
+                ).first()
+                if job is None:
+                    return None
+                
+                guard = and_(
+                    CrawlJob.id == job.id,
+                    CrawlJob.status == job.status,
+                    CrawlJob.attempts == job.attempts,
+                )
+                
+                if job.attempts >= job.max_attempts:
+                    # 租約逾期且已用盡重試次數
+                    session.execute(
+                        update(CrawlJob).where(guard).values(
+                            status=CRAWL_JOB_FAILED,
+                            error=job.error or "Worker lease expired",
+                            locked_until=None,
+                            finished_at=now,
+                        ).execution_options(synchronize_session=False)
+                    )
+                    continue
+                
+                claimed = session.execute(
+                    update(CrawlJob).where(guard).values(
+                        status=CRAWL_JOB_RUNNING,
+                        attempts=job.attempts + 1,
+                        worker_id=worker_id,
+                        locked_until=now + timedelta(seconds=self.lease_seconds),
+                        started_at=now,
+                    ).execution_options(synchronize_session=False)
+                )
+                if claimed.rowcount != 1:
+                    continue
+                
+                session.refresh(job)
+                return CrawlJobRead.model_validate(job)
+        return None
+    
+    def heartbeat(self, job_id: uuid.UUID, worker_id: str) -> bool:
+        """
+        Extend the lease of a running job.
+        
+        Returns:
+            bool: False if the job is no longer held by this worker.
+        """
+        with self._session_factory() as session, session.begin():
+            result = session.execute(
+                update(CrawlJob)
+                .where(CrawlJob.id == job_id, CrawlJob.worker_id == worker_id, CrawlJob.status == CRAWL_JOB_RUNNING)
+                .values(locked_until=utcnow() + timedelta(seconds=self.lease_seconds))
+                .execution_options(synchronize_session=False)
+            )
+            return result.rowcount == 1
+    
+    def complete(self, job_id: uuid.UUID, worker_id: str, result: Dict[str, Any]) -> bool:
+        """
+        Mark a job as succeeded and store its result.
+        
+        Returns:
+            bool: False if the job is no longer held by this worker.
+        """
+        with self._session_factory() as session, session.begin():
+            updated = session.execute(
+                update(CrawlJob)
+                .where(CrawlJob.id == job_id, CrawlJob.worker_id == worker_id, CrawlJob.status == CRAWL_JOB_RUNNING)
+                .values(
+                    status=CRAWL_JOB_SUCCEEDED,
+                    result=result,
+                    error=None,
+                    locked_until=None,
+                    finished_at=utcnow(),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            return updated.rowcount == 1
+    
+    def fail(self, job_id: uuid.UUID, worker_id: str, error: str, retryable: bool = True) -> Optional[str]:
+        """
+        Record a failed attempt, re-queueing the job with backoff while attempts remain.
+        
+        Args:
+            job_id: ID of the job.
+            worker_id: Identifier of the worker holding the job.
+            error: Error message to store.
+            retryable: If False, the job fails immediately.
+            
+        Returns:
+            Optional[str]: The job's new status, or None if it is no longer held by this worker.
+        """
+        now = utcnow()
+        with self._session_factory() as session, session.begin():
+            job = session.get(CrawlJob, job_id)
+            if job is None or job.worker_id != worker_id or job.status != CRAWL_JOB_RUNNING:
+                return None
+            
+            job.error = error
+            job.locked_until = None
+            if not retryable or job.attempts >= job.max_attempts:
+                job.status = CRAWL_JOB_FAILED
+                job.finished_at = now
+            else:
+                job.status = CRAWL_JOB_QUEUED
+                job.available_at = now + timedelta(seconds=self.retry_delay * 2 ** (job.attempts - 1))
+            return job.status
+    
+    def get(self, job_id: uuid.UUID) -> Optional[CrawlJobRead]:
+        """
+        Get a job by ID.
+        """
+        with self._session_factory() as session:
+            job = session.get(CrawlJob, job_id)
+            return CrawlJobRead.model_validate(job) if job is not None else None
+    
+    def counts(self) -> Dict[str, int]:
+        """
+        Count jobs per status.
+        """
+        with self._session_factory() as session:
+            rows = session.execute(select(CrawlJob.status, func.count()).group_by(CrawlJob.status))
+            return {status: count for status, count in rows}
@@ -0,0 +1,235 @@
+"""
+Per-domain and per-provider rate limiting with retries for crawler requests.
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple, TypeVar
+from urllib.parse import urlsplit
+
+from app.services.crawler.base import ProviderError
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """
+    Asynchronous token bucket.
+    
+    Waiters are served in FIFO order. ``block_for`` pauses the bucket entirely, which is
+    used to honour a server's Retry-After.
+    """
+    
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize the bucket.
+        
+        Args:
+            rate: Tokens added per second.
+            capacity: Maximum number of tokens (burst size).
+        """
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self) -> float:
+        """
+        Take one token, waiting until one is available.
+        
+        Returns:
+            float: Seconds spent waiting.
+        """
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return time.monotonic() - started
+                
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+    
+    def block_for(self, seconds: float) -> None:
+        """
+        Stop handing out tokens for the given number of seconds.
+        """
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+    
+    @property
+    def idle(self) -> bool:
+        """
+        Whether the bucket is full and unblocked, i.e. safe to discard.
+        """
+        now = time.monotonic()
+        tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        return tokens >= self.capacity and now >= self._blocked_until and not self._lock.locked()
+
+
+def url_domain(url: str) -> str:
+    """
+    Get the lowercase host of a URL.
+    """
+    return (urlsplit(url).hostname or "").lower()
+
+
+class PolitenessScheduler:
+    """
+    Rate limit crawler requests per target domain and per provider, with retries.
+    
+    Limits are per process. Retryable provider errors are retried with exponential
+    backoff and full jitter; a Retry-After hint takes precedence and also pauses the
+    affected bucket so concurrent requests back off together instead of piling up 429s.
+    """
+    
+    def __init__(self, domain_rate: Optional[float], domain_burst: float,
+                 provider_limits: Dict[str, Tuple[float, float]], max_retries: int = 3,
+                 retry_base_delay: float = 1.0, retry_max_delay: float = 60.0,
+                 max_domains: int = 10000):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            domain_rate: Requests per second allowed per target domain, or None for no limit.
+            domain_burst: Burst size per target domain.
+            provider_limits: ``{provider: (rate, burst)}`` limits per provider.
+            max_retries: Retries after the first attempt for retryable errors.
+            retry_base_delay: Base delay of the exponential backoff in seconds.
+            retry_max_delay: Longest delay to wait before retrying; longer Retry-After
+                             hints fail immediately so the caller can fail over.
+            max_domains: Maximum number of domain buckets kept in memory.
+        """
+        self.domain_rate = domain_rate
+        self.domain_burst = domain_burst
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.max_domains = max_domains
+        
+        self._domains: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._providers = {
+            name: TokenBucket(rate, burst) for name, (rate, burst) in provider_limits.items() if rate
+        }
+        self._stats = {"acquired": 0, "wait_seconds": 0.0, "retries": 0, "throttled": 0}
+    
+    async def acquire(self, urls: Sequence[str], provider: Optional[str] = None) -> None:
+        """
+        Wait for permission to request the given URLs, optionally through a provider.
+        
+        Args:
+            urls: Target URLs; one token is taken from each distinct domain.
+            provider: Provider name, or None for direct fetches.
+        """
+        waited = 0.0
+        for domain in sorted({url_domain(url) for url in urls}):
+            bucket = self._domain_bucket(domain)
+            if bucket is not None:
+                waited += await bucket.acquire()
+        
+        bucket = self._providers.get(provider) if provider else None
+        if bucket is not None:
+            waited += await bucket.acquire()
+        
+        self._stats["acquired"] += 1
+        self._stats["wait_seconds"] += waited
+    
+    async def run(self, call: Callable[[], Awaitable[T]], urls: Sequence[str],
+                  provider: Optional[str] = None, rate_limited_only: bool = False) -> T:
+        """
+        Run a request under the rate limits, retrying retryable failures.
+        
+        Args:
+            call: Factory creating the request coroutine; called once per attempt.
+            urls: Target URLs of the request.
+            provider: Provider name, or None for direct fetches.
+            rate_limited_only: If True, only retry 429 and Retry-After responses; other
+                               errors are raised at once so the caller can fail over.
+            
+        Returns:
+            The result of the first successful attempt.
+            
+        Raises:
+            Exception: The last error if it is not retryable or retries are exhausted.
+        """
+        attempt = 0
+        while True:
+            await self.acquire(urls, provider)
+            try:
+                return await call()
+            except ProviderError as e:
+                rate_limited = e.upstream_status == 429 or e.retry_after is not None
+                if not e.retryable or attempt >= self.max_retries or (rate_limited_only and not rate_limited):
+                    raise
+                
+                if e.retry_after is not None:
+                    if e.retry_after > self.retry_max_delay:
+                        raise
+                    delay = e.retry_after
+                else:
+                    # 指數退避加上完全隨機抖動
+                    delay = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+                
+                if rate_limited:
+                    self._throttle(urls, provider, delay)
+                
+                attempt += 1
+                self._stats["retries"] += 1
+                logger.info(
+                    f"Retrying {provider or 'request'} for {urls[0]} in {delay:.1f}s "
+                    f"(attempt {attempt}/{self.max_retries}): {e.detail}"
+                )
+                await asyncio.sleep(delay)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get scheduler counters.
+        """
+        return {**self._stats, "domains_tracked": len(self._domains)}
+    
+    def _throttle(self, urls: Sequence[str], provider: Optional[str], delay: float) -> None:
+        """
+        Pause the buckets involved in a throttled request.
+        """
+        self._stats["throttled"] += 1
+        bucket = self._providers.get(provider) if provider else None
+        if bucket is not None:
+            bucket.block_for(delay)
+        else:
+            for domain in {url_domain(url) for url in urls}:
+                domain_bucket = self._domain_bucket(domain)
+                if domain_bucket is not None:
+                    domain_bucket.block_for(delay)
+    
+    def _domain_bucket(self, domain: str) -> Optional[TokenBucket]:
+        """
+        Get or create the bucket of a domain, discarding idle buckets beyond the limit.
+        """
+        if not self.domain_rate or not domain:
+            return None
+        
+        bucket = self._domains.get(domain)
+        if bucket is None:
+            bucket = TokenBucket(self.domain_rate, self.domain_burst)
+            self._domains[domain] = bucket
+            while len(self._domains) > self.max_domains:
+                oldest, oldest_bucket = next(iter(self._domains.items()))
+                if not oldest_bucket.idle:
+                    break
+                del self._domains[oldest]
+        else:
+            self._domains.move_to_end(domain)
+        return bucket
@@ -0,0 +1,120 @@
+"""
+Re-parse archived provider responses without crawling again.
+
+Usage:
+    python -m app.services.crawler.replay --provider firecrawl --since 2024-01-01 --latest --output data/replay.jsonl
+"""
+import argparse
+import json
+import logging
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Tuple, Type
+
+from app.core.config import settings
+from app.services.crawler.archive import ArchivedResponse, iter_archived_responses
+from app.services.crawler.base import CrawlerProvider
+from app.services.crawler.firecrawl import FirecrawlService
+from app.services.crawler.jina import JinaReaderService
+from app.services.crawler.models import JobPostingsResponse
+from app.utils.urls import canonicalize_url, normalize_url
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+# 可重新解析的服務 (解析邏輯為各服務的 parse_archived)
+REPLAY_PROVIDERS: Dict[str, Type[CrawlerProvider]] = {
+    FirecrawlService.name: FirecrawlService,
+    JinaReaderService.name: JinaReaderService,
+}
+
+
+def replay_archive(directory: str, provider: Optional[str] = None, url: Optional[str] = None,
+                   since: Optional[datetime] = None, schema_hash: Optional[str] = None,
+                   latest: bool = False) -> Iterator[Tuple[ArchivedResponse, JobPostingsResponse]]:
+    """
+    Run the current response-to-posting conversion over archived responses.
+    
+    Args:
+        directory: Archive directory.
+        provider: Only responses of this provider.
+        url: Only responses for this career page.
+        since: Only responses archived at or after this time.
+        schema_hash: Only responses produced with these extraction options.
+        latest: If True, only the most recent response of each page is replayed.
+    
+    Returns:
+        Iterator[Tuple[ArchivedResponse, JobPostingsResponse]]: Archived response and
+            re-parsed result, one per page (batch responses yield one per attributed page).
+    """
+    newest: Dict[str, Tuple[ArchivedResponse, JobPostingsResponse]] = {}
+    
+    for record in iter_archived_responses(directory, provider=provider, url=url, since=since,
+                                          schema_hash=schema_hash):
+        parser = REPLAY_PROVIDERS.get(record.provider)
+        if parser is None:
+            logger.warning(f"No replay parser for provider {record.provider}, skipping {record.url}")
+            continue
+        try:
+            results = parser.parse_archived(record)
+        except Exception as e:
+            logger.error(f"Failed to replay {record.provider} response for {record.url}: {str(e)}")
+            continue
+        
+        for page_url, response in results.items():
+            if latest:
+                newest[canonicalize_url(page_url) or normalize_url(page_url)] = (record, response)
+            else:
+                yield record, response
+    
+    yield from newest.values()
+
+
+def main() -> None:
+    """
+    Replay an archive and print a summary, optionally writing the re-parsed postings.
+    """
+    parser = argparse.ArgumentParser(description="Re-parse archived crawler provider responses")
+    parser.add_argument("--dir", default=settings.RESPONSE_ARCHIVE_DIR, help="Archive directory")
+    parser.add_argument("--provider", choices=sorted(REPLAY_PROVIDERS), help="Only this provider")
+    parser.add_argument("--url", help="Only this career page")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Only responses archived since (ISO 8601)")
+    parser.add_argument("--schema-hash", help="Only responses produced with these extraction options")
+    parser.add_argument("--latest", action="store_true", help="Only the most recent response of each page")
+    parser.add_argument("--output", help="Write re-parsed results as JSON lines to this file")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    
+    started = time.perf_counter()
+    pages = 0
+    postings = 0
+    schema_hashes: Counter = Counter()
+    output = open(args.output, "w", encoding="utf-8") if args.output else None
+    try:
+        for record, response in replay_archive(args.dir, provider=args.provider, url=args.url,
+                                               since=args.since, schema_hash=args.schema_hash,
+                                               latest=args.latest):
+            pages += 1
+            postings += len(response.job_postings)
+            schema_hashes[record.schema_hash] += 1
+            if output is not None:
+                output.write(json.dumps({
+                    "archived_at": record.archived_at.isoformat(),
+                    "provider": record.provider,
+                    "schema_hash": record.schema_hash,
+                    **response.model_dump(mode="json"),
+                }, ensure_ascii=False) + "\n")
+    finally:
+        if output is not None:
+            output.close()
+    
+    elapsed = time.perf_counter() - started
+    print(f"Replayed {pages} pages, {postings} job postings in {elapsed:.2f}s")
+    for schema_hash, count in schema_hashes.most_common():
+        print(f"  schema {(schema_hash or 'unknown')[:12]}: {count} pages")
+
+
+if __name__ == "__main__":
+    main()
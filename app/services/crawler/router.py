@@ -0,0 +1,265 @@
+"""
+Health-aware routing, failover and hedging across crawler providers.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.services.crawler.base import CrawlerProvider
+from app.services.crawler.models import JobPostingsResponse
+from app.services.crawler.ratelimit import PolitenessScheduler
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+
+class ProviderHealth:
+    """
+    Rolling health statistics of a provider.
+    
+    Latency and error rate are exponentially weighted moving averages. After
+    ``failure_threshold`` consecutive failures the provider's circuit opens for
+    ``cooldown`` seconds, during which it is only used as a last resort.
+    """
+    
+    def __init__(self, alpha: float, failure_threshold: int, cooldown: float):
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.requests = 0
+        self.failures = 0
+    
+    def record_success(self, latency: float) -> None:
+        """
+        Record a successful call.
+        """
+        self.requests += 1
+        self.consecutive_failures = 0
+        self.error_rate *= 1 - self.alpha
+        self.latency = latency if self.latency is None else self.alpha * latency + (1 - self.alpha) * self.latency
+    
+    def record_failure(self, latency: float) -> None:
+        """
+        Record a failed call, opening the circuit after repeated failures.
+        """
+        self.requests += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.error_rate = self.alpha + (1 - self.alpha) * self.error_rate
+        self.latency = latency if self.latency is None else self.alpha * latency + (1 - self.alpha) * self.latency
+        
+        if self.consecutive_failures >= self.failure_threshold:
+            self.open_until = time.monotonic() + self.cooldown
+    
+    @property
+    def circuit_open(self) -> bool:
+        """
+        Whether the provider is temporarily benched after repeated failures.
+        """
+        return time.monotonic() < self.open_until
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "latency": self.latency,
+            "error_rate": self.error_rate,
+            "consecutive_failures": self.consecutive_failures,
+            "circuit_open": self.circuit_open,
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class ProviderRouter:
+    """
+    Route extractions to the healthiest, cheapest provider.
+    
+    Providers are ordered by circuit state, degradation and cost. A failed call fails
+    over to the next provider immediately; when the chosen provider is degraded (high
+    error rate or latency) a hedged request to the next provider starts after
+    ``hedge_delay`` seconds and the first usable result wins. An empty job list is
+    only accepted once no other provider is left to try.
+    """
+    
+    def __init__(self, providers: Sequence[CrawlerProvider], alpha: float = 0.2,
+                 degraded_error_rate: float = 0.3, degraded_latency: float = 60.0,
+                 failure_threshold: int = 5, cooldown: float = 60.0,
+                 hedge_delay: Optional[float] = 5.0,
+                 scheduler: Optional[PolitenessScheduler] = None):
+        """
+        Initialize the router.
+        
+        Args:
+            providers: Available providers.
+            alpha: Smoothing factor of the moving averages.
+            degraded_error_rate: Error rate above which a provider is degraded.
+            degraded_latency: Average latency in seconds above which a provider is degraded.
+            failure_threshold: Consecutive failures that open a provider's circuit.
+            cooldown: Seconds a provider's circuit stays open.
+            hedge_delay: Seconds to wait on a degraded provider before hedging, or None to disable hedging.
+            scheduler: Rate limiter applied to every provider call; only rate-limited
+                       calls are retried on the same provider.
+        """
+        if not providers:
+            raise ValueError("At least one crawler provider is required")
+        
+        self.providers = list(providers)
+        self.degraded_error_rate = degraded_error_rate
+        self.degraded_latency = degraded_latency
+        self.hedge_delay = hedge_delay
+        self.scheduler = scheduler
+        self.health = {
+            provider.name: ProviderHealth(alpha, failure_threshold, cooldown) for provider in self.providers
+        }
+    
+    def is_degraded(self, provider: CrawlerProvider) -> bool:
+        """
+        Whether a provider is currently unhealthy.
+        """
+        health = self.health[provider.name]
+        return (
+            health.circuit_open
+            or health.error_rate > self.degraded_error_rate
+            or (health.latency is not None and health.latency > self.degraded_latency)
+        )
+    
+    def ordered(self) -> List[CrawlerProvider]:
+        """
+        Providers from most to least preferred.
+        """
+        def sort_key(provider: CrawlerProvider):
+            health = self.health[provider.name]
+            return (
+                health.circuit_open,
+                self.is_degraded(provider),
+                provider.cost * (1 + health.error_rate),
+                health.latency or 0.0,
+            )
+        
+        return sorted(self.providers, key=sort_key)
+    
+    async def extract_job_postings(self, url: str, company_name: Optional[str] = None,
+                                   append_positions_tag: bool = False,
+                                   timeout: Optional[float] = None) -> JobPostingsResponse:
+        """
+        Extract job postings with failover and hedging across providers.
+        
+        Args:
+            url: URL of the career page.
+            company_name: Name of the company.
+            append_positions_tag: If True, append "#positions" to the URL.
+            timeout: Per-provider timeout in seconds.
+            
+        Returns:
+            JobPostingsResponse: The first non-empty result, or an empty result if every
+                                 provider found nothing.
+            
+        Raises:
+            ProviderError: The last error if every provider failed.
+        """
+        remaining = self.ordered()
+        running: Dict[asyncio.Task, CrawlerProvider] = {}
+        empty_result: Optional[JobPostingsResponse] = None
+        last_error: Optional[Exception] = None
+        
+        def launch() -> None:
+            provider = remaining.pop(0)
+            task = asyncio.create_task(
+                self._call(provider, url, company_name, append_positions_tag, timeout)
+            )
+            running[task] = provider
+        
+        launch()
+        try:
+            while running:
+                # 只有在目前服務降級時才送出對沖請求
+                hedge_delay = None
+                if remaining and self.hedge_delay is not None and any(
+                    self.is_degraded(provider) for provider in running.values()
+                ):
+                    hedge_delay = self.hedge_delay
+                
+                done, _ = await asyncio.wait(running, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.info(f"Hedging extraction of {url} with {remaining[0].name}")
+                    launch()
+                    continue
+                
+                for task in done:
+                    provider = running.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        logger.warning(f"Provider {provider.name} failed for {url}: {str(e)}")
+                        last_error = e
+                    else:
+                        if result.job_postings:
+                            return result
+                        logger.info(f"Provider {provider.name} found no job postings on {url}")
+                        empty_result = result
+                    
+                    # 故障轉移：立即嘗試下一個服務
+                    if remaining:
+                        launch()
+        finally:
+            for task in running:
+                task.cancel()
+        
+        if empty_result is not None:
+            return empty_result
+        raise last_error
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get per-provider health statistics in routing order.
+        """
+        return {
+            provider.name: {
+                "cost": provider.cost,
+                "degraded": self.is_degraded(provider),
+                **self.health[provider.name].as_dict(),
+            }
+            for provider in self.ordered()
+        }
+    
+    async def aclose(self) -> None:
+        """
+        Close every provider.
+        """
+        for provider in self.providers:
+            await provider.aclose()
+    
+    async def _call(self, provider: CrawlerProvider, url: str, company_name: Optional[str],
+                    append_positions_tag: bool, timeout: Optional[float]) -> JobPostingsResponse:
+        """
+        Call a provider under the rate limits and record the outcome of every attempt.
+        
+        Only rate-limited attempts are retried on the same provider; timeouts and other
+        errors are raised at once so the router fails over to the next provider.
+        """
+        health = self.health[provider.name]
+        
+        async def call():
+            # 只計算服務呼叫本身的時間，不含本地限流與 Retry-After 的等待
+            started = time.monotonic()
+            try:
+                result = await provider.extract_job_postings(
+                    url=url,
+                    company_name=company_name,
+                    append_positions_tag=append_positions_tag,
+                    timeout=timeout
+                )
+            except Exception:
+                health.record_failure(time.monotonic() - started)
+                raise
+            health.record_success(time.monotonic() - started)
+            return result
+        
+        if self.scheduler is not None:
+            return await self.scheduler.run(call, urls=[url], provider=provider.name, rate_limited_only=True)
+        return await call()
@@ -0,0 +1,146 @@
+"""
+Scheduler that enqueues crawl jobs for tracked pages that are due for a check.
+"""
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, exists, or_, select, update
+from sqlalchemy.orm import sessionmaker
+
+from app.models.crawl_job import CRAWL_JOB_ACTIVE_STATUSES, CrawlJob
+from app.models.tracked_page import TrackedPage
+from app.services.crawler.queue import CrawlQueue, utcnow
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+# 各檢查頻率對應的間隔
+CHECK_FREQUENCY_INTERVALS: Dict[str, timedelta] = {
+    "daily": timedelta(days=1),
+    "weekly": timedelta(weeks=1),
+}
+
+
+def due_pages_filter(now: datetime):
+    """
+    Build the SQL condition selecting tracked pages due for a check.
+    
+    Args:
+        now: Reference time.
+        
+    Returns:
+        SQL expression usable in a WHERE clause.
+    """
+    return or_(
+        TrackedPage.last_checked.is_(None),
+        *[
+            and_(TrackedPage.check_frequency == frequency, TrackedPage.last_checked <= now - interval)
+            for frequency, interval in CHECK_FREQUENCY_INTERVALS.items()
+        ],
+    )
+
+
+class CrawlScheduler:
+    """
+    Periodically enqueues crawl jobs for tracked pages whose check interval has elapsed.
+    
+    Pages that still have a queued or running job are left out before the batch is
+    cut, so a slow or failing page is never enqueued twice and does not hold back the
+    pages behind it.
+    """
+    
+    def __init__(self, session_factory: sessionmaker, queue: CrawlQueue, batch_size: int = 500):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            session_factory: Session factory bound to the application database.
+            queue: Crawl queue to enqueue jobs into.
+            batch_size: Maximum number of pages enqueued per sweep.
+        """
+        self._session_factory = session_factory
+        self.queue = queue
+        self.batch_size = batch_size
+    
+    def due_pages(self, now: Optional[datetime] = None) -> List[Dict]:
+        """
+        List tracked pages that are due for a check and have no active job, least
+        recently checked first.
+        
+        Args:
+            now: Reference time, defaults to the current time.
+            
+        Returns:
+            List[Dict]: Pages with ``id``, ``url`` and ``company_name``.
+        """
+        now = now or utcnow()
+        query = (
+            select(TrackedPage.id, TrackedPage.url, TrackedPage.company_name)
+            .where(due_pages_filter(now))
+            .order_by(TrackedPage.last_checked.asc().nulls_first(), TrackedPage.id)
+        )
+        
+        if self.queue.session_factory is self._session_factory:
+            # 佇列與應用程式共用資料庫，直接在 SQL 中排除已有進行中工作的頁面
+            query = query.where(~exists().where(
+                CrawlJob.tracked_page_id == TrackedPage.id,
+                CrawlJob.status.in_(CRAWL_JOB_ACTIVE_STATUSES),
+            ))
+            with self._session_factory() as session:
+                rows = session.execute(query.limit(self.batch_size))
+                return [{"id": row.id, "url": row.url, "company_name": row.company_name} for row in rows]
+        
+        # 佇列在獨立資料庫，無法 join；逐批多取並排除已有進行中工作的頁面，直到湊滿一批
+        pages: List[Dict] = []
+        offset = 0
+        with self._session_factory() as session:
+            while len(pages) < self.batch_size:
+                rows = session.execute(query.offset(offset).limit(self.batch_size)).all()
+                offset += len(rows)
+                active = self.queue.active_page_ids(row.id for row in rows)
+                pages.extend(
+                    {"id": row.id, "url": row.url, "company_name": row.company_name}
+                    for row in rows
+                    if row.id not in active
+                )
+                if len(rows) < self.batch_size:
+                    break
+        return pages[:self.batch_size]
+    
+    def sweep(self, now: Optional[datetime] = None) -> int:
+        """
+        Enqueue crawl jobs for all due pages.
+        
+        Args:
+            now: Reference time, defaults to the current time.
+            
+        Returns:
+            int: Number of jobs enqueued.
+        """
+        pages = self.due_pages(now)
+        enqueued = self.queue.enqueue_pages(pages)
+        if enqueued:
+            logger.info(f"Enqueued {enqueued} crawl jobs ({len(pages)} tracked pages due)")
+        return enqueued
+    
+    def mark_checked(self, page_ids: Iterable[uuid.UUID], checked_at: Optional[datetime] = None) -> None:
+        """
+        Update ``last_checked`` of tracked pages after their crawl finished.
+        
+        Args:
+            page_ids: IDs of the tracked pages.
+            checked_at: Time of the check, defaults to the current time.
+        """
+        page_ids = list(page_ids)
+        if not page_ids:
+            return
+        
+        with self._session_factory() as session, session.begin():
+            session.execute(
+                update(TrackedPage)
+                .where(TrackedPage.id.in_(page_ids))
+                .values(last_checked=checked_at or utcnow())
+                .execution_options(synchronize_session=False)
+            )
@@ -0,0 +1,95 @@
+"""
+In-flight request coalescing (single-flight) for identical concurrent calls.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _Flight(Generic[T]):
+    """
+    A shared call and the number of callers waiting for it.
+    """
+    __slots__ = ("task", "waiters")
+    
+    def __init__(self, task: "asyncio.Task[T]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time and share its result with every caller.
+    
+    The first caller of a key starts the work as a separate task; callers arriving
+    while it runs await the same task. Each caller waits through ``asyncio.shield``,
+    so cancelling one caller never cancels the shared work for the others. The work
+    is only cancelled once every waiting caller has been cancelled. Results are not
+    cached: the key is released as soon as the call finishes.
+    """
+    
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0, "cancelled": 0}
+    
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``call`` for ``key``, or join the call already in flight for it.
+        
+        Args:
+            key: Identity of the call; equal keys must produce interchangeable results.
+            call: Factory creating the coroutine, only invoked if no call is in flight.
+        
+        Returns:
+            The result of the shared call.
+        
+        Raises:
+            Exception: The exception raised by the shared call, re-raised to every caller.
+        """
+        self._stats["calls"] += 1
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(call()))
+            self._flights[key] = flight
+            self._stats["executions"] += 1
+            flight.task.add_done_callback(lambda task: self._finish(key, flight))
+        else:
+            self._stats["coalesced"] += 1
+        
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            # 呼叫者被取消：最後一個等待者離開時才取消共用工作，並讓之後的呼叫者重新開始
+            if flight.waiters == 1 and not flight.task.done():
+                self._stats["cancelled"] += 1
+                flight.task.cancel()
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            raise
+        finally:
+            flight.waiters -= 1
+    
+    def in_flight(self) -> int:
+        """
+        Number of keys with a call in flight.
+        """
+        return len(self._flights)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get coalescing counters.
+        """
+        return {**self._stats, "in_flight": len(self._flights)}
+    
+    def _finish(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # 取出例外，避免所有呼叫者都已取消時出現 "exception was never retrieved" 警告
+        if not flight.task.cancelled():
+            flight.task.exception()
@@ -0,0 +1,610 @@
+"""
+Compact store of the last job list seen for each tracked page.
+"""
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from array import array
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence
+
+try:
+    import fcntl
+except ImportError:  # Windows 沒有 fcntl，只能由單一程序使用快照檔
+    fcntl = None
+
+from app.services.crawler.diff import (
+    JobPostingsDiff, index_postings, posting_fingerprint, posting_identity, title_identity,
+)
+from app.services.crawler.models import JobPosting
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"JOBSNAP1"
+# 以寫入端的原生位元組順序儲存，讀取時用來偵測不同順序的檔案
+_BYTE_ORDER_MARK = 0x01020304
+_VERSION = 1
+
+# 檔案區段：字串池、頁面鍵、各頁面的起始位置、雜湊、字串 ID、文字位移與文字
+_SECTIONS = (
+    "pool_offsets", "pool_text", "key_offsets", "key_text", "page_starts",
+    "identities", "fingerprints", "fields", "text_offsets", "text",
+)
+_HEADER = struct.Struct(f"=8sIIQQQ{len(_SECTIONS)}Q")
+
+# 每筆職缺的字串池 ID：公司、地點、部門
+_FIELDS_PER_POSTING = 3
+# 每筆職缺的 UTF-8 文字：標題、網址、描述
+_TEXTS_PER_POSTING = 3
+
+# 快照檔旁的追加日誌與程序間的檔案鎖
+JOURNAL_SUFFIX = ".journal"
+LOCK_SUFFIX = ".lock"
+
+
+def identity_hash(identity: str) -> int:
+    """
+    64-bit hash of a posting identity (see ``posting_identity``).
+    """
+    return int.from_bytes(hashlib.blake2b(identity.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def fingerprint_hash(posting: JobPosting) -> int:
+    """
+    64-bit form of ``posting_fingerprint``.
+    """
+    return int(posting_fingerprint(posting), 16)
+
+
+def _padding(length: int) -> int:
+    return -length % 8
+
+
+@contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    # 以獨立的鎖定檔序列化各程序的日誌寫入與壓縮
+    with open(path + LOCK_SUFFIX, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _decode_strings(text: memoryview, offsets: Sequence[int], count: int) -> Iterator[str]:
+    for index in range(count):
+        yield str(text[offsets[index]:offsets[index + 1]], "utf-8")
+
+
+class StringPool:
+    """
+    Interned strings referenced by integer ID; ID 0 stands for None.
+    
+    Company, location and department values repeat across postings and pages, so each
+    distinct value is stored once.
+    """
+    
+    def __init__(self):
+        """
+        Initialize an empty pool.
+        """
+        self._strings: List[Optional[str]] = [None]
+        self._ids: Dict[str, int] = {}
+    
+    def intern(self, value: Optional[str]) -> int:
+        """
+        Get the ID of a string, adding it to the pool if needed.
+        """
+        if value is None:
+            return 0
+        string_id = self._ids.get(value)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(value)
+            self._ids[value] = string_id
+        return string_id
+    
+    def get(self, string_id: int) -> Optional[str]:
+        """
+        Get the string of an ID.
+        """
+        return self._strings[string_id]
+    
+    def __len__(self) -> int:
+        return len(self._strings) - 1
+
+
+class PageSnapshot:
+    """
+    Postings of one page as parallel arrays of hashes, interned IDs and UTF-8 text.
+    
+    Identities and fingerprints are 64-bit hashes, so diffs and existence checks only
+    compare integers; ``posting`` rebuilds a ``JobPosting`` when one is actually needed.
+    The arrays are either ``array`` objects or views into a mapped snapshot file.
+    """
+    __slots__ = ("pool", "identities", "fingerprints", "fields", "offsets", "text")
+    
+    def __init__(self, pool: StringPool, identities: Sequence[int], fingerprints: Sequence[int],
+                 fields: Sequence[int], offsets: Sequence[int], text: Any):
+        """
+        Initialize the snapshot from its arrays.
+        
+        Args:
+            pool: Pool the company, location and department IDs refer to.
+            identities: Identity hash per posting.
+            fingerprints: Content fingerprint per posting.
+            fields: Company, location and department IDs, three per posting.
+            offsets: Start of the title, URL and description of each posting in ``text``,
+                     followed by the end of the last one.
+            text: UTF-8 buffer holding the titles, URLs and descriptions.
+        """
+        self.pool = pool
+        self.identities = identities
+        self.fingerprints = fingerprints
+        self.fields = fields
+        self.offsets = offsets
+        self.text = text
+    
+    @classmethod
+    def from_postings(cls, pool: StringPool, postings: Iterable[JobPosting]) -> "PageSnapshot":
+        """
+        Build a snapshot from postings, deduplicated by identity like ``index_postings``.
+        
+        Args:
+            pool: Pool used to intern companies, locations and departments.
+            postings: Job postings of one page.
+        
+        Returns:
+            PageSnapshot: The compact snapshot.
+        """
+        identities = array("Q")
+        fingerprints = array("Q")
+        fields = array("I")
+        offsets = array("I", [0])
+        chunks: List[bytes] = []
+        size = 0
+        for identity, posting in index_postings(postings).items():
+            identities.append(identity_hash(identity))
+            fingerprints.append(fingerprint_hash(posting))
+            fields.extend((pool.intern(posting.company), pool.intern(posting.location),
+                           pool.intern(posting.department)))
+            for value in (posting.title, posting.url, posting.description or ""):
+                data = value.encode("utf-8")
+                chunks.append(data)
+                size += len(data)
+                offsets.append(size)
+        return cls(pool, identities, fingerprints, fields, offsets, b"".join(chunks))
+    
+    def __len__(self) -> int:
+        return len(self.identities)
+    
+    def positions(self) -> Dict[int, int]:
+        """
+        Map each identity hash to its position.
+        """
+        return {identity: position for position, identity in enumerate(self.identities)}
+    
+    def contains(self, posting: JobPosting) -> bool:
+        """
+        Whether the snapshot has a posting with the same identity.
+        
+        Both the URL and the title identity are checked, since postings sharing a URL
+        within a page are stored under their title.
+        """
+        return (identity_hash(posting_identity(posting)) in self.identities
+                or identity_hash(title_identity(posting)) in self.identities)
+    
+    def posting(self, position: int) -> JobPosting:
+        """
+        Rebuild the ``JobPosting`` at a position.
+        
+        Empty descriptions are returned as None.
+        """
+        start = position * _TEXTS_PER_POSTING
+        title, url, description = (
+            str(self.text[self.offsets[start + k]:self.offsets[start + k + 1]], "utf-8")
+            for k in range(_TEXTS_PER_POSTING)
+        )
+        company, location, department = (
+            self.pool.get(self.fields[position * _FIELDS_PER_POSTING + k]) for k in range(_FIELDS_PER_POSTING)
+        )
+        return JobPosting(company=company or "", title=title, url=url, description=description or None,
+                          location=location, department=department)
+    
+    def postings(self) -> List[JobPosting]:
+        """
+        Rebuild every posting, in their original order.
+        """
+        return [self.posting(position) for position in range(len(self))]
+    
+    @property
+    def nbytes(self) -> int:
+        """
+        Size of the arrays and text buffer in bytes.
+        """
+        return sum(memoryview(buffer).nbytes for buffer in (
+            self.identities, self.fingerprints, self.fields, self.offsets, self.text
+        ))
+
+
+def diff_snapshots(previous: Optional[PageSnapshot], current: PageSnapshot, url: str = "") -> JobPostingsDiff:
+    """
+    Compute added, removed and modified postings from two snapshots of a page.
+    
+    Postings are matched by identity hash and compared by fingerprint, the same rules
+    as ``diff_job_postings``; only the postings reported in the diff are rebuilt.
+    
+    Args:
+        previous: Last snapshot of the page, or None if the page was never seen.
+        current: Snapshot of the fresh extraction.
+        url: URL of the career page, for reference in the result.
+    
+    Returns:
+        JobPostingsDiff: The changes between the two snapshots.
+    """
+    previous_positions = previous.positions() if previous is not None else {}
+    matched = set()
+    
+    diff = JobPostingsDiff(url=url)
+    for position, identity in enumerate(current.identities):
+        old = previous_positions.get(identity)
+        if old is None:
+            diff.added.append(current.posting(position))
+            continue
+        matched.add(identity)
+        if previous.fingerprints[old] != current.fingerprints[position]:
+            diff.modified.append(current.posting(position))
+        else:
+            diff.unchanged_count += 1
+    
+    if previous is not None and len(matched) < len(previous):
+        diff.removed = [
+            previous.posting(position)
+            for position, identity in enumerate(previous.identities) if identity not in matched
+        ]
+    return diff
+
+
+class SnapshotStore:
+    """
+    Store of the last job list seen for each tracked page.
+    
+    Pages are kept as ``PageSnapshot`` records sharing one pool of interned companies,
+    locations and departments, a few dozen bytes per posting plus its text instead of
+    a ``JobPosting`` model. A store opened on an existing file maps it into memory and
+    reads snapshots in place.
+    
+    With a path, every ``put`` is also appended to a journal next to the file, so
+    several processes can share one store and a crash loses nothing. ``compact``
+    merges the file and the journal as found on disk into a new file, under a lock
+    shared by all processes, once the journal grows past ``max_journal_bytes``.
+    """
+    
+    def __init__(self, path: Optional[str] = None, max_journal_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize the store, mapping the snapshot file and replaying its journal.
+        
+        Args:
+            path: Snapshot file, or None for a memory-only store.
+            max_journal_bytes: Journal size at which ``needs_compaction`` turns True.
+        
+        Raises:
+            ValueError: If the file is not a snapshot file of this format.
+        """
+        self.path = path
+        self.max_journal_bytes = max_journal_bytes
+        self.pool = StringPool()
+        self._pages: Dict[str, PageSnapshot] = {}
+        # 映射檔案中尚未被覆寫的頁面，依頁面鍵對應到檔案中的頁面序號
+        self._mapped: Dict[str, int] = {}
+        self._file: Optional[BinaryIO] = None
+        self._map: Optional[mmap.mmap] = None
+        self._sections: Dict[str, memoryview] = {}
+        # put 可能在多個執行緒中執行，字串池不是執行緒安全的
+        self._lock = threading.Lock()
+        self._journal_bytes = 0
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            if os.path.exists(path):
+                self._load(path)
+            self._replay(path + JOURNAL_SUFFIX)
+    
+    def get(self, page_key: str) -> Optional[PageSnapshot]:
+        """
+        Get the last snapshot of a page, or None if the page was never seen.
+        """
+        snapshot = self._pages.get(page_key)
+        if snapshot is not None:
+            return snapshot
+        index = self._mapped.get(page_key)
+        if index is None:
+            return None
+        
+        sections = self._sections
+        start, end = sections["page_starts"][index], sections["page_starts"][index + 1]
+        return PageSnapshot(
+            self.pool,
+            sections["identities"][start:end],
+            sections["fingerprints"][start:end],
+            sections["fields"][start * _FIELDS_PER_POSTING:end * _FIELDS_PER_POSTING],
+            # 檔案中的文字位移為絕對位置，因此直接使用整段文字
+            sections["text_offsets"][start * _TEXTS_PER_POSTING:end * _TEXTS_PER_POSTING + 1],
+            sections["text"],
+        )
+    
+    def put(self, page_key: str, postings: Iterable[JobPosting]) -> PageSnapshot:
+        """
+        Replace the snapshot of a page, appending it to the journal if the store has a path.
+        
+        Args:
+            page_key: Key of the tracked page.
+            postings: Fresh job postings of the page.
+        
+        Returns:
+            PageSnapshot: The new snapshot.
+        
+        Raises:
+            OSError: If the journal cannot be written; the snapshot is not replaced.
+        """
+        postings = list(postings)
+        with self._lock:
+            snapshot = PageSnapshot.from_postings(self.pool, postings)
+            if self.path:
+                self._append(page_key, postings)
+            self._pages[page_key] = snapshot
+            self._mapped.pop(page_key, None)
+        return snapshot
+    
+    @property
+    def needs_compaction(self) -> bool:
+        """
+        Whether the journal has grown past ``max_journal_bytes``.
+        """
+        return bool(self.path) and self._journal_bytes >= self.max_journal_bytes
+    
+    def compact(self, force: bool = False) -> bool:
+        """
+        Merge the snapshot file and the journal into a new snapshot file.
+        
+        The merge reads both from disk, so snapshots written by other processes are
+        kept. This store keeps serving its current view.
+        
+        Args:
+            force: Compact even if the journal is below ``max_journal_bytes``.
+        
+        Returns:
+            bool: True if the file was rewritten.
+        """
+        if not self.path:
+            return False
+        journal_path = self.path + JOURNAL_SUFFIX
+        
+        with _file_lock(self.path):
+            # 其他程序可能已在取得鎖之前完成壓縮
+            size = os.path.getsize(journal_path) if os.path.exists(journal_path) else 0
+            if size == 0 or (not force and size < self.max_journal_bytes):
+                self._journal_bytes = size
+                return False
+            
+            merged = SnapshotStore(self.path)
+            try:
+                merged.save()
+            finally:
+                merged.close()
+            # 日誌內容已併入快照檔；若在此之前中斷，重播日誌的結果相同
+            open(journal_path, "wb").close()
+            self._journal_bytes = 0
+        
+        logger.info(f"Compacted {size} bytes of snapshot journal into {self.path}")
+        return True
+    
+    def contains(self, page_key: str, posting: JobPosting) -> bool:
+        """
+        Whether the last snapshot of a page has a posting with the same identity.
+        """
+        snapshot = self.get(page_key)
+        return snapshot is not None and snapshot.contains(posting)
+    
+    def __len__(self) -> int:
+        return len(self._pages) + len(self._mapped)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get page, posting and memory counters.
+        """
+        page_starts = self._sections.get("page_starts")
+        mapped_postings = sum(page_starts[index + 1] - page_starts[index] for index in self._mapped.values())
+        return {
+            "pages": len(self),
+            "mapped_pages": len(self._mapped),
+            "postings": sum(len(snapshot) for snapshot in self._pages.values()) + mapped_postings,
+            "interned_strings": len(self.pool),
+            "memory_bytes": sum(snapshot.nbytes for snapshot in self._pages.values()),
+            "mapped_bytes": len(self._map) if self._map is not None else 0,
+        }
+    
+    def save(self, path: Optional[str] = None) -> None:
+        """
+        Write every snapshot to a file and map it in place of the in-memory snapshots.
+        
+        The file is written next to the target and renamed over it, so readers never
+        see a partial file. Only this store's view is written; use ``compact`` to
+        update a file shared with other processes.
+        
+        Args:
+            path: Target file, defaults to the store's path.
+        
+        Raises:
+            ValueError: If neither ``path`` nor the store's path is set.
+        """
+        path = path or self.path
+        if not path:
+            raise ValueError("No snapshot file path given")
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                self._write(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        
+        self.close()
+        self.path = path
+        self.pool = StringPool()
+        self._pages = {}
+        self._load(path)
+        logger.info(f"Saved {len(self)} page snapshots to {path}")
+    
+    def close(self) -> None:
+        """
+        Unmap the snapshot file; pages only kept in memory are dropped with it.
+        """
+        self._sections = {}
+        self._mapped = {}
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # 仍有快照引用映射內容，交由垃圾回收在引用釋放後關閉
+                pass
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def _append(self, page_key: str, postings: List[JobPosting]) -> None:
+        # 每頁一行 JSON，以單次寫入追加
+        record = json.dumps(
+            {"key": page_key, "postings": [posting.model_dump() for posting in postings]}, ensure_ascii=False
+        )
+        with _file_lock(self.path):
+            with open(self.path + JOURNAL_SUFFIX, "a+b") as f:
+                data = record.encode("utf-8") + b"\n"
+                # 當機留下的半筆記錄自成一行，不與這筆記錄黏在一起
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        data = b"\n" + data
+                f.write(data)
+                self._journal_bytes = f.tell()
+    
+    def _replay(self, journal_path: str) -> None:
+        if not os.path.exists(journal_path):
+            return
+        
+        count = 0
+        with open(journal_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # 寫入中途當機或仍在寫入的最後一筆
+                    logger.warning(f"Ignoring incomplete record at the end of {journal_path}")
+                    break
+                try:
+                    record = json.loads(line)
+                    page_key = record["key"]
+                    postings = [JobPosting(**posting) for posting in record["postings"]]
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.warning(f"Skipping invalid record in {journal_path}: {str(e)}")
+                    continue
+                self._pages[page_key] = PageSnapshot.from_postings(self.pool, postings)
+                self._mapped.pop(page_key, None)
+                count += 1
+            self._journal_bytes = f.tell()
+        if count:
+            logger.info(f"Replayed {count} page snapshots from {journal_path}")
+    
+    def _load(self, path: str) -> None:
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, byte_order_mark, version, string_count, page_count, posting_count, *lengths = (
+                _HEADER.unpack_from(self._map, 0)
+            )
+        except (ValueError, struct.error) as e:
+            self.close()
+            raise ValueError(f"{path} is not a snapshot file: {str(e)}")
+        if magic != SNAPSHOT_MAGIC or version != _VERSION or byte_order_mark != _BYTE_ORDER_MARK:
+            self.close()
+            raise ValueError(f"{path} is not a snapshot file of this format or byte order")
+        
+        view = memoryview(self._map)
+        position = _HEADER.size
+        for name, length in zip(_SECTIONS, lengths):
+            section = view[position:position + length]
+            if name.endswith("_offsets") or name in ("page_starts", "identities", "fingerprints"):
+                section = section.cast("Q")
+            elif name == "fields":
+                section = section.cast("I")
+            self._sections[name] = section
+            position += length + _padding(length)
+        
+        # 字串池與頁面鍵數量有限，載入時解碼；職缺資料留在映射中
+        for value in _decode_strings(self._sections["pool_text"], self._sections["pool_offsets"], string_count):
+            self.pool.intern(value)
+        for index, value in enumerate(
+            _decode_strings(self._sections["key_text"], self._sections["key_offsets"], page_count)
+        ):
+            self._mapped[value] = index
+        logger.info(f"Mapped {page_count} page snapshots ({posting_count} postings) from {path}")
+    
+    def _write(self, f: BinaryIO) -> None:
+        pool = StringPool()
+        keys: List[str] = []
+        snapshots: List[PageSnapshot] = []
+        page_starts = array("Q", [0])
+        identities = array("Q")
+        fingerprints = array("Q")
+        fields = array("I")
+        text_offsets = array("Q", [0])
+        
+        # 第一輪：重建只含仍被引用字串的字串池，並計算文字位移
+        for page_key in [*self._mapped, *self._pages]:
+            snapshot = self.get(page_key)
+            keys.append(page_key)
+            snapshots.append(snapshot)
+            page_starts.append(page_starts[-1] + len(snapshot))
+            identities.extend(snapshot.identities)
+            fingerprints.extend(snapshot.fingerprints)
+            fields.extend(pool.intern(snapshot.pool.get(string_id)) for string_id in snapshot.fields)
+            base = text_offsets[-1] - snapshot.offsets[0]
+            text_offsets.extend(base + offset for offset in snapshot.offsets[1:])
+        
+        def encode(values: Iterable[str]) -> List[Any]:
+            offsets = array("Q", [0])
+            data = bytearray()
+            for value in values:
+                data += value.encode("utf-8")
+                offsets.append(len(data))
+            return [offsets, data]
+        
+        sections = [
+            *encode(pool.get(string_id) for string_id in range(1, len(pool) + 1)),
+            *encode(keys),
+            page_starts, identities, fingerprints, fields, text_offsets,
+        ]
+        lengths = [memoryview(section).nbytes for section in sections]
+        lengths.append(text_offsets[-1])
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, _BYTE_ORDER_MARK, _VERSION, len(pool), len(keys),
+                             len(identities), *lengths))
+        for section, length in zip(sections, lengths):
+            f.write(section)
+            f.write(b"\0" * _padding(length))
+        
+        # 第二輪：依序寫入各頁面的文字，不在記憶體中組合整段文字
+        for snapshot in snapshots:
+            f.write(snapshot.text[snapshot.offsets[0]:snapshot.offsets[-1]])
+        f.write(b"\0" * _padding(lengths[-1]))
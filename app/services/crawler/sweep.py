@@ -0,0 +1,226 @@
+"""
+Streaming sweep over all tracked pages due for a check:
+crawl → enrich → persist → match → notify.
+
+Usage:
+    python -m app.services.crawler.sweep
+"""
+import argparse
+import asyncio
+import json
+import logging
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.tracked_page import TrackedPage
+from app.services.crawler.crawler_service import CrawlerService
+from app.services.crawler.enrichment import enrich_new_postings
+from app.services.crawler.models import JobPostingsResponse
+from app.services.crawler.pipeline import Pipeline, Stage
+from app.services.crawler.scheduler import due_pages_filter
+from app.services.jobs.persistence import persist_job_postings
+from app.services.matching.engine import JobMatch, MatchingEngine, load_active_resumes
+from app.services.matching.fanout import JobFanout, build_interest_index, job_documents_from_response
+from app.services.notifications.dispatcher import record_matches
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SweepItem:
+    """
+    A tracked page travelling through the sweep pipeline.
+    """
+    tracked_page_id: uuid.UUID
+    url: str
+    company_name: Optional[str] = None
+    response: Optional[JobPostingsResponse] = None
+    # 爬取失敗原因；失敗的頁面只更新 last_checked
+    error: Optional[str] = None
+    # 本次新增的職缺 ID，依職缺網址
+    job_ids: Dict[str, uuid.UUID] = field(default_factory=dict)
+    matches: Dict[uuid.UUID, List[JobMatch]] = field(default_factory=dict)
+
+
+async def iter_due_pages(session_factory: Callable[[], AsyncSession], now: Optional[datetime] = None,
+                         page_size: int = 500) -> AsyncIterator[SweepItem]:
+    """
+    Stream the tracked pages due for a check, reading them in keyset pages.
+    
+    Args:
+        session_factory: Async session factory bound to the application database.
+        now: Reference time, defaults to the current time.
+        page_size: Pages read per query.
+    
+    Returns:
+        AsyncIterator[SweepItem]: Due pages in ID order.
+    """
+    now = now or datetime.now(timezone.utc)
+    last_id: Optional[uuid.UUID] = None
+    while True:
+        query = select(TrackedPage.id, TrackedPage.url, TrackedPage.company_name).where(due_pages_filter(now))
+        if last_id is not None:
+            query = query.where(TrackedPage.id > last_id)
+        async with session_factory() as session:
+            rows = (await session.execute(query.order_by(TrackedPage.id).limit(page_size))).all()
+        
+        for row in rows:
+            yield SweepItem(tracked_page_id=row.id, url=row.url, company_name=row.company_name)
+        if len(rows) < page_size:
+            return
+        last_id = rows[-1].id
+
+
+def build_sweep_pipeline(crawler_service: CrawlerService, session_factory: Callable[[], AsyncSession],
+                         fanout: Optional[JobFanout] = None, now: Optional[datetime] = None) -> Pipeline:
+    """
+    Build the pipeline sweeping every tracked page that is due for a check.
+    
+    Pages are streamed from the database and flow through bounded queues, so memory
+    use does not depend on the number of pages. Persisting and recording
+    notifications are batched, one transaction per ``SWEEP_BATCH_SIZE`` pages.
+    A page whose crawl fails is still marked as checked, like a job that failed for
+    good in the crawl queue.
+    
+    Args:
+        crawler_service: Crawler service used to crawl and enrich the pages.
+        session_factory: Async session factory bound to the application database.
+        fanout: Fan-out used to match new postings to users; matching and
+                notifications are skipped if None.
+        now: Reference time for due pages and ``last_checked``, defaults to the current time.
+    
+    Returns:
+        Pipeline: The sweep pipeline; ``run`` it to perform the sweep.
+    """
+    now = now or datetime.now(timezone.utc)
+    
+    async def crawl(item: SweepItem) -> SweepItem:
+        try:
+            item.response = await crawler_service.crawl_job_postings(url=item.url, company_name=item.company_name)
+        except Exception as e:
+            item.error = str(e.detail if isinstance(e, HTTPException) else e)
+            logger.warning(f"Sweep crawl failed for tracked page {item.tracked_page_id} ({item.url}): {item.error}")
+        return item
+    
+    async def enrich(item: SweepItem) -> SweepItem:
+        if item.response is not None:
+            item.response = await enrich_new_postings(
+                crawler_service.enricher, session_factory, item.tracked_page_id, item.response
+            )
+        return item
+    
+    async def persist(items: List[SweepItem]) -> List[SweepItem]:
+        crawled = [item for item in items if item.response is not None]
+        failed = [item.tracked_page_id for item in items if item.response is None]
+        async with session_factory() as session:
+            result = await persist_job_postings(
+                session, [(item.tracked_page_id, item.response) for item in crawled], checked_at=now
+            )
+            if failed:
+                await session.execute(
+                    update(TrackedPage)
+                    .where(TrackedPage.id.in_(failed))
+                    .values(last_checked=now)
+                    .execution_options(synchronize_session=False)
+                )
+            await session.commit()
+        
+        job_ids: Dict[uuid.UUID, Dict[str, uuid.UUID]] = defaultdict(dict)
+        for (tracked_page_id, job_url), job_id in result.ids_by_url.items():
+            job_ids[tracked_page_id][job_url] = job_id
+        for item in crawled:
+            item.job_ids = job_ids.get(item.tracked_page_id, {})
+        return items
+    
+    async def match(item: SweepItem) -> SweepItem:
+        if item.job_ids:
+            documents = job_documents_from_response(item.response, item.job_ids)
+            # 矩陣運算移至執行緒，避免阻塞事件迴圈
+            item.matches = await asyncio.to_thread(
+                fanout.fan_out, documents, item.tracked_page_id, item.company_name
+            )
+        return item
+    
+    async def notify(items: List[SweepItem]) -> List[SweepItem]:
+        matches: Dict[uuid.UUID, List[JobMatch]] = defaultdict(list)
+        for item in items:
+            for user_id, user_matches in item.matches.items():
+                matches[user_id].extend(user_matches)
+        if matches:
+            async with session_factory() as session:
+                await record_matches(session, matches)
+                await session.commit()
+        return items
+    
+    stages = [
+        Stage("crawl", crawl, concurrency=settings.SWEEP_CRAWL_CONCURRENCY),
+        Stage("enrich", enrich, concurrency=settings.SWEEP_ENRICH_CONCURRENCY),
+        Stage("persist", persist, concurrency=settings.SWEEP_PERSIST_CONCURRENCY,
+              batch_size=settings.SWEEP_BATCH_SIZE),
+    ]
+    if fanout is not None:
+        stages += [
+            Stage("match", match, concurrency=1),
+            Stage("notify", notify, batch_size=settings.SWEEP_BATCH_SIZE),
+        ]
+    
+    return Pipeline(
+        iter_due_pages(session_factory, now, page_size=settings.SWEEP_PAGE_SIZE),
+        stages,
+        queue_size=settings.SWEEP_QUEUE_SIZE,
+        progress_interval=settings.SWEEP_PROGRESS_INTERVAL,
+        name="sweep",
+    )
+
+
+async def run_sweep(match: bool = True) -> Dict:
+    """
+    Sweep all due tracked pages once with the application database and settings.
+    
+    Args:
+        match: Whether to match new postings to users and record notifications.
+    
+    Returns:
+        Dict: Pipeline stats.
+    """
+    from app.db.session import AsyncSessionLocal
+    
+    fanout = None
+    if match:
+        async with AsyncSessionLocal() as session:
+            resumes = await load_active_resumes(session)
+            index = await build_interest_index(session, resumes)
+        engine = MatchingEngine()
+        engine.set_resumes(resumes)
+        fanout = JobFanout(index, engine)
+    
+    crawler_service = CrawlerService()
+    try:
+        return await build_sweep_pipeline(crawler_service, AsyncSessionLocal, fanout).run()
+    finally:
+        await crawler_service.aclose()
+
+
+def main() -> None:
+    """
+    Run one sweep and print the per-stage stats.
+    """
+    parser = argparse.ArgumentParser(description="Sweep all tracked pages due for a check")
+    parser.add_argument("--no-match", action="store_true", help="Only crawl and persist, skip matching")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(asyncio.run(run_sweep(match=not args.no_match)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""
+Crawl worker processes that drain the crawl job queue.
+
+Usage:
+    python -m app.services.crawler.worker --processes 2 --concurrency 8 --scheduler --notifications
+
+For a one-off sweep of every due page without the queue, see ``app.services.crawler.sweep``.
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+from typing import Callable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.crawl_job import CRAWL_JOB_FAILED, CRAWL_JOB_SUCCEEDED
+from app.schemas.crawl_job import CrawlJobRead
+from app.services.crawler.base import ProviderError
+from app.services.crawler.crawler_service import CrawlerService
+from app.services.crawler.enrichment import enrich_new_postings
+from app.services.crawler.queue import CrawlQueue, create_queue_session_factory
+from app.services.crawler.scheduler import CrawlScheduler
+from app.services.crawler.models import JobPostingsResponse
+from app.services.jobs.persistence import persist_job_postings
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    Decide whether a failed crawl is worth retrying later.
+    
+    Args:
+        error: Exception raised by the crawler.
+        
+    Returns:
+        bool: True for transient failures.
+    """
+    if isinstance(error, ProviderError):
+        return error.retryable
+    if isinstance(error, HTTPException):
+        return error.status_code >= 500 or error.status_code == 429
+    return True
+
+
+class CrawlWorker:
+    """
+    Runs a fixed number of concurrent job slots inside one process.
+    
+    Each slot claims a job, crawls it through the shared crawler service while a
+    heartbeat keeps the lease alive, and reports the outcome back to the queue.
+    """
+    
+    def __init__(self, queue: CrawlQueue, crawler_service: CrawlerService,
+                 scheduler: Optional[CrawlScheduler] = None, concurrency: int = 8,
+                 poll_interval: float = 2.0, worker_id: Optional[str] = None,
+                 job_session_factory: Optional[Callable[[], AsyncSession]] = None):
+        """
+        Initialize the worker.
+        
+        Args:
+            queue: Crawl queue to drain.
+            crawler_service: Crawler service used to run the jobs.
+            scheduler: Scheduler used to update ``last_checked`` of tracked pages.
+            concurrency: Number of jobs processed at the same time.
+            poll_interval: Seconds to wait when the queue is empty.
+            worker_id: Identifier recorded on claimed jobs.
+            job_session_factory: Async session factory used to persist the job postings
+                of tracked pages; ``last_checked`` is updated in the same transaction.
+        """
+        self.queue = queue
+        self.crawler_service = crawler_service
+        self.scheduler = scheduler
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.job_session_factory = job_session_factory
+    
+    async def run(self, stop_event: asyncio.Event) -> None:
+        """
+        Process jobs until the stop event is set.
+        
+        Slots finish the job they are working on before exiting.
+        
+        Args:
+            stop_event: Event signalling shutdown.
+        """
+        logger.info(f"Crawl worker {self.worker_id} started with {self.concurrency} slots")
+        await asyncio.gather(*(self._slot(slot, stop_event) for slot in range(self.concurrency)))
+        logger.info(f"Crawl worker {self.worker_id} stopped")
+    
+    async def _slot(self, slot: int, stop_event: asyncio.Event) -> None:
+        worker_id = f"{self.worker_id}:{slot}"
+        while not stop_event.is_set():
+            try:
+                job = await asyncio.to_thread(self.queue.claim, worker_id)
+            except Exception as e:
+                logger.error(f"Failed to claim crawl job: {str(e)}")
+                job = None
+            
+            if job is None:
+                # 佇列為空時等待，收到停止訊號立即結束
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            await self._process(job, worker_id)
+    
+    async def _process(self, job: CrawlJobRead, worker_id: str) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(job, worker_id))
+        try:
+            response = await self.crawler_service.crawl_job_postings(
+                url=job.url,
+                company_name=job.company_name,
+                append_positions_tag=job.append_positions_tag,
+                force_refresh=job.force_refresh,
+            )
+            if job.tracked_page_id:
+                response = await self._enrich(job.tracked_page_id, response)
+        except Exception as e:
+            heartbeat.cancel()
+            error = e.detail if isinstance(e, HTTPException) else str(e)
+            status = await asyncio.to_thread(
+                self.queue.fail, job.id, worker_id, str(error), is_retryable_error(e)
+            )
+            logger.warning(f"Crawl job {job.id} for {job.url} failed (attempt {job.attempts}): {error}")
+        else:
+            persist = bool(job.tracked_page_id and self.job_session_factory)
+            if persist:
+                # 先寫入職缺再完成工作 (職缺寫入與 last_checked 更新在同一交易內完成)；
+                # 寫入失敗時重試且不更新 last_checked，否則下次爬取會因頁面未變更而略過這些職缺
+                try:
+                    async with self.job_session_factory() as session:
+                        await persist_job_postings(session, [(job.tracked_page_id, response)])
+                        await session.commit()
+                except Exception as e:
+                    heartbeat.cancel()
+                    error = f"Failed to persist job postings: {str(e)}"
+                    await asyncio.to_thread(self.queue.fail, job.id, worker_id, error, True)
+                    logger.error(f"Crawl job {job.id} for tracked page {job.tracked_page_id}: {error}")
+                    return
+            
+            heartbeat.cancel()
+            completed = await asyncio.to_thread(
+                self.queue.complete, job.id, worker_id, response.model_dump(mode="json")
+            )
+            status = CRAWL_JOB_SUCCEEDED if completed else None
+            logger.info(f"Crawl job {job.id} for {job.url} found {len(response.job_postings)} job postings")
+            if persist:
+                return
+        
+        # 成功或最終失敗都視為已檢查，避免排程器不斷重新排入失敗頁面
+        if status in (CRAWL_JOB_SUCCEEDED, CRAWL_JOB_FAILED) and job.tracked_page_id and self.scheduler:
+            try:
+                await asyncio.to_thread(self.scheduler.mark_checked, [job.tracked_page_id])
+            except Exception as e:
+                logger.error(f"Failed to update last_checked for tracked page {job.tracked_page_id}: {str(e)}")
+    
+    async def _enrich(self, tracked_page_id, response: JobPostingsResponse) -> JobPostingsResponse:
+        """
+        Enrich the postings of a tracked page that are not stored yet.
+        """
+        if self.job_session_factory is None:
+            return response
+        return await enrich_new_postings(
+            self.crawler_service.enricher, self.job_session_factory, tracked_page_id, response
+        )
+    
+    async def _heartbeat(self, job: CrawlJobRead, worker_id: str) -> None:
+        interval = max(self.queue.lease_seconds / 3, 1.0)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await asyncio.to_thread(self.queue.heartbeat, job.id, worker_id):
+                    logger.warning(f"Lost lease on crawl job {job.id}")
+                    return
+            except Exception as e:
+                logger.error(f"Failed to renew lease on crawl job {job.id}: {str(e)}")
+
+
+def _build_queue() -> CrawlQueue:
+    return CrawlQueue(
+        create_queue_session_factory(),
+        lease_seconds=settings.CRAWL_QUEUE_LEASE_SECONDS,
+        max_attempts=settings.CRAWL_QUEUE_MAX_ATTEMPTS,
+        retry_delay=settings.CRAWL_QUEUE_RETRY_DELAY,
+    )
+
+
+def _build_scheduler(queue: CrawlQueue) -> CrawlScheduler:
+    from app.db.session import SessionLocal
+    return CrawlScheduler(SessionLocal, queue, batch_size=settings.CRAWL_SCHEDULER_BATCH_SIZE)
+
+
+def _install_stop_handlers(stop_event: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+
+async def _run_worker(concurrency: int) -> None:
+    from app.db.session import AsyncSessionLocal
+    stop_event = asyncio.Event()
+    _install_stop_handlers(stop_event)
+    
+    queue = _build_queue()
+    crawler_service = CrawlerService()
+    try:
+        worker = CrawlWorker(
+            queue,
+            crawler_service,
+            scheduler=_build_scheduler(queue),
+            concurrency=concurrency,
+            poll_interval=settings.CRAWL_QUEUE_POLL_INTERVAL,
+            job_session_factory=AsyncSessionLocal,
+        )
+        await worker.run(stop_event)
+    finally:
+        await crawler_service.aclose()
+
+
+async def _run_scheduler(stop_event: asyncio.Event, interval: float) -> None:
+    scheduler = _build_scheduler(_build_queue())
+    while not stop_event.is_set():
+        try:
+            await asyncio.to_thread(scheduler.sweep)
+        except Exception as e:
+            logger.error(f"Crawl scheduler sweep failed: {str(e)}")
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def _run_notifications(stop_event: asyncio.Event) -> None:
+    from app.db.session import AsyncSessionLocal
+    from app.services.notifications.dispatcher import NotificationDispatcher
+    from app.services.notifications.smtp_pool import create_smtp_pool
+    
+    smtp_pool = create_smtp_pool()
+    dispatcher = NotificationDispatcher(
+        AsyncSessionLocal,
+        smtp_pool,
+        digest_window=settings.NOTIFICATION_DIGEST_WINDOW,
+        max_items=settings.NOTIFICATION_DIGEST_MAX_ITEMS,
+        batch_users=settings.NOTIFICATION_DISPATCH_BATCH_USERS,
+        claim_timeout=settings.NOTIFICATION_CLAIM_TIMEOUT,
+    )
+    try:
+        await dispatcher.run(stop_event, interval=settings.NOTIFICATION_DISPATCH_INTERVAL)
+    finally:
+        await smtp_pool.aclose()
+
+
+async def _run_parent(scheduler: bool, notifications: bool) -> None:
+    stop_event = asyncio.Event()
+    _install_stop_handlers(stop_event)
+    
+    tasks = []
+    if scheduler:
+        tasks.append(_run_scheduler(stop_event, settings.CRAWL_SCHEDULER_INTERVAL))
+    if notifications:
+        tasks.append(_run_notifications(stop_event))
+    await asyncio.gather(*tasks)
+
+
+def run_worker_process(concurrency: int) -> None:
+    """
+    Entry point of a worker process.
+    
+    Args:
+        concurrency: Number of jobs processed at the same time.
+    """
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_run_worker(concurrency))
+
+
+def main() -> None:
+    """
+    Start the worker processes and, optionally, the scheduler and the notification
+    dispatcher in the parent process.
+    """
+    parser = argparse.ArgumentParser(description="Run crawl worker processes")
+    parser.add_argument("--processes", type=int, default=settings.CRAWL_WORKER_PROCESSES,
+                        help="Number of worker processes")
+    parser.add_argument("--concurrency", type=int, default=settings.CRAWL_WORKER_CONCURRENCY,
+                        help="Concurrent jobs per worker process")
+    parser.add_argument("--scheduler", action="store_true",
+                        help="Also enqueue jobs for tracked pages that are due")
+    parser.add_argument("--notifications", action="store_true",
+                        help="Also send pending notification digests")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    
+    # 使用 spawn 避免子處理程序繼承父處理程序的資料庫連線
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=run_worker_process, args=(args.concurrency,), name=f"crawl-worker-{index}")
+        for index in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    
+    try:
+        if args.scheduler or args.notifications:
+            asyncio.run(_run_parent(args.scheduler, args.notifications))
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
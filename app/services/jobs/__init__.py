@@ -0,0 +1,3 @@
+"""
+Job posting services.
+"""
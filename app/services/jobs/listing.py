@@ -0,0 +1,184 @@
+"""
+Keyset-paginated job listing queries.
+"""
+import base64
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.job import Job
+from app.models.tracked_page import TrackedPage
+from app.schemas.job import JobRead
+from app.services.matching.skills import get_skill_extractor
+
+
+@dataclass(frozen=True)
+class JobFilters:
+    """
+    Filters of a job listing; None means no filter.
+    """
+    tracked_page_id: Optional[uuid.UUID] = None
+    status: Optional[str] = None
+    location: Optional[str] = None
+    department: Optional[str] = None
+    company: Optional[str] = None
+
+
+def encode_cursor(first_seen: datetime, job_id: uuid.UUID) -> str:
+    """
+    Encode the sort key of the last row of a page into an opaque cursor.
+    
+    Args:
+        first_seen: ``first_seen`` of the last row.
+        job_id: ID of the last row.
+        
+    Returns:
+        str: URL-safe cursor.
+    """
+    payload = json.dumps([first_seen.isoformat(), str(job_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+    
+    Args:
+        cursor: Cursor from a previous page.
+        
+    Returns:
+        Tuple[datetime, uuid.UUID]: ``first_seen`` and ID of the last row of the previous page.
+        
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        first_seen, job_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(first_seen), uuid.UUID(job_id)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor: {str(e)}"
+        )
+
+
+def build_jobs_query(filters: JobFilters, cursor: Optional[str] = None) -> Select:
+    """
+    Build the listing query, newest first, ordered by ``(first_seen, id)``.
+    
+    The keyset condition compares the row value ``(first_seen, id)`` so PostgreSQL can
+    seek directly into the matching composite index instead of skipping rows like
+    OFFSET does.
+    
+    Args:
+        filters: Listing filters.
+        cursor: Cursor of the previous page, if any.
+        
+    Returns:
+        Select: Query yielding ``(Job, company_name)`` rows.
+    """
+    query = apply_job_filters(
+        select(Job, TrackedPage.company_name)
+        .join(TrackedPage, Job.tracked_page_id == TrackedPage.id)
+        .order_by(Job.first_seen.desc(), Job.id.desc()),
+        filters,
+    )
+    
+    if cursor:
+        first_seen, job_id = decode_cursor(cursor)
+        query = query.where(tuple_(Job.first_seen, Job.id) < tuple_(first_seen, job_id))
+    
+    return query
+
+
+def apply_job_filters(query: Select, filters: JobFilters) -> Select:
+    """
+    Add the filter conditions to a query that joins ``Job`` with ``TrackedPage``.
+    
+    Args:
+        query: Query to filter.
+        filters: Listing filters.
+        
+    Returns:
+        Select: Filtered query.
+    """
+    if filters.tracked_page_id is not None:
+        query = query.where(Job.tracked_page_id == filters.tracked_page_id)
+    if filters.status is not None:
+        query = query.where(Job.status == filters.status)
+    if filters.location is not None:
+        query = query.where(Job.location == filters.location)
+    if filters.department is not None:
+        query = query.where(Job.department == filters.department)
+    if filters.company is not None:
+        query = query.where(TrackedPage.company_name == filters.company)
+    return query
+
+
+def to_job_schema(job: Job, company_name: Optional[str]) -> JobRead:
+    """
+    Convert a job row and the company name of its tracked page to the API schema.
+    """
+    result = JobRead.model_validate(job)
+    result.company_name = company_name
+    result.skills = get_skill_extractor().skill_names(job.extracted_skills)
+    return result
+
+
+async def list_jobs(session: AsyncSession, filters: JobFilters, cursor: Optional[str] = None,
+                    limit: int = 50) -> Tuple[List[JobRead], Optional[str]]:
+    """
+    Fetch one page of jobs.
+    
+    Args:
+        session: Database session.
+        filters: Listing filters.
+        cursor: Cursor of the previous page, if any.
+        limit: Page size.
+        
+    Returns:
+        Tuple[List[JobRead], Optional[str]]: Jobs of the page and the cursor of the next page.
+    """
+    # 多取一筆判斷是否還有下一頁
+    rows = (await session.execute(build_jobs_query(filters, cursor).limit(limit + 1))).all()
+    items = [to_job_schema(job, company_name) for job, company_name in rows[:limit]]
+    
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1][0]
+        next_cursor = encode_cursor(last.first_seen, last.id)
+    return items, next_cursor
+
+
+async def iter_jobs_ndjson(session_factory, filters: JobFilters, batch_size: int = 1000) -> AsyncIterator[bytes]:
+    """
+    Stream all matching jobs as NDJSON.
+    
+    The export walks the listing page by page with the keyset cursor, each page in
+    its own short session, so neither memory nor a database transaction grows with
+    the size of the export.
+    
+    Args:
+        session_factory: Async session factory.
+        filters: Listing filters.
+        batch_size: Rows fetched per query.
+        
+    Yields:
+        bytes: One JSON-encoded job per line.
+    """
+    cursor = None
+    while True:
+        async with session_factory() as session:
+            items, cursor = await list_jobs(session, filters, cursor, batch_size)
+        
+        if items:
+            yield b"".join(item.model_dump_json().encode() + b"\n" for item in items)
+        if cursor is None:
+            return
@@ -0,0 +1,186 @@
+"""
+Bulk persistence of extracted job postings into the jobs table.
+"""
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import case, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.job import Job
+from app.models.tracked_page import TrackedPage
+from app.services.crawler.models import JobPosting, JobPostingsResponse
+from app.services.matching.skills import SkillExtractor, get_skill_extractor, job_skill_text
+from app.utils.urls import canonicalize_job_url
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+# 每個 INSERT 的列數；每列約 10 個參數，遠低於 PostgreSQL 的 32767 參數上限
+UPSERT_CHUNK_SIZE = 1000
+
+# upsert 時以新值覆寫的欄位
+UPDATED_COLUMNS = ("job_title", "job_description", "location", "department", "extracted_skills")
+# 列表頁通常沒有、由詳細頁面補齊的欄位；新值為 NULL 時保留既有值
+DETAIL_COLUMNS = ("job_description", "location", "department")
+
+
+@dataclass
+class PersistResult:
+    """
+    Outcome of persisting crawl results.
+    """
+    inserted: Set[uuid.UUID] = field(default_factory=set)
+    updated: Set[uuid.UUID] = field(default_factory=set)
+    # 沒有網址而無法去重、因此略過的職缺數
+    skipped: int = 0
+    # 新職缺 ID，依 (追蹤頁面 ID, 職缺網址)
+    ids_by_url: Dict[Tuple[uuid.UUID, str], uuid.UUID] = field(default_factory=dict)
+
+
+def _truncate(value: Optional[str], length: int) -> Optional[str]:
+    return value[:length] if value else value
+
+
+def _build_rows(results: Sequence[Tuple[uuid.UUID, JobPostingsResponse]], extractor: SkillExtractor,
+                result: PersistResult) -> List[dict]:
+    # 以 (追蹤頁面, 標準網址) 去重；同一語句內重複的衝突鍵會使 ON CONFLICT DO UPDATE 失敗
+    rows: Dict[Tuple[uuid.UUID, str], dict] = {}
+    for tracked_page_id, response in results:
+        if not response.changed:
+            # 頁面未變更，沿用上次結果，只需更新 last_checked
+            continue
+        for posting in response.job_postings:
+            job_url = canonicalize_job_url(posting.url, response.url)
+            if job_url is None or not posting.title:
+                result.skipped += 1
+                continue
+            rows[(tracked_page_id, job_url)] = {
+                "id": uuid.uuid4(),
+                "tracked_page_id": tracked_page_id,
+                "job_url": job_url,
+                "job_title": _truncate(posting.title, Job.job_title.type.length),
+                "job_description": posting.description,
+                "location": _truncate(posting.location, Job.location.type.length),
+                "department": _truncate(posting.department, Job.department.type.length),
+                "extracted_skills": extractor.extract_ids(
+                    job_skill_text(posting.title, posting.description)
+                ).tolist(),
+            }
+    return list(rows.values())
+
+
+def _update_values(excluded) -> Dict[str, object]:
+    values = {column: excluded[column] for column in UPDATED_COLUMNS}
+    # 重新爬取列表頁不應清除先前由詳細頁面補齊的資料
+    for column in DETAIL_COLUMNS:
+        values[column] = func.coalesce(excluded[column], getattr(Job, column))
+    values["extracted_skills"] = case(
+        (excluded.job_description.is_(None), Job.extracted_skills),
+        else_=excluded.extracted_skills,
+    )
+    return values
+
+
+async def new_job_postings(session: AsyncSession, tracked_page_id: uuid.UUID,
+                           response: JobPostingsResponse) -> List[JobPosting]:
+    """
+    Get the postings of a crawl result that are not stored for the tracked page yet.
+    
+    Args:
+        session: Database session.
+        tracked_page_id: ID of the tracked page.
+        response: Crawl result of the page.
+        
+    Returns:
+        List[JobPosting]: Postings whose canonical URL is not in the jobs table.
+    """
+    urls = {
+        canonicalize_job_url(posting.url, response.url): posting for posting in response.job_postings
+    }
+    urls.pop(None, None)
+    if not urls:
+        return []
+    
+    known = set(await session.scalars(
+        select(Job.job_url).where(Job.tracked_page_id == tracked_page_id, Job.job_url.in_(list(urls)))
+    ))
+    return [posting for url, posting in urls.items() if url not in known]
+
+
+def _insert(session: AsyncSession):
+    # 依資料庫方言選擇支援 ON CONFLICT 的 insert
+    if session.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+async def persist_job_postings(session: AsyncSession, results: Iterable[Tuple[uuid.UUID, JobPostingsResponse]],
+                               checked_at: Optional[datetime] = None,
+                               extractor: Optional[SkillExtractor] = None,
+                               chunk_size: int = UPSERT_CHUNK_SIZE) -> PersistResult:
+    """
+    Upsert the postings of one or more crawl results and mark their pages as checked.
+    
+    Each chunk is written with a single ``INSERT ... ON CONFLICT (tracked_page_id, job_url)
+    DO UPDATE ... RETURNING id``. Missing details (description, location, department)
+    never overwrite stored ones. The update only fires when a field actually changed,
+    so unchanged postings return nothing; a returned ID equal to the one generated for
+    the row means it was inserted, any other ID belongs to an updated existing row.
+    ``last_checked`` of the pages is updated in the same transaction. The caller commits.
+    
+    Args:
+        session: Database session.
+        results: ``(tracked_page_id, response)`` pairs.
+        checked_at: Time of the check, defaults to the current time.
+        extractor: Skill extractor used to tag postings, defaults to the built-in dictionary.
+        chunk_size: Rows per INSERT statement.
+        
+    Returns:
+        PersistResult: IDs of inserted and updated jobs.
+    """
+    results = list(results)
+    result = PersistResult()
+    rows = _build_rows(results, extractor or get_skill_extractor(), result)
+    now = checked_at or datetime.now(timezone.utc)
+    
+    if rows:
+        insert = _insert(session)
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            statement = insert(Job).values(chunk)
+            excluded = statement.excluded
+            values = _update_values(excluded)
+            statement = statement.on_conflict_do_update(
+                index_elements=["tracked_page_id", "job_url"],
+                set_={**values, "updated_at": now},
+                where=or_(*(getattr(Job, column).is_distinct_from(value) for column, value in values.items())),
+            ).returning(Job.id, Job.tracked_page_id, Job.job_url)
+            
+            generated = {row["id"] for row in chunk}
+            for job_id, tracked_page_id, job_url in await session.execute(statement):
+                if job_id in generated:
+                    result.inserted.add(job_id)
+                    result.ids_by_url[(tracked_page_id, job_url)] = job_id
+                else:
+                    result.updated.add(job_id)
+    
+    page_ids = list({tracked_page_id for tracked_page_id, _ in results})
+    if page_ids:
+        await session.execute(
+            update(TrackedPage)
+            .where(TrackedPage.id.in_(page_ids))
+            .values(last_checked=now)
+            .execution_options(synchronize_session=False)
+        )
+    
+    logger.info(
+        f"Persisted {len(rows)} job postings from {len(page_ids)} pages: "
+        f"{len(result.inserted)} inserted, {len(result.updated)} updated, {result.skipped} skipped"
+    )
+    return result
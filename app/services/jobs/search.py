@@ -0,0 +1,321 @@
+"""
+Job search: PostgreSQL full-text and trigram search with an in-process fallback index.
+"""
+import asyncio
+import bisect
+import logging
+import math
+import re
+import uuid
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.job import SEARCH_CONFIG, Job, job_search_vector
+from app.models.tracked_page import TrackedPage
+from app.schemas.job import JobSearchResult
+from app.services.jobs.listing import JobFilters, apply_job_filters, to_job_schema
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+# 與 pg_trgm 預設相同的相似度門檻
+TRIGRAM_SIMILARITY_THRESHOLD = 0.3
+# 全文檢索與職稱模糊比對分數的權重
+TITLE_SIMILARITY_WEIGHT = 0.5
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Split text into lowercase word tokens.
+    """
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def trigrams(text: Optional[str]) -> Set[str]:
+    """
+    Trigrams of a text, padded per word the way pg_trgm does.
+    """
+    result = set()
+    for word in tokenize(text):
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def trigram_similarity(left: Set[str], right: Set[str]) -> float:
+    """
+    Jaccard similarity of two trigram sets, as computed by pg_trgm's ``similarity``.
+    """
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+def prefix_tsquery(prefix: str, weight: str = "A") -> Optional[str]:
+    """
+    Build a ``to_tsquery`` string for autocomplete: earlier tokens match whole words,
+    the last token matches as a prefix, all restricted to lexemes of the given weight.
+    
+    Args:
+        prefix: Text typed by the user.
+        weight: tsvector weight to match, ``A`` being the job title.
+        
+    Returns:
+        Optional[str]: Query such as ``senior:A & back:*A``, or None if the prefix has no tokens.
+    """
+    tokens = tokenize(prefix)
+    if not tokens:
+        return None
+    return " & ".join([f"{token}:{weight}" for token in tokens[:-1]] + [f"{tokens[-1]}:*{weight}"])
+
+
+class JobSearchIndex:
+    """
+    In-process inverted index over job titles and descriptions.
+    
+    Used when the database is not PostgreSQL (e.g. SQLite in tests). Ranking mirrors
+    the SQL path: weighted term matches (title above description) scaled by inverse
+    document frequency, plus trigram similarity of the title for typo tolerance.
+    """
+    
+    TITLE_WEIGHT = 1.0
+    DESCRIPTION_WEIGHT = 0.4
+    
+    def __init__(self):
+        self._postings: Dict[str, Dict[uuid.UUID, float]] = defaultdict(dict)
+        self._title_terms: Dict[str, Set[uuid.UUID]] = defaultdict(set)
+        self._trigram_postings: Dict[str, Set[uuid.UUID]] = defaultdict(set)
+        self._title_trigrams: Dict[uuid.UUID, Set[str]] = {}
+        self._titles: Dict[uuid.UUID, str] = {}
+        self._sorted_title_terms: List[str] = []
+    
+    @classmethod
+    def build(cls, documents: Iterable[Tuple[uuid.UUID, str, Optional[str]]]) -> "JobSearchIndex":
+        """
+        Build an index.
+        
+        Args:
+            documents: ``(job_id, job_title, job_description)`` tuples.
+            
+        Returns:
+            JobSearchIndex: The index.
+        """
+        index = cls()
+        for job_id, title, description in documents:
+            index.add(job_id, title, description)
+        index._sorted_title_terms = sorted(index._title_terms)
+        return index
+    
+    def add(self, job_id: uuid.UUID, title: str, description: Optional[str]) -> None:
+        """
+        Add a job to the index.
+        """
+        self._titles[job_id] = title
+        for term, count in Counter(tokenize(title)).items():
+            self._postings[term][job_id] = self._postings[term].get(job_id, 0.0) + self.TITLE_WEIGHT * count
+            self._title_terms[term].add(job_id)
+        for term, count in Counter(tokenize(description)).items():
+            self._postings[term][job_id] = self._postings[term].get(job_id, 0.0) + self.DESCRIPTION_WEIGHT * count
+        
+        grams = trigrams(title)
+        self._title_trigrams[job_id] = grams
+        for gram in grams:
+            self._trigram_postings[gram].add(job_id)
+    
+    def __len__(self) -> int:
+        return len(self._titles)
+    
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[uuid.UUID, float]]:
+        """
+        Rank jobs against a query.
+        
+        Args:
+            query: Search text.
+            limit: Maximum number of results.
+            
+        Returns:
+            List[Tuple[uuid.UUID, float]]: Job IDs and scores, best first.
+        """
+        scores: Dict[uuid.UUID, float] = defaultdict(float)
+        total = max(len(self._titles), 1)
+        terms = set(tokenize(query))
+        
+        matched: Optional[Set[uuid.UUID]] = None
+        for term in terms:
+            postings = self._postings.get(term, {})
+            # 全文檢索須符合所有詞 (與 websearch_to_tsquery 的 AND 語意相同)
+            matched = set(postings) if matched is None else matched & set(postings)
+            idf = math.log(1 + total / (1 + len(postings)))
+            for job_id, weight in postings.items():
+                scores[job_id] += (1 + math.log(weight)) * idf if weight >= 1 else weight * idf
+        matched = matched or set()
+        
+        # 職稱模糊比對：只比對至少共用一個三元組的候選
+        query_grams = trigrams(query)
+        candidates = set().union(*(self._trigram_postings.get(gram, ()) for gram in query_grams))
+        for job_id in candidates:
+            similarity = trigram_similarity(query_grams, self._title_trigrams[job_id])
+            if similarity >= TRIGRAM_SIMILARITY_THRESHOLD:
+                matched.add(job_id)
+                scores[job_id] += TITLE_SIMILARITY_WEIGHT * similarity
+        
+        ranked = sorted(((job_id, scores[job_id]) for job_id in matched), key=lambda item: item[1], reverse=True)
+        return ranked[:limit] if limit else ranked
+    
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+        Suggest job titles containing words that start with the prefix.
+        
+        Args:
+            prefix: Text typed by the user; all but the last token must match whole words.
+            limit: Maximum number of suggestions.
+            
+        Returns:
+            List[str]: Titles, most common first.
+        """
+        tokens = tokenize(prefix)
+        if not tokens:
+            return []
+        
+        *words, last = tokens
+        start = bisect.bisect_left(self._sorted_title_terms, last)
+        matched: Set[uuid.UUID] = set()
+        for term in self._sorted_title_terms[start:]:
+            if not term.startswith(last):
+                break
+            matched |= self._title_terms[term]
+        for word in words:
+            matched &= self._title_terms.get(word, set())
+        
+        counts = Counter(self._titles[job_id] for job_id in matched)
+        return [title for title, _ in counts.most_common(limit)]
+
+
+class JobSearchService:
+    """
+    Searches jobs in the database.
+    
+    On PostgreSQL queries use the GIN ``tsvector`` expression index and the ``pg_trgm``
+    title index; other databases fall back to a ``JobSearchIndex`` that is rebuilt
+    when the jobs table changes.
+    """
+    
+    def __init__(self):
+        self._fallback_index: Optional[JobSearchIndex] = None
+        self._fallback_signature = None
+        self._fallback_lock = asyncio.Lock()
+    
+    async def search(self, session: AsyncSession, query: str, filters: JobFilters,
+                     limit: int = 20) -> List[JobSearchResult]:
+        """
+        Search jobs by title and description, best matches first.
+        
+        Args:
+            session: Database session.
+            query: Search text (web search syntax on PostgreSQL: quotes, ``or``, ``-``).
+            filters: Listing filters applied to the results.
+            limit: Maximum number of results.
+            
+        Returns:
+            List[JobSearchResult]: Ranked jobs.
+        """
+        if session.bind.dialect.name == "postgresql":
+            return await self._search_postgresql(session, query, filters, limit)
+        return await self._search_fallback(session, query, filters, limit)
+    
+    async def suggest(self, session: AsyncSession, prefix: str, limit: int = 10) -> List[str]:
+        """
+        Autocomplete job titles from a prefix.
+        
+        Args:
+            session: Database session.
+            prefix: Text typed by the user.
+            limit: Maximum number of suggestions.
+            
+        Returns:
+            List[str]: Suggested titles, most common first.
+        """
+        if session.bind.dialect.name != "postgresql":
+            index = await self._get_fallback_index(session)
+            return index.suggest(prefix, limit)
+        
+        tsquery = prefix_tsquery(prefix)
+        if tsquery is None:
+            return []
+        
+        # 與全文索引相同的運算式，查詢只比對權重 A (職稱) 的詞
+        title_count = func.count().label("count")
+        rows = await session.execute(
+            select(Job.job_title, title_count)
+            .where(job_search_vector(Job.job_title, Job.job_description).op("@@")(
+                func.to_tsquery(SEARCH_CONFIG, tsquery)
+            ))
+            .group_by(Job.job_title)
+            .order_by(title_count.desc(), Job.job_title)
+            .limit(limit)
+        )
+        return [row.job_title for row in rows]
+    
+    async def _search_postgresql(self, session: AsyncSession, query: str, filters: JobFilters,
+                                 limit: int) -> List[JobSearchResult]:
+        vector = job_search_vector(Job.job_title, Job.job_description)
+        tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+        # ts_rank_cd 的正規化選項 32 將分數壓到 0~1，與職稱相似度同一尺度
+        score = (
+            func.ts_rank_cd(vector, tsquery, literal_column("32"))
+            + TITLE_SIMILARITY_WEIGHT * func.similarity(Job.job_title, query)
+        ).label("score")
+        
+        statement = apply_job_filters(
+            select(Job, TrackedPage.company_name, score)
+            .join(TrackedPage, Job.tracked_page_id == TrackedPage.id)
+            # 兩個條件分別由 GIN 全文索引與三元組索引處理 (BitmapOr)
+            .where(or_(vector.op("@@")(tsquery), Job.job_title.op("%")(query)))
+            .order_by(score.desc(), Job.first_seen.desc())
+            .limit(limit),
+            filters,
+        )
+        rows = await session.execute(statement)
+        return [
+            JobSearchResult(**to_job_schema(job, company_name).model_dump(), score=float(row_score))
+            for job, company_name, row_score in rows
+        ]
+    
+    async def _search_fallback(self, session: AsyncSession, query: str, filters: JobFilters,
+                               limit: int) -> List[JobSearchResult]:
+        index = await self._get_fallback_index(session)
+        ranked = index.search(query)
+        if not ranked:
+            return []
+        
+        scores = dict(ranked)
+        rows = await session.execute(
+            apply_job_filters(
+                select(Job, TrackedPage.company_name)
+                .join(TrackedPage, Job.tracked_page_id == TrackedPage.id)
+                .where(Job.id.in_(list(scores))),
+                filters,
+            )
+        )
+        results = [
+            JobSearchResult(**to_job_schema(job, company_name).model_dump(), score=scores[job.id])
+            for job, company_name in rows
+        ]
+        results.sort(key=lambda result: (result.score, result.first_seen), reverse=True)
+        return results[:limit]
+    
+    async def _get_fallback_index(self, session: AsyncSession) -> JobSearchIndex:
+        # 以筆數與最後更新時間判斷資料是否變動，變動時才重建
+        signature = (await session.execute(select(func.count(Job.id), func.max(Job.updated_at)))).one()
+        async with self._fallback_lock:
+            if self._fallback_index is None or tuple(signature) != self._fallback_signature:
+                rows = await session.execute(select(Job.id, Job.job_title, Job.job_description))
+                self._fallback_index = JobSearchIndex.build(rows.tuples())
+                self._fallback_signature = tuple(signature)
+                logger.debug(f"Rebuilt in-process job search index with {len(self._fallback_index)} jobs")
+            return self._fallback_index
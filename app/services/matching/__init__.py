@@ -0,0 +1,3 @@
+"""
+Resume-to-job matching services.
+"""
@@ -0,0 +1,324 @@
+"""
+Batched resume-to-job matching with sparse TF-IDF matrices.
+"""
+import logging
+import uuid
+from typing import Collection, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel
+from scipy import sparse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.resume import Resume
+from app.models.user import User
+from app.services.matching.skills import get_skill_extractor, resume_skill_text
+from app.services.matching.tfidf import IncrementalTfidfVectorizer
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+
+class ResumeDocument(BaseModel):
+    """
+    Text of an active resume to match jobs against.
+    """
+    resume_id: uuid.UUID
+    user_id: uuid.UUID
+    text: str
+    skill_ids: List[int] = []
+
+
+class JobDocument(BaseModel):
+    """
+    Text of a job to score.
+    """
+    job_id: uuid.UUID
+    text: str
+    skill_ids: List[int] = []
+
+
+class JobMatch(BaseModel):
+    """
+    Job matching one of a user's resumes.
+    """
+    user_id: uuid.UUID
+    job_id: uuid.UUID
+    resume_id: uuid.UUID
+    # 0-100
+    score: float
+
+
+def resume_text(resume: Resume) -> str:
+    """
+    Text used to match a resume: its content followed by its skills.
+    """
+    return resume_skill_text(resume.content, resume.skills)
+
+
+async def load_active_resumes(session: AsyncSession) -> List[ResumeDocument]:
+    """
+    Load the resumes of all active users.
+    
+    Args:
+        session: Database session.
+        
+    Returns:
+        List[ResumeDocument]: Resumes to match jobs against.
+    """
+    resumes = await session.scalars(
+        select(Resume).join(User, Resume.user_id == User.id).where(User.is_active.is_(True))
+    )
+    extractor = get_skill_extractor()
+    documents = []
+    for resume in resumes:
+        text = resume_text(resume)
+        # 尚未擷取技能的履歷在載入時即時擷取
+        skill_ids = resume.skill_ids if resume.skill_ids is not None else extractor.extract_ids(text).tolist()
+        documents.append(ResumeDocument(resume_id=resume.id, user_id=resume.user_id, text=text, skill_ids=skill_ids))
+    return documents
+
+
+def skill_matrix(skill_ids: Sequence[Sequence[int]], n_skills: int) -> sparse.csr_matrix:
+    """
+    Build a binary (document x skill) matrix from per-document skill ID lists.
+    
+    Args:
+        skill_ids: Sorted, unique skill IDs per document.
+        n_skills: Number of columns (largest skill ID + 1).
+        
+    Returns:
+        sparse.csr_matrix: Matrix with a 1 for every skill of every document.
+    """
+    indptr = np.zeros(len(skill_ids) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(ids) for ids in skill_ids])
+    indices = np.fromiter((skill_id for ids in skill_ids for skill_id in ids), dtype=np.int64, count=indptr[-1])
+    return sparse.csr_matrix((np.ones(len(indices)), indices, indptr), shape=(len(skill_ids), n_skills))
+
+
+class _ResumeBlock(NamedTuple):
+    """
+    Resumes stacked into one matrix for a scoring pass.
+    """
+    resume_ids: List[uuid.UUID]
+    user_ids: List[uuid.UUID]
+    # 每列履歷所屬用戶在 user_ids 中的位置
+    users: np.ndarray
+    tf: sparse.csr_matrix
+    skill_ids: List[List[int]]
+
+
+class MatchingEngine:
+    """
+    Scores batches of jobs against all active resumes with one sparse matrix product.
+    
+    Jobs form the TF-IDF corpus: every scored batch updates the vocabulary and document
+    frequencies incrementally, and resumes are re-weighted with the current IDF on each
+    pass (cheap, linear in their non-zeros). Scores range from 0 to 100. When jobs carry extracted skill IDs, the
+    score blends the TF-IDF cosine similarity with the share of the job's skills found
+    in the resume; the skill intersections of the whole batch are one more sparse
+    product of binary (document x skill) matrices. A user with several resumes gets
+    the best score per job.
+    """
+    
+    def __init__(self, threshold: Optional[float] = None, top_k: Optional[int] = None,
+                 skill_weight: Optional[float] = None, vectorizer: Optional[IncrementalTfidfVectorizer] = None):
+        """
+        Initialize the engine.
+        
+        Args:
+            threshold: Minimum score of a match (0-100), defaults to JOB_MATCH_THRESHOLD.
+            top_k: Maximum number of matches returned per user and batch, defaults to JOB_MATCH_TOP_K.
+            skill_weight: Weight of the skill overlap in the score, defaults to JOB_MATCH_SKILL_WEIGHT.
+            vectorizer: Vectorizer holding the vocabulary and IDF statistics.
+        """
+        self.threshold = settings.JOB_MATCH_THRESHOLD if threshold is None else threshold
+        self.top_k = top_k or settings.JOB_MATCH_TOP_K
+        self.skill_weight = settings.JOB_MATCH_SKILL_WEIGHT if skill_weight is None else skill_weight
+        self.vectorizer = vectorizer or IncrementalTfidfVectorizer()
+        self._resumes: Dict[uuid.UUID, ResumeDocument] = {}
+        # 每份履歷的詞頻列 (1 x 詞彙數)，詞彙成長時於堆疊時補齊寬度
+        self._resume_tf: Dict[uuid.UUID, sparse.csr_matrix] = {}
+        # 全部履歷堆疊後的快取，履歷變動時失效
+        self._all_resumes: Optional[_ResumeBlock] = None
+    
+    @property
+    def n_resumes(self) -> int:
+        return len(self._resumes)
+    
+    def set_resumes(self, resumes: Sequence[ResumeDocument]) -> None:
+        """
+        Replace the set of active resumes.
+        
+        Args:
+            resumes: All active resumes.
+        """
+        self._resumes.clear()
+        self._resume_tf.clear()
+        self.upsert_resumes(resumes)
+    
+    def upsert_resumes(self, resumes: Sequence[ResumeDocument]) -> None:
+        """
+        Add new resumes or replace changed ones.
+        
+        Args:
+            resumes: Resumes to add or replace.
+        """
+        tf = self.vectorizer.term_frequencies([resume.text for resume in resumes], grow_vocabulary=True)
+        for row, resume in enumerate(resumes):
+            self._resumes[resume.resume_id] = resume
+            self._resume_tf[resume.resume_id] = tf[row]
+        self._all_resumes = None
+    
+    def remove_resume(self, resume_id: uuid.UUID) -> None:
+        """
+        Remove a deleted resume, or the resume of a deactivated user.
+        """
+        if self._resumes.pop(resume_id, None) is not None:
+            del self._resume_tf[resume_id]
+            self._all_resumes = None
+    
+    def observe_jobs(self, texts: Sequence[str]) -> None:
+        """
+        Add job texts to the IDF statistics without scoring them (e.g. to warm up on start).
+        """
+        self.vectorizer.partial_fit(texts)
+    
+    def match_jobs(self, jobs: Sequence[JobDocument],
+                   candidates: Optional[Sequence[Collection[uuid.UUID]]] = None) -> Dict[uuid.UUID, List[JobMatch]]:
+        """
+        Score a batch of new jobs against the active resumes.
+        
+        Args:
+            jobs: New jobs, e.g. everything found by one sweep.
+            candidates: Resume IDs to score per job (same order as ``jobs``), e.g. from
+                ``InterestIndex``. If None, every job is scored against every resume.
+            
+        Returns:
+            Dict[uuid.UUID, List[JobMatch]]: Top-k matches above the threshold per user, best first.
+        """
+        if not jobs:
+            return {}
+        
+        job_tf = self.vectorizer.partial_fit([job.text for job in jobs])
+        if candidates is None:
+            if self._all_resumes is None:
+                self._all_resumes = self._stack(list(self._resumes))
+            block = self._all_resumes
+        else:
+            # 只堆疊候選履歷，成本與候選數量成正比
+            block = self._stack([
+                resume_id for resume_id in set().union(*candidates) if resume_id in self._resumes
+            ])
+        if not block.resume_ids:
+            return {}
+        
+        # (履歷 x 職缺) 相似度，一次稀疏矩陣乘法
+        scores = (self.vectorizer.weight(block.tf) @ self.vectorizer.weight(job_tf).T).tocsr()
+        if self.skill_weight:
+            scores = self._blend_skill_overlap(scores, block, jobs)
+        if candidates is not None:
+            scores = scores.multiply(self._candidate_mask(block, candidates))
+        scores = sparse.coo_matrix(scores)
+        # 內部分數為 0-1，門檻與輸出為 0-100
+        keep = scores.data * 100 >= self.threshold
+        rows, columns, values = scores.row[keep], scores.col[keep], scores.data[keep]
+        if not len(values):
+            return {}
+        
+        users = block.users[rows]
+        
+        # 同一用戶多份履歷時，每個職缺只保留最高分
+        order = np.lexsort((-values, columns, users))
+        users, columns, rows, values = users[order], columns[order], rows[order], values[order]
+        first = np.ones(len(values), dtype=bool)
+        first[1:] = (users[1:] != users[:-1]) | (columns[1:] != columns[:-1])
+        users, columns, rows, values = users[first], columns[first], rows[first], values[first]
+        
+        # 每個用戶依分數排序後取前 top_k
+        order = np.lexsort((-values, users))
+        users, columns, rows, values = users[order], columns[order], rows[order], values[order]
+        group_start = np.r_[0, np.flatnonzero(users[1:] != users[:-1]) + 1]
+        rank = np.arange(len(users)) - np.repeat(group_start, np.diff(np.r_[group_start, len(users)]))
+        keep = rank < self.top_k
+        
+        matches: Dict[uuid.UUID, List[JobMatch]] = {}
+        for user, column, row, value in zip(users[keep], columns[keep], rows[keep], values[keep]):
+            user_id = block.user_ids[user]
+            matches.setdefault(user_id, []).append(JobMatch(
+                user_id=user_id,
+                job_id=jobs[column].job_id,
+                resume_id=block.resume_ids[row],
+                score=round(float(value) * 100, 2),
+            ))
+        
+        logger.info(
+            f"Scored {len(jobs)} jobs against {len(block.resume_ids)} resumes: "
+            f"{sum(len(user_matches) for user_matches in matches.values())} matches for {len(matches)} users"
+        )
+        return matches
+    
+    def _stack(self, resume_ids: List[uuid.UUID]) -> "_ResumeBlock":
+        rows = [self._resume_tf[resume_id] for resume_id in resume_ids]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([row.nnz for row in rows])
+        tf = sparse.csr_matrix(
+            (
+                np.concatenate([row.data for row in rows]) if rows else np.zeros(0),
+                np.concatenate([row.indices for row in rows]) if rows else np.zeros(0, dtype=np.int64),
+                indptr,
+            ),
+            shape=(len(rows), self.vectorizer.n_features),
+        )
+        
+        user_index: Dict[uuid.UUID, int] = {}
+        for resume_id in resume_ids:
+            user_index.setdefault(self._resumes[resume_id].user_id, len(user_index))
+        users = np.fromiter(
+            (user_index[self._resumes[resume_id].user_id] for resume_id in resume_ids),
+            dtype=np.int64,
+            count=len(resume_ids),
+        )
+        return _ResumeBlock(
+            resume_ids=resume_ids,
+            user_ids=list(user_index),
+            users=users,
+            tf=tf,
+            skill_ids=[self._resumes[resume_id].skill_ids for resume_id in resume_ids],
+        )
+    
+    @staticmethod
+    def _candidate_mask(block: "_ResumeBlock", candidates: Sequence[Collection[uuid.UUID]]) -> sparse.csr_matrix:
+        row_index = {resume_id: row for row, resume_id in enumerate(block.resume_ids)}
+        rows, columns = [], []
+        for column, resume_ids in enumerate(candidates):
+            for resume_id in resume_ids:
+                row = row_index.get(resume_id)
+                if row is not None:
+                    rows.append(row)
+                    columns.append(column)
+        return sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, columns)), shape=(len(block.resume_ids), len(candidates))
+        )
+    
+    def _blend_skill_overlap(self, scores: sparse.csr_matrix, block: "_ResumeBlock",
+                             jobs: Sequence[JobDocument]) -> sparse.csr_matrix:
+        # 沒有技能的職缺只使用 TF-IDF 分數
+        job_skill_counts = np.array([len(job.skill_ids) for job in jobs], dtype=np.float64)
+        if not job_skill_counts.any():
+            return scores
+        
+        n_skills = 1 + max(
+            max((max(ids) for ids in block.skill_ids if ids), default=0),
+            max((max(job.skill_ids) for job in jobs if job.skill_ids), default=0),
+        )
+        resume_skills = skill_matrix(block.skill_ids, n_skills)
+        job_skills = skill_matrix([job.skill_ids for job in jobs], n_skills)
+        
+        # 交集大小 / 職缺技能數 = 履歷涵蓋職缺技能的比例
+        overlap = (resume_skills @ job_skills.T).tocsr()
+        coverage = overlap @ sparse.diags(1.0 / np.maximum(job_skill_counts, 1.0))
+        text_weight = np.where(job_skill_counts > 0, 1.0 - self.skill_weight, 1.0)
+        return scores @ sparse.diags(text_weight) + self.skill_weight * coverage
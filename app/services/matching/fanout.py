@@ -0,0 +1,311 @@
+"""
+Inverted interest index used to fan out new job postings to candidate users.
+"""
+import logging
+import uuid
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.tracked_page import TrackedPage
+from app.models.user import User
+from app.services.crawler.models import JobPostingsResponse
+from app.services.matching.engine import JobDocument, JobMatch, MatchingEngine, ResumeDocument, load_active_resumes
+from app.services.matching.skills import SkillExtractor, get_skill_extractor, job_skill_text
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+
+def normalize_company(company_name: Optional[str]) -> Optional[str]:
+    """
+    Normalize a company name for interest lookups.
+    """
+    if not company_name:
+        return None
+    return " ".join(company_name.lower().split()) or None
+
+
+class InterestIndex:
+    """
+    Inverted index from skill ID, tracked page and company to interested resumes.
+    
+    Candidate generation for a posting only touches the posting lists of its skills
+    and of its tracked page / company, so its cost grows with the number of interested
+    users instead of the total user base. The index is updated in place as resumes and
+    tracked pages change.
+    """
+    
+    def __init__(self, min_shared_skills: int = 1):
+        """
+        Initialize an empty index.
+        
+        Args:
+            min_shared_skills: Skills a resume must share with a posting (that lists
+                skills) to become a candidate.
+        """
+        self.min_shared_skills = min_shared_skills
+        self._resumes_by_skill: Dict[int, Set[uuid.UUID]] = defaultdict(set)
+        self._resume_skills: Dict[uuid.UUID, FrozenSet[int]] = {}
+        self._resume_user: Dict[uuid.UUID, uuid.UUID] = {}
+        self._resumes_by_user: Dict[uuid.UUID, Set[uuid.UUID]] = defaultdict(set)
+        self._users_by_page: Dict[uuid.UUID, Set[uuid.UUID]] = defaultdict(set)
+        self._users_by_company: Dict[str, Set[uuid.UUID]] = defaultdict(set)
+        self._page_company: Dict[uuid.UUID, Optional[str]] = {}
+    
+    def upsert_resume(self, resume: ResumeDocument) -> None:
+        """
+        Add a resume, or re-index it after its skills changed.
+        """
+        self.remove_resume(resume.resume_id)
+        skills = frozenset(resume.skill_ids)
+        self._resume_skills[resume.resume_id] = skills
+        self._resume_user[resume.resume_id] = resume.user_id
+        self._resumes_by_user[resume.user_id].add(resume.resume_id)
+        for skill_id in skills:
+            self._resumes_by_skill[skill_id].add(resume.resume_id)
+    
+    def remove_resume(self, resume_id: uuid.UUID) -> None:
+        """
+        Remove a resume from the index.
+        """
+        skills = self._resume_skills.pop(resume_id, None)
+        if skills is None:
+            return
+        for skill_id in skills:
+            postings = self._resumes_by_skill[skill_id]
+            postings.discard(resume_id)
+            if not postings:
+                del self._resumes_by_skill[skill_id]
+        
+        user_id = self._resume_user.pop(resume_id)
+        self._resumes_by_user[user_id].discard(resume_id)
+        if not self._resumes_by_user[user_id]:
+            del self._resumes_by_user[user_id]
+    
+    def remove_user(self, user_id: uuid.UUID) -> None:
+        """
+        Remove all resumes and tracked pages of a (deactivated) user.
+        """
+        for resume_id in list(self._resumes_by_user.get(user_id, ())):
+            self.remove_resume(resume_id)
+        for users in (*self._users_by_page.values(), *self._users_by_company.values()):
+            users.discard(user_id)
+    
+    def track_page(self, user_id: uuid.UUID, tracked_page_id: uuid.UUID, company_name: Optional[str] = None) -> None:
+        """
+        Register a user's tracked page (and its company).
+        """
+        self._users_by_page[tracked_page_id].add(user_id)
+        company = normalize_company(company_name)
+        self._page_company[tracked_page_id] = company
+        if company:
+            self._users_by_company[company].add(user_id)
+    
+    def untrack_page(self, user_id: uuid.UUID, tracked_page_id: uuid.UUID) -> None:
+        """
+        Remove a user's tracked page.
+        
+        The user stays interested in the company while tracking another of its pages.
+        """
+        self._users_by_page[tracked_page_id].discard(user_id)
+        if not self._users_by_page[tracked_page_id]:
+            del self._users_by_page[tracked_page_id]
+        
+        company = self._page_company.get(tracked_page_id)
+        if company and not any(
+            user_id in self._users_by_page.get(page_id, ())
+            for page_id, page_company in self._page_company.items()
+            if page_company == company
+        ):
+            self._users_by_company[company].discard(user_id)
+        if tracked_page_id not in self._users_by_page:
+            self._page_company.pop(tracked_page_id, None)
+    
+    def interested_users(self, tracked_page_id: Optional[uuid.UUID] = None,
+                         company_name: Optional[str] = None) -> Set[uuid.UUID]:
+        """
+        Users tracking the page or any page of the company.
+        """
+        users = set(self._users_by_page.get(tracked_page_id, ())) if tracked_page_id else set()
+        company = normalize_company(company_name) or self._page_company.get(tracked_page_id)
+        if company:
+            users |= self._users_by_company.get(company, set())
+        return users
+    
+    def candidates(self, skill_ids: Iterable[int], tracked_page_id: Optional[uuid.UUID] = None,
+                   company_name: Optional[str] = None) -> Set[uuid.UUID]:
+        """
+        Resumes worth scoring for a posting.
+        
+        With a tracked page or company, only resumes of users tracking it are considered;
+        among those, resumes must share ``min_shared_skills`` skills with the posting
+        (resumes or postings without extracted skills are kept, since there is nothing
+        to filter on). Without a page or company, any resume sharing enough skills is a
+        candidate.
+        
+        Args:
+            skill_ids: Skill IDs of the posting.
+            tracked_page_id: Tracked page the posting was found on.
+            company_name: Company of the posting.
+            
+        Returns:
+            Set[uuid.UUID]: Candidate resume IDs.
+        """
+        skills = set(skill_ids)
+        scoped = tracked_page_id is not None or company_name is not None
+        
+        if scoped:
+            scope = [
+                resume_id
+                for user_id in self.interested_users(tracked_page_id, company_name)
+                for resume_id in self._resumes_by_user.get(user_id, ())
+            ]
+            if not skills:
+                return set(scope)
+            # 從較小的一側出發：逐一檢查範圍內履歷，或走訪技能倒排列表
+            posting_cost = sum(len(self._resumes_by_skill.get(skill_id, ())) for skill_id in skills)
+            if len(scope) <= posting_cost:
+                return {
+                    resume_id for resume_id in scope
+                    if not self._resume_skills[resume_id]
+                    or len(self._resume_skills[resume_id] & skills) >= self.min_shared_skills
+                }
+            scope_set = set(scope)
+            return {
+                resume_id for resume_id in self._skill_hits(skills) if resume_id in scope_set
+            } | {resume_id for resume_id in scope_set if not self._resume_skills[resume_id]}
+        
+        return self._skill_hits(skills)
+    
+    def _skill_hits(self, skills: Set[int]) -> Set[uuid.UUID]:
+        if self.min_shared_skills <= 1:
+            return set().union(*(self._resumes_by_skill.get(skill_id, ()) for skill_id in skills))
+        counts = Counter(
+            resume_id for skill_id in skills for resume_id in self._resumes_by_skill.get(skill_id, ())
+        )
+        return {resume_id for resume_id, count in counts.items() if count >= self.min_shared_skills}
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get index size metrics.
+        """
+        return {
+            "resumes": len(self._resume_skills),
+            "users": len(self._resumes_by_user),
+            "skills": len(self._resumes_by_skill),
+            "tracked_pages": len(self._users_by_page),
+            "companies": len(self._users_by_company),
+        }
+
+
+async def build_interest_index(session: AsyncSession, resumes: Optional[Sequence[ResumeDocument]] = None,
+                               min_shared_skills: int = 1) -> InterestIndex:
+    """
+    Build the interest index from the resumes and tracked pages of active users.
+    
+    Args:
+        session: Database session.
+        resumes: Already loaded active resumes, loaded from the database if None.
+        min_shared_skills: See ``InterestIndex``.
+        
+    Returns:
+        InterestIndex: The populated index.
+    """
+    index = InterestIndex(min_shared_skills=min_shared_skills)
+    for resume in resumes if resumes is not None else await load_active_resumes(session):
+        index.upsert_resume(resume)
+    
+    pages = await session.execute(
+        select(TrackedPage.id, TrackedPage.user_id, TrackedPage.company_name)
+        .join(User, TrackedPage.user_id == User.id)
+        .where(User.is_active.is_(True))
+    )
+    for page_id, user_id, company_name in pages:
+        index.track_page(user_id, page_id, company_name)
+    
+    logger.info(f"Built interest index: {index.stats()}")
+    return index
+
+
+def job_documents_from_response(response: JobPostingsResponse, job_ids: Dict[str, uuid.UUID],
+                                extractor: Optional[SkillExtractor] = None) -> List[JobDocument]:
+    """
+    Convert crawler output into documents for matching.
+    
+    Args:
+        response: Result of a crawl.
+        job_ids: IDs of the persisted jobs by posting URL; postings without an ID are skipped.
+        extractor: Skill extractor, defaults to the built-in dictionary.
+        
+    Returns:
+        List[JobDocument]: Documents with extracted skill IDs.
+    """
+    extractor = extractor or get_skill_extractor()
+    documents = []
+    for posting in response.job_postings:
+        job_id = job_ids.get(posting.url)
+        if job_id is None:
+            continue
+        text = job_skill_text(posting.title, posting.description)
+        documents.append(JobDocument(job_id=job_id, text=text, skill_ids=extractor.extract_ids(text).tolist()))
+    return documents
+
+
+class JobFanout:
+    """
+    Routes new postings to the users who may want them: candidates come from the
+    interest index, and only those pairs are scored exactly by the matching engine.
+    """
+    
+    def __init__(self, index: InterestIndex, engine: MatchingEngine):
+        """
+        Initialize the fan-out.
+        
+        Args:
+            index: Interest index, kept in sync with the engine's resumes.
+            engine: Matching engine used for exact scoring.
+        """
+        self.index = index
+        self.engine = engine
+    
+    def upsert_resume(self, resume: ResumeDocument) -> None:
+        """
+        Add or update a resume in both the index and the engine.
+        """
+        self.index.upsert_resume(resume)
+        self.engine.upsert_resumes([resume])
+    
+    def remove_resume(self, resume_id: uuid.UUID) -> None:
+        """
+        Remove a resume from both the index and the engine.
+        """
+        self.index.remove_resume(resume_id)
+        self.engine.remove_resume(resume_id)
+    
+    def fan_out(self, jobs: Sequence[JobDocument], tracked_page_id: Optional[uuid.UUID] = None,
+                company_name: Optional[str] = None) -> Dict[uuid.UUID, List[JobMatch]]:
+        """
+        Find the users matching new postings of one tracked page.
+        
+        Args:
+            jobs: New postings, with extracted skill IDs.
+            tracked_page_id: Tracked page the postings were found on.
+            company_name: Company of the postings.
+            
+        Returns:
+            Dict[uuid.UUID, List[JobMatch]]: Matches per user, best first.
+        """
+        candidates = [self.index.candidates(job.skill_ids, tracked_page_id, company_name) for job in jobs]
+        if not any(candidates):
+            # 仍需更新 IDF 統計
+            self.engine.observe_jobs([job.text for job in jobs])
+            return {}
+        
+        logger.debug(
+            f"Fan-out of {len(jobs)} postings: {sum(map(len, candidates))} candidate pairs "
+            f"out of {len(jobs) * self.engine.n_resumes}"
+        )
+        return self.engine.match_jobs(jobs, candidates)
@@ -0,0 +1,393 @@
+"""
+Skill extraction with an Aho-Corasick automaton over a curated skill dictionary.
+"""
+import re
+from array import array
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.services.matching.tfidf import TOKEN_PATTERN
+
+# 技能字典：(技能 ID, 標準名稱, 同義詞)
+# ID 會儲存在資料庫中，只能新增，不可重複使用或變更既有 ID
+SKILL_DICTIONARY: Tuple[Tuple[int, str, Tuple[str, ...]], ...] = (
+    # 程式語言
+    (1, "Python", ("python3",)),
+    (2, "Java", ()),
+    (3, "JavaScript", ("js", "ecmascript", "es6")),
+    (4, "TypeScript", ()),
+    (5, "Go", ("golang",)),
+    (6, "Rust", ()),
+    (7, "C", ("ANSI C",)),
+    (8, "C++", ("cpp", "c plus plus")),
+    (9, "C#", ("csharp", "c sharp")),
+    (10, "Ruby", ()),
+    (11, "PHP", ()),
+    (12, "Kotlin", ()),
+    (13, "Swift", ()),
+    (14, "Scala", ()),
+    (15, "R", ("R language", "rstats")),
+    (16, "SQL", ("t-sql", "pl/sql", "plsql", "tsql")),
+    (17, "Bash", ("shell scripting", "shell script", "bash scripting")),
+    (18, "Objective-C", ("objective c", "objc")),
+    (19, "Dart", ()),
+    (20, "Elixir", ()),
+    (21, "Haskell", ()),
+    (22, "Perl", ()),
+    (23, "MATLAB", ()),
+    (24, "Lua", ()),
+    (25, "Clojure", ()),
+    # 前端
+    (40, "React", ("react.js", "reactjs")),
+    (41, "Vue.js", ("vue", "vuejs")),
+    (42, "Angular", ("angularjs", "angular.js")),
+    (43, "Svelte", ()),
+    (44, "Next.js", ("nextjs",)),
+    (45, "HTML", ("html5",)),
+    (46, "CSS", ("css3", "sass", "scss")),
+    (47, "Tailwind CSS", ("tailwind", "tailwindcss")),
+    (48, "Redux", ()),
+    (49, "Webpack", ()),
+    (50, "React Native", ()),
+    (51, "Flutter", ()),
+    # 後端框架
+    (70, "Node.js", ("nodejs",)),
+    (71, "Django", ()),
+    (72, "Flask", ()),
+    (73, "FastAPI", ("fast api",)),
+    (74, "Spring", ("Spring Boot", "springboot", "Spring Framework")),
+    (75, "Ruby on Rails", ("Rails", "ror")),
+    (76, "Express", ("express.js", "expressjs")),
+    (77, ".NET", ("dotnet", "asp.net", "net core", "dotnet core")),
+    (78, "Laravel", ()),
+    (79, "GraphQL", ()),
+    (80, "REST API", ("REST", "restful", "REST APIs", "restful apis")),
+    (81, "gRPC", ()),
+    (82, "Microservices", ("microservice", "micro services")),
+    # 資料庫與儲存
+    (100, "PostgreSQL", ("postgres", "psql")),
+    (101, "MySQL", ()),
+    (102, "MongoDB", ("mongo",)),
+    (103, "Redis", ()),
+    (104, "Elasticsearch", ("elastic search", "opensearch")),
+    (105, "Cassandra", ()),
+    (106, "DynamoDB", ()),
+    (107, "SQLite", ()),
+    (108, "Oracle Database", ("oracle db",)),
+    (109, "SQL Server", ("mssql", "microsoft sql server")),
+    (110, "Snowflake", ()),
+    (111, "BigQuery", ("big query",)),
+    (112, "Redshift", ()),
+    (113, "ClickHouse", ()),
+    (114, "Kafka", ("apache kafka",)),
+    (115, "RabbitMQ", ()),
+    # 雲端與維運
+    (130, "AWS", ("amazon web services",)),
+    (131, "Google Cloud", ("gcp", "google cloud platform")),
+    (132, "Azure", ("microsoft azure",)),
+    (133, "Docker", ()),
+    (134, "Kubernetes", ("k8s",)),
+    (135, "Terraform", ()),
+    (136, "Ansible", ()),
+    (137, "CI/CD", ("ci cd", "continuous integration", "continuous delivery", "continuous deployment")),
+    (138, "GitHub Actions", ()),
+    (139, "Jenkins", ()),
+    (140, "Linux", ("unix",)),
+    (141, "Git", ()),
+    (142, "Prometheus", ()),
+    (143, "Grafana", ()),
+    (144, "Helm", ()),
+    (145, "Serverless", ("aws lambda", "lambda functions")),
+    (146, "Nginx", ()),
+    (147, "Site Reliability Engineering", ("sre",)),
+    # 資料與機器學習
+    (160, "Machine Learning", ("ML",)),
+    (161, "Deep Learning", ()),
+    (162, "Natural Language Processing", ("nlp",)),
+    (163, "Computer Vision", ()),
+    (164, "PyTorch", ()),
+    (165, "TensorFlow", ("tensor flow",)),
+    (166, "scikit-learn", ("sklearn", "scikit learn")),
+    (167, "Pandas", ()),
+    (168, "NumPy", ()),
+    (169, "Spark", ("apache spark", "pyspark")),
+    (170, "Airflow", ("apache airflow",)),
+    (171, "dbt", ()),
+    (172, "Data Engineering", ("etl", "elt", "data pipelines")),
+    (173, "Statistics", ("statistical analysis",)),
+    (174, "Large Language Models", ("llm", "llms", "generative ai", "genai")),
+    (175, "Data Visualization", ("tableau", "power bi", "looker")),
+    (176, "Hadoop", ()),
+    # 軟體工程實務
+    (200, "Agile", ("scrum", "kanban")),
+    (201, "Test-Driven Development", ("tdd",)),
+    (202, "Unit Testing", ("unit tests", "pytest", "junit", "jest")),
+    (203, "System Design", ("distributed systems",)),
+    (204, "Security", ("cybersecurity", "application security", "appsec")),
+    (205, "Mobile Development", ("ios", "android")),
+    (206, "Embedded Systems", ("embedded software", "firmware")),
+    # 設計與產品
+    (230, "Figma", ()),
+    (231, "UX Design", ("UX", "user experience", "UX/UI", "UI/UX")),
+    (232, "UI Design", ("UI", "user interface design")),
+    (233, "User Research", ("usability testing",)),
+    (234, "Product Management", ("product manager", "product strategy")),
+    (235, "A/B Testing", ("ab testing", "a b testing", "experimentation")),
+    # 商業與其他
+    (260, "Project Management", ("pmp",)),
+    (261, "Salesforce", ()),
+    (262, "SEO", ("search engine optimization",)),
+    (263, "Excel", ("microsoft excel",)),
+    (264, "Communication", ("communication skills",)),
+    (265, "Leadership", ("team leadership", "people management")),
+)
+
+
+# 同時也是常見英文單字或縮寫的技能名稱只在大小寫完全相同時比對
+# (例如 "Go" 而非 "go to"、"REST API" 而非 "rest of the team")
+CASE_SENSITIVE_TOKENS = frozenset({
+    "Go", "R", "C", "REST", "UI", "UX", "ML", "Spring", "Express", "Rails", "Helm", "Swift", "Rust", "Dart", "Lua",
+})
+
+# 小寫寫法 (例如 "swift and rust") 只在與其他技能並列時才算技能
+LIST_CONTEXT_TOKENS = {
+    token.lower(): token for token in CASE_SENSITIVE_TOKENS if len(token) > 1 and token[1:].islower()
+}
+# 並列技能之間允許的連接詞 (標點不會成為 token)
+LIST_CONNECTORS = frozenset({"and", "or"})
+# 單一字母技能緊鄰這些字元時為縮寫的一部分 (例如 "R&D"、"C-level")
+_LETTER_JOINERS = frozenset({"&", "-"})
+
+WORD_PATTERN = re.compile(TOKEN_PATTERN.pattern, re.IGNORECASE | re.UNICODE)
+
+
+def skill_tokens(text: Optional[str]) -> List[str]:
+    """
+    Tokenize text the same way skill names are tokenized.
+    
+    Tokens are lowercased except those in ``CASE_SENSITIVE_TOKENS``, which keep their
+    case and therefore only match dictionary phrases written in the same case.
+    """
+    if not text:
+        return []
+    return [token if token in CASE_SENSITIVE_TOKENS else token.lower() for token in WORD_PATTERN.findall(text)]
+
+
+def _context_tokens(text: Optional[str]) -> Tuple[List[str], Dict[int, str]]:
+    """
+    Tokenize free text like ``skill_tokens``, applying the context rules.
+    
+    Single-letter skills joined to a neighbour by ``&`` or ``-`` are lowercased so
+    they no longer match, and lowercase forms of ``LIST_CONTEXT_TOKENS`` are
+    returned as candidates (token index to cased skill token).
+    """
+    tokens: List[str] = []
+    candidates: Dict[int, str] = {}
+    if not text:
+        return tokens, candidates
+    for match in WORD_PATTERN.finditer(text):
+        token = match.group()
+        if token in CASE_SENSITIVE_TOKENS:
+            if len(token) == 1 and (text[match.end():match.end() + 1] in _LETTER_JOINERS
+                                    or text[match.start() - 1:match.start()] in _LETTER_JOINERS):
+                token = token.lower()
+        else:
+            token = token.lower()
+            cased = LIST_CONTEXT_TOKENS.get(token)
+            if cased is not None:
+                candidates[len(tokens)] = cased
+        tokens.append(token)
+    return tokens, candidates
+
+
+class SkillExtractor:
+    """
+    Finds dictionary skills in text with an Aho-Corasick automaton over word tokens.
+    
+    Skill names and synonyms are compiled into one automaton whose alphabet is word
+    tokens rather than characters: the text is split into tokens by a single regex
+    pass, then the automaton walks the tokens once, so the cost is linear in the
+    text length regardless of the dictionary size, and matches always fall on word
+    boundaries ("Go" never matches inside "Google").
+    
+    Ambiguous names get context rules: "R" in "R&D" or "C" in "C-level" is not a
+    skill, and a lowercase "swift" or "rust" only counts when listed next to other
+    skills ("python, swift and rust").
+    """
+    
+    def __init__(self, dictionary: Iterable[Tuple[int, str, Sequence[str]]] = SKILL_DICTIONARY):
+        """
+        Compile the dictionary.
+        
+        Args:
+            dictionary: ``(skill_id, name, synonyms)`` entries.
+        """
+        self.names: Dict[int, str] = {}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+        # 各狀態輸出中最短片語的 token 數，用於還原比對位置
+        self._lengths: List[int] = [0]
+        
+        for skill_id, name, synonyms in dictionary:
+            if skill_id in self.names:
+                raise ValueError(f"Duplicate skill ID {skill_id}")
+            self.names[skill_id] = name
+            for phrase in (name, *synonyms):
+                self._add_phrase(skill_tokens(phrase), skill_id)
+        
+        self._build_failure_links()
+        self._ids_by_name = {name.lower(): skill_id for skill_id, name in self.names.items()}
+    
+    def _add_phrase(self, tokens: List[str], skill_id: int) -> None:
+        if not tokens:
+            return
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+                self._lengths.append(0)
+            state = next_state
+        if skill_id not in self._output[state]:
+            self._output[state] += (skill_id,)
+            self._lengths[state] = len(tokens)
+    
+    def _build_failure_links(self) -> None:
+        # 廣度優先建立失敗連結，並合併失敗狀態的輸出
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                merged = self._output[next_state] + tuple(
+                    skill_id for skill_id in self._output[self._fail[next_state]]
+                    if skill_id not in self._output[next_state]
+                )
+                self._output[next_state] = merged
+                fallback_length = self._lengths[self._fail[next_state]]
+                if fallback_length and (not self._lengths[next_state] or fallback_length < self._lengths[next_state]):
+                    self._lengths[next_state] = fallback_length
+    
+    def extract_ids(self, text: Optional[str]) -> array:
+        """
+        Find the skills mentioned in a text.
+        
+        Args:
+            text: Job description, resume or any free text.
+            
+        Returns:
+            array: Sorted, unique skill IDs (``array('H')``, two bytes per ID).
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        tokens, candidates = _context_tokens(text)
+        found = set()
+        # 已確定的技能所占的 token 位置，只在有候選詞時需要
+        covered: Set[int] = set()
+        state = 0
+        for index, token in enumerate(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if output[state]:
+                found.update(output[state])
+                if candidates:
+                    covered.update(range(index - self._lengths[state] + 1, index + 1))
+        
+        if candidates:
+            found.update(self._list_context_ids(tokens, candidates, covered))
+        return array("H", sorted(found))
+    
+    def _list_context_ids(self, tokens: List[str], candidates: Dict[int, str], covered: Set[int]) -> Set[int]:
+        # 候選詞的左右鄰居 (略過連接詞) 為技能或其他候選詞時才採用
+        found = set()
+        for index, cased in candidates.items():
+            neighbours = []
+            for step in (-1, 1):
+                position = index + step
+                while 0 <= position < len(tokens) and tokens[position] in LIST_CONNECTORS:
+                    position += step
+                neighbours.append(position)
+            if any(position in covered or position in candidates for position in neighbours):
+                state = self._goto[0].get(cased)
+                if state is not None:
+                    found.update(self._output[state])
+        return found
+    
+    def extract_many(self, texts: Iterable[Optional[str]]) -> List[array]:
+        """
+        Find the skills of several texts.
+        """
+        return [self.extract_ids(text) for text in texts]
+    
+    def skill_names(self, skill_ids: Optional[Iterable[int]]) -> List[str]:
+        """
+        Map skill IDs to their canonical names, ignoring unknown IDs.
+        """
+        return [self.names[skill_id] for skill_id in skill_ids or () if skill_id in self.names]
+    
+    def skill_id(self, name: str) -> Optional[int]:
+        """
+        Look up the ID of a canonical skill name (case-insensitive).
+        """
+        return self._ids_by_name.get(name.lower())
+
+
+@lru_cache(maxsize=1)
+def get_skill_extractor() -> SkillExtractor:
+    """
+    Get the process-wide skill extractor compiled from the built-in dictionary.
+    """
+    return SkillExtractor()
+
+
+def job_skill_text(job_title: Optional[str], job_description: Optional[str]) -> str:
+    """
+    Text scanned for the skills of a job posting.
+    """
+    return f"{job_title or ''}\n{job_description or ''}"
+
+
+def resume_skill_text(content: Optional[str], skills: Optional[Iterable[str]]) -> str:
+    """
+    Text scanned for the skills of a resume: its content followed by its listed skills.
+    """
+    return "\n".join([content or "", *(skills or [])])
+
+
+def tag_job_skills(jobs: Iterable, extractor: Optional[SkillExtractor] = None) -> None:
+    """
+    Set ``extracted_skills`` of job rows from their title and description.
+    
+    Args:
+        jobs: ``Job`` rows (or objects with the same attributes).
+        extractor: Skill extractor, defaults to the built-in dictionary.
+    """
+    extractor = extractor or get_skill_extractor()
+    for job in jobs:
+        job.extracted_skills = extractor.extract_ids(job_skill_text(job.job_title, job.job_description)).tolist()
+
+
+def tag_resume_skills(resumes: Iterable, extractor: Optional[SkillExtractor] = None) -> None:
+    """
+    Set ``skill_ids`` of resume rows from their content and listed skills.
+    
+    Args:
+        resumes: ``Resume`` rows.
+        extractor: Skill extractor, defaults to the built-in dictionary.
+    """
+    extractor = extractor or get_skill_extractor()
+    for resume in resumes:
+        resume.skill_ids = extractor.extract_ids(resume_skill_text(resume.content, resume.skills)).tolist()
@@ -0,0 +1,173 @@
+"""
+Incremental TF-IDF vectorizer producing sparse matrices.
+"""
+import re
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from scipy import sparse
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]|[^\W\d_]+", re.UNICODE)
+
+# 常見英文停用詞；履歷與職缺描述中出現頻率極高但不具鑑別度
+STOP_WORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or our that the their this to was we
+were will with you your they them he she his her i me my us not but if so than then there these
+those which who whom what when where why how all any both each few more most other some such no nor
+only own same too very can just should now also into about over under again further once
+""".split())
+
+
+def tokenize(text: Optional[str], ngram_range: tuple = (1, 2)) -> List[str]:
+    """
+    Split text into lowercase terms and word n-grams, dropping stop words.
+    
+    Tokens keep characters like ``+``, ``#`` and inner dots so ``c++``, ``c#`` and
+    ``node.js`` stay intact.
+    
+    Args:
+        text: Text to tokenize.
+        ngram_range: Minimum and maximum n-gram length.
+        
+    Returns:
+        List[str]: Terms.
+    """
+    if not text:
+        return []
+    
+    words = [word for word in TOKEN_PATTERN.findall(text.lower()) if word not in STOP_WORDS]
+    low, high = ngram_range
+    terms = []
+    for n in range(low, high + 1):
+        terms.extend(" ".join(words[i:i + n]) for i in range(len(words) - n + 1))
+    return terms
+
+
+class IncrementalTfidfVectorizer:
+    """
+    TF-IDF vectorizer whose vocabulary and document frequencies grow with each batch.
+    
+    Documents are first turned into sublinear term-frequency matrices (``1 + log(tf)``)
+    that do not depend on the corpus; IDF weights are applied separately so matrices
+    built earlier stay valid when later batches change the statistics.
+    """
+    
+    def __init__(self, ngram_range: tuple = (1, 2), min_df: int = 1):
+        """
+        Initialize the vectorizer.
+        
+        Args:
+            ngram_range: Minimum and maximum n-gram length.
+            min_df: Terms seen in fewer documents get zero weight.
+        """
+        self.ngram_range = ngram_range
+        self.min_df = min_df
+        self.vocabulary: Dict[str, int] = {}
+        self._document_frequency = np.zeros(0, dtype=np.int64)
+        self.n_documents = 0
+    
+    @property
+    def n_features(self) -> int:
+        return len(self.vocabulary)
+    
+    def partial_fit(self, texts: Iterable[str]) -> sparse.csr_matrix:
+        """
+        Add documents to the vocabulary and document frequency statistics.
+        
+        Args:
+            texts: Documents to add.
+            
+        Returns:
+            sparse.csr_matrix: Sublinear term-frequency matrix of the added documents.
+        """
+        tf = self._term_frequencies(texts, grow=True)
+        # 每個詞在多少份文件中出現
+        df = np.bincount(tf.indices, minlength=self.n_features)
+        if len(self._document_frequency) < self.n_features:
+            self._document_frequency = np.pad(
+                self._document_frequency, (0, self.n_features - len(self._document_frequency))
+            )
+        self._document_frequency += df
+        self.n_documents += tf.shape[0]
+        return tf
+    
+    def term_frequencies(self, texts: Iterable[str], grow_vocabulary: bool = False) -> sparse.csr_matrix:
+        """
+        Build the sublinear term-frequency matrix without updating document frequencies.
+        
+        Args:
+            texts: Documents to vectorize.
+            grow_vocabulary: If True, unseen terms are added to the vocabulary (with zero
+                document frequency, hence zero weight until fitted documents use them)
+                instead of being ignored.
+                
+        Returns:
+            sparse.csr_matrix: Sublinear term-frequency matrix.
+        """
+        return self._term_frequencies(texts, grow=grow_vocabulary)
+    
+    def idf(self) -> np.ndarray:
+        """
+        Smoothed inverse document frequencies, ``log((1 + n) / (1 + df)) + 1``.
+        
+        Terms never seen in a fitted document (added by ``term_frequencies`` with
+        ``grow_vocabulary``) get zero weight until a fitted document contains them;
+        otherwise they would get the maximum IDF and inflate the norm of the
+        documents using them.
+        
+        Returns:
+            np.ndarray: IDF weight per vocabulary column.
+        """
+        df = self._document_frequency
+        if len(df) < self.n_features:
+            df = self._document_frequency = np.pad(df, (0, self.n_features - len(df)))
+        idf = np.log((1 + self.n_documents) / (1 + df)) + 1.0
+        idf[df < max(self.min_df, 1)] = 0.0
+        return idf
+    
+    def weight(self, tf: sparse.csr_matrix) -> sparse.csr_matrix:
+        """
+        Apply the current IDF weights to a term-frequency matrix and L2-normalize rows.
+        
+        Matrices built before the vocabulary grew are padded to the current width.
+        
+        Args:
+            tf: Term-frequency matrix from ``partial_fit`` or ``term_frequencies``.
+            
+        Returns:
+            sparse.csr_matrix: Row-normalized TF-IDF matrix.
+        """
+        if tf.shape[1] < self.n_features:
+            tf = sparse.csr_matrix((tf.data, tf.indices, tf.indptr), shape=(tf.shape[0], self.n_features))
+        
+        weighted = tf.multiply(self.idf()).tocsr()
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.diags(1.0 / norms) @ weighted
+    
+    def _term_frequencies(self, texts: Iterable[str], grow: bool) -> sparse.csr_matrix:
+        indices: List[int] = []
+        data: List[float] = []
+        indptr = [0]
+        
+        for text in texts:
+            counts: Dict[int, int] = {}
+            for term in tokenize(text, self.ngram_range):
+                column = self.vocabulary.get(term)
+                if column is None:
+                    if not grow:
+                        continue
+                    column = self.vocabulary[term] = len(self.vocabulary)
+                counts[column] = counts.get(column, 0) + 1
+            indices.extend(counts)
+            data.extend(counts.values())
+            indptr.append(len(indices))
+        
+        tf = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int64), np.asarray(indptr)),
+            shape=(len(indptr) - 1, self.n_features),
+        )
+        np.log(tf.data, out=tf.data)
+        tf.data += 1.0
+        tf.sort_indices()
+        return tf
@@ -0,0 +1,87 @@
+"""
+Rendering of job match digest emails.
+"""
+import html
+from email.message import EmailMessage
+from email.utils import formataddr, make_msgid
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class DigestItem(BaseModel):
+    """
+    One job match listed in a digest.
+    """
+    job_title: str
+    job_url: str
+    company_name: Optional[str] = None
+    location: Optional[str] = None
+    match_score: float
+
+
+class Digest(BaseModel):
+    """
+    All pending job matches of one user.
+    """
+    email: str
+    full_name: Optional[str] = None
+    items: List[DigestItem]
+
+
+def digest_subject(digest: Digest) -> str:
+    """
+    Subject line of a digest.
+    """
+    if len(digest.items) == 1:
+        item = digest.items[0]
+        at_company = f" at {item.company_name}" if item.company_name else ""
+        return f"New job match: {item.job_title}{at_company}"
+    return f"{len(digest.items)} new job matches"
+
+
+def render_digest(digest: Digest, from_name: str, from_address: str) -> EmailMessage:
+    """
+    Render a digest as a plain-text email with an HTML alternative.
+    
+    Args:
+        digest: Digest to render.
+        from_name: Sender display name.
+        from_address: Sender address.
+        
+    Returns:
+        EmailMessage: Message ready to send.
+    """
+    items = sorted(digest.items, key=lambda item: item.match_score, reverse=True)
+    greeting = f"Hi {digest.full_name}," if digest.full_name else "Hi,"
+    
+    lines = [greeting, "", "We found new jobs matching your resume:", ""]
+    for item in items:
+        details = " · ".join(part for part in (item.company_name, item.location) if part)
+        lines.append(f"- {item.job_title}" + (f" ({details})" if details else "") + f" — match {item.match_score:.0f}%")
+        lines.append(f"  {item.job_url}")
+    lines += ["", "— Job Alert AI"]
+    
+    rows = "".join(
+        "<li>"
+        f'<a href="{html.escape(item.job_url, quote=True)}">{html.escape(item.job_title)}</a>'
+        + "".join(f" · {html.escape(part)}" for part in (item.company_name, item.location) if part)
+        + f" <small>(match {item.match_score:.0f}%)</small>"
+        "</li>"
+        for item in items
+    )
+    body_html = (
+        f"<p>{html.escape(greeting)}</p>"
+        "<p>We found new jobs matching your resume:</p>"
+        f"<ul>{rows}</ul>"
+        "<p>— Job Alert AI</p>"
+    )
+    
+    message = EmailMessage()
+    message["From"] = formataddr((from_name, from_address))
+    message["To"] = formataddr((digest.full_name or "", digest.email))
+    message["Subject"] = digest_subject(digest)
+    message["Message-ID"] = make_msgid(domain=from_address.rsplit("@", 1)[-1])
+    message.set_content("\n".join(lines))
+    message.add_alternative(body_html, subtype="html")
+    return message
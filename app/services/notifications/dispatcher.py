@@ -0,0 +1,238 @@
+"""
+Notification dispatcher: records job matches and emails them as per-user digests.
+"""
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.models.job import Job
+from app.models.notification import Notification
+from app.models.tracked_page import TrackedPage
+from app.models.user import User
+from app.services.matching.engine import JobMatch
+from app.services.notifications.digest import Digest, DigestItem, render_digest
+from app.services.notifications.smtp_pool import SMTPConnectionPool
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+
+def _insert(session: AsyncSession):
+    # 依資料庫方言選擇支援 ON CONFLICT 的 insert
+    if session.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+async def record_matches(session: AsyncSession, matches: Dict[uuid.UUID, List[JobMatch]]) -> int:
+    """
+    Store job matches as pending notifications in one statement.
+    
+    A user is notified about a job only once; matches already recorded are skipped.
+    The caller commits.
+    
+    Args:
+        session: Database session.
+        matches: Matches per user, e.g. from ``JobFanout.fan_out``.
+        
+    Returns:
+        int: Number of matches passed in.
+    """
+    rows = [
+        {"id": uuid.uuid4(), "user_id": match.user_id, "job_id": match.job_id, "match_score": match.score}
+        for user_matches in matches.values()
+        for match in user_matches
+    ]
+    if rows:
+        insert = _insert(session)
+        await session.execute(
+            insert(Notification).values(rows).on_conflict_do_nothing(index_elements=["user_id", "job_id"])
+        )
+    return len(rows)
+
+
+class NotificationDispatcher:
+    """
+    Sends pending notifications as one digest email per user.
+    
+    A user's notifications are held until the oldest has waited ``digest_window``
+    seconds (or ``max_items`` have piled up), so all matches found in that window go
+    out in a single email. Pending rows are claimed (``claimed_at``) in a short
+    transaction using ``FOR UPDATE SKIP LOCKED``, so several dispatchers never email
+    the same match twice; the emails are sent outside any transaction, then
+    ``email_sent``/``sent_at`` are updated for the whole batch in one statement.
+    Claims not completed within ``claim_timeout`` seconds (e.g. after a crash) are
+    picked up again.
+    """
+    
+    def __init__(self, session_factory: async_sessionmaker, smtp_pool: SMTPConnectionPool,
+                 digest_window: float = 300.0, max_items: int = 25, batch_users: int = 200,
+                 claim_timeout: float = 600.0, from_name: Optional[str] = None, from_address: Optional[str] = None):
+        """
+        Initialize the dispatcher.
+        
+        Args:
+            session_factory: Async session factory.
+            smtp_pool: Pool used to send the emails.
+            digest_window: Seconds a user's oldest pending notification waits before sending.
+            max_items: Pending notifications that trigger an immediate digest; also the
+                most items listed per digest.
+            batch_users: Users handled per dispatch round.
+            claim_timeout: Seconds after which an unfinished claim may be taken over.
+            from_name: Sender display name, defaults to EMAIL_FROM_NAME.
+            from_address: Sender address, defaults to EMAIL_FROM_ADDRESS.
+        """
+        self._session_factory = session_factory
+        self.smtp_pool = smtp_pool
+        self.digest_window = digest_window
+        self.max_items = max_items
+        self.batch_users = batch_users
+        self.claim_timeout = claim_timeout
+        self.from_name = from_name or settings.EMAIL_FROM_NAME
+        self.from_address = from_address or settings.EMAIL_FROM_ADDRESS
+    
+    async def dispatch_due(self, now: Optional[datetime] = None) -> int:
+        """
+        Send digests to users whose pending notifications are due.
+        
+        Args:
+            now: Reference time, defaults to the current time.
+            
+        Returns:
+            int: Number of notifications marked as sent.
+        """
+        now = now or datetime.now(timezone.utc)
+        cutoff = now - timedelta(seconds=self.digest_window)
+        pending = and_(
+            Notification.email_sent.is_(False),
+            or_(Notification.claimed_at.is_(None),
+                Notification.claimed_at < now - timedelta(seconds=self.claim_timeout)),
+        )
+        
+        # 短交易內認領通知，寄信期間不持有資料列鎖與資料庫連線
+        async with self._session_factory() as session, session.begin():
+            due_users = (await session.scalars(
+                select(Notification.user_id)
+                .where(pending)
+                .group_by(Notification.user_id)
+                .having(or_(func.min(Notification.created_at) <= cutoff, func.count() >= self.max_items))
+                .limit(self.batch_users)
+            )).all()
+            if not due_users:
+                return 0
+            
+            rows = (await session.execute(
+                select(
+                    Notification.id,
+                    Notification.user_id,
+                    Notification.match_score,
+                    User.email,
+                    User.full_name,
+                    Job.job_title,
+                    Job.job_url,
+                    Job.location,
+                    TrackedPage.company_name,
+                )
+                .join(User, Notification.user_id == User.id)
+                .join(Job, Notification.job_id == Job.id)
+                .join(TrackedPage, Job.tracked_page_id == TrackedPage.id)
+                .where(pending, Notification.user_id.in_(due_users))
+                .order_by(Notification.user_id, Notification.match_score.desc())
+                .with_for_update(skip_locked=True, of=Notification)
+            )).all()
+            
+            digests: Dict[uuid.UUID, Digest] = {}
+            notification_ids: Dict[uuid.UUID, List[uuid.UUID]] = defaultdict(list)
+            for row in rows:
+                if len(notification_ids[row.user_id]) >= self.max_items:
+                    # 超過上限的通知留待下一封摘要
+                    continue
+                digest = digests.get(row.user_id)
+                if digest is None:
+                    digest = digests[row.user_id] = Digest(email=row.email, full_name=row.full_name, items=[])
+                digest.items.append(DigestItem(
+                    job_title=row.job_title,
+                    job_url=row.job_url,
+                    company_name=row.company_name,
+                    location=row.location,
+                    match_score=row.match_score,
+                ))
+                notification_ids[row.user_id].append(row.id)
+            
+            claimed_ids = [notification_id for ids in notification_ids.values() for notification_id in ids]
+            if not claimed_ids:
+                return 0
+            await session.execute(
+                update(Notification)
+                .where(Notification.id.in_(claimed_ids))
+                .values(claimed_at=now)
+                .execution_options(synchronize_session=False)
+            )
+        
+        user_ids = list(digests)
+        results = await asyncio.gather(
+            *(self._send(digests[user_id]) for user_id in user_ids), return_exceptions=True
+        )
+        
+        sent_ids = []
+        failed_ids = []
+        for user_id, result in zip(user_ids, results):
+            if isinstance(result, BaseException):
+                # 寄送失敗的通知釋放認領，下一輪重試
+                logger.error(f"Failed to send digest to user {user_id}: {str(result)}")
+                failed_ids.extend(notification_ids[user_id])
+                continue
+            sent_ids.extend(notification_ids[user_id])
+        
+        async with self._session_factory() as session, session.begin():
+            if sent_ids:
+                await session.execute(
+                    update(Notification)
+                    .where(Notification.id.in_(sent_ids))
+                    .values(email_sent=True, sent_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+            if failed_ids:
+                await session.execute(
+                    update(Notification)
+                    .where(Notification.id.in_(failed_ids))
+                    .values(claimed_at=None)
+                    .execution_options(synchronize_session=False)
+                )
+        
+        sent_digests = sum(1 for result in results if not isinstance(result, BaseException))
+        logger.info(f"Sent {len(sent_ids)} notifications in {sent_digests} digests")
+        return len(sent_ids)
+    
+    async def _send(self, digest: Digest) -> None:
+        await self.smtp_pool.send(render_digest(digest, self.from_name, self.from_address))
+    
+    async def run(self, stop_event: asyncio.Event, interval: float = 30.0) -> None:
+        """
+        Dispatch due digests periodically until the stop event is set.
+        
+        Args:
+            stop_event: Event signalling shutdown.
+            interval: Seconds between dispatch rounds.
+        """
+        while not stop_event.is_set():
+            try:
+                # 一輪處理不完時立即再跑下一輪
+                while await self.dispatch_due():
+                    if stop_event.is_set():
+                        break
+            except Exception as e:
+                logger.error(f"Notification dispatch failed: {str(e)}")
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,167 @@
+"""
+Pool of persistent, authenticated SMTP connections.
+"""
+import asyncio
+import logging
+from email.message import EmailMessage
+from typing import List, Optional
+
+import aiosmtplib
+
+from app.core.config import settings
+
+# 設置日誌記錄器
+logger = logging.getLogger(__name__)
+
+
+class _PooledConnection:
+    """
+    SMTP client plus the number of messages sent over it.
+    """
+    
+    def __init__(self, client: aiosmtplib.SMTP):
+        self.client = client
+        self.sent = 0
+
+
+class SMTPConnectionPool:
+    """
+    Keeps a small number of logged-in SMTP connections open and reuses them.
+    
+    Opening a connection costs a TCP/TLS handshake, EHLO and AUTH; reusing it reduces
+    each message to MAIL/RCPT/DATA. Up to ``size`` messages are in flight at once, one
+    per connection. Connections are recycled after ``max_messages_per_connection``
+    messages (many providers cap messages per session) and re-opened transparently
+    when the server drops an idle connection.
+    """
+    
+    def __init__(self, hostname: str, port: int, username: Optional[str] = None, password: Optional[str] = None,
+                 use_tls: Optional[bool] = None, timeout: float = 30.0, size: int = 3,
+                 max_messages_per_connection: int = 100):
+        """
+        Initialize the pool. Connections are opened lazily.
+        
+        Args:
+            hostname: SMTP server host.
+            port: SMTP server port.
+            username: Login user; no AUTH if empty.
+            password: Login password.
+            use_tls: Implicit TLS; defaults to True on port 465. Otherwise STARTTLS is
+                used when the server offers it.
+            timeout: Timeout of SMTP operations in seconds.
+            size: Maximum number of open connections.
+            max_messages_per_connection: Messages sent before a connection is recycled.
+        """
+        self.hostname = hostname
+        self.port = port
+        self.username = username or None
+        self.password = password or None
+        self.use_tls = port == 465 if use_tls is None else use_tls
+        self.timeout = timeout
+        self.size = size
+        self.max_messages_per_connection = max_messages_per_connection
+        
+        self._idle: asyncio.LifoQueue = asyncio.LifoQueue()
+        self._slots = asyncio.Semaphore(size)
+        self._open: List[_PooledConnection] = []
+        self.messages_sent = 0
+        self.connections_opened = 0
+    
+    async def _connect(self) -> _PooledConnection:
+        client = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            use_tls=self.use_tls,
+            # None: 伺服器支援時自動升級 STARTTLS
+            start_tls=False if self.use_tls else None,
+            timeout=self.timeout,
+        )
+        await client.connect()
+        if self.username:
+            await client.login(self.username, self.password or "")
+        connection = _PooledConnection(client)
+        self._open.append(connection)
+        self.connections_opened += 1
+        logger.debug(f"Opened SMTP connection to {self.hostname}:{self.port}")
+        return connection
+    
+    async def _discard(self, connection: _PooledConnection) -> None:
+        if connection in self._open:
+            self._open.remove(connection)
+        try:
+            if connection.client.is_connected:
+                await connection.client.quit()
+        except aiosmtplib.SMTPException:
+            connection.client.close()
+    
+    async def send(self, message: EmailMessage) -> None:
+        """
+        Send a message over a pooled connection.
+        
+        Args:
+            message: Message with From/To headers set.
+            
+        Raises:
+            aiosmtplib.SMTPException: If the message was rejected or could not be delivered.
+        """
+        async with self._slots:
+            connection = self._idle.get_nowait() if not self._idle.empty() else None
+            try:
+                if connection is None or not connection.client.is_connected:
+                    if connection is not None:
+                        await self._discard(connection)
+                    connection = await self._connect()
+                try:
+                    await connection.client.send_message(message)
+                except (aiosmtplib.SMTPServerDisconnected, ConnectionError):
+                    # 伺服器關閉了閒置連線，重新連線後重試一次
+                    await self._discard(connection)
+                    connection = await self._connect()
+                    await connection.client.send_message(message)
+            except BaseException:
+                if connection is not None:
+                    await self._discard(connection)
+                raise
+            
+            connection.sent += 1
+            self.messages_sent += 1
+            if connection.sent >= self.max_messages_per_connection:
+                await self._discard(connection)
+            else:
+                self._idle.put_nowait(connection)
+    
+    async def aclose(self) -> None:
+        """
+        Close all connections.
+        """
+        for connection in list(self._open):
+            await self._discard(connection)
+        while not self._idle.empty():
+            self._idle.get_nowait()
+    
+    def stats(self) -> dict:
+        """
+        Get pool metrics.
+        """
+        return {
+            "open_connections": len(self._open),
+            "idle_connections": self._idle.qsize(),
+            "connections_opened": self.connections_opened,
+            "messages_sent": self.messages_sent,
+        }
+
+
+def create_smtp_pool() -> SMTPConnectionPool:
+    """
+    Create an SMTP pool from the application settings.
+    """
+    return SMTPConnectionPool(
+        hostname=settings.SMTP_HOST,
+        port=settings.SMTP_PORT,
+        username=settings.SMTP_USER,
+        password=settings.SMTP_PASSWORD,
+        use_tls=settings.SMTP_USE_TLS,
+        timeout=settings.SMTP_TIMEOUT,
+        size=settings.SMTP_POOL_SIZE,
+        max_messages_per_connection=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+    )
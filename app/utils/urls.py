@@ -0,0 +1,211 @@
+"""
+URL normalization helpers.
+"""
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+# 預設埠號，正規化時移除
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+@lru_cache(maxsize=4096)
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL so equivalent spellings map to the same string.
+    
+    Lowercases the scheme and host, drops default ports, the fragment and a trailing
+    slash, and sorts the query parameters.
+    
+    Args:
+        url: URL to normalize.
+        
+    Returns:
+        str: Normalized URL.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or "https"
+    host = (parts.hostname or "").lower()
+    
+    port = parts.port
+    netloc = host if port is None or DEFAULT_PORTS.get(scheme) == port else f"{host}:{port}"
+    
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+# 追蹤用查詢參數，正規化時移除
+TRACKING_PARAMS = frozenset({
+    "gclid", "dclid", "fbclid", "msclkid", "yclid", "mc_cid", "mc_eid", "_ga", "_gl", "igshid",
+    "ref", "referrer", "ref_src", "lever-source", "lever-origin", "gh_src", "trk", "trkinfo", "trackingid",
+})
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_", "lever-source[", "lever-via")
+
+# 內嵌 ATS 職缺時帶有職缺 ID 的查詢參數，只保留這些參數
+ATS_ID_PARAMS = ("gh_jid", "ashby_jid")
+
+# 網址中不可能是職缺連結的協定
+_HTTP_SCHEMES = ("http", "https")
+
+_GREENHOUSE_JOB_RE = re.compile(r"^/(?P<board>[^/]+)/jobs/(?P<id>\d+)")
+_LEVER_JOB_RE = re.compile(r"^/(?P<board>[^/]+)/(?P<id>[0-9a-f-]{36})", re.IGNORECASE)
+_ASHBY_JOB_RE = re.compile(r"^/(?P<board>[^/]+)/(?P<id>[0-9a-f-]{36})", re.IGNORECASE)
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def _greenhouse_url(host: str, path: str, params: Dict[str, str]) -> Optional[str]:
+    # EU 區域的職缺只存在於 EU 網域
+    base = "https://job-boards.eu.greenhouse.io" if host.endswith(".eu.greenhouse.io") else "https://boards.greenhouse.io"
+    # 內嵌申請頁: /embed/job_app?for=<board>&token=<id>
+    if path.startswith("/embed/job_app") and params.get("for") and params.get("token", "").isdigit():
+        return f"{base}/{params['for'].lower()}/jobs/{params['token']}"
+    match = _GREENHOUSE_JOB_RE.match(path)
+    if match:
+        return f"{base}/{match['board'].lower()}/jobs/{match['id']}"
+    return None
+
+
+def _lever_url(host: str, path: str, params: Dict[str, str]) -> Optional[str]:
+    # 申請頁 /<board>/<id>/apply 與職缺頁視為同一職缺；EU 區域保留 EU 網域
+    match = _LEVER_JOB_RE.match(path)
+    if match:
+        return f"https://{host}/{match['board'].lower()}/{match['id'].lower()}"
+    return None
+
+
+def _ashby_url(host: str, path: str, params: Dict[str, str]) -> Optional[str]:
+    # 申請頁 /<board>/<id>/application 與職缺頁視為同一職缺
+    match = _ASHBY_JOB_RE.match(path)
+    if match:
+        return f"https://jobs.ashbyhq.com/{match['board'].lower()}/{match['id'].lower()}"
+    return None
+
+
+# 各 ATS 網域的職缺網址正規化規則
+_ATS_RULES: Dict[str, Callable[[str, str, Dict[str, str]], Optional[str]]] = {
+    "boards.greenhouse.io": _greenhouse_url,
+    "job-boards.greenhouse.io": _greenhouse_url,
+    "job-boards.eu.greenhouse.io": _greenhouse_url,
+    "jobs.lever.co": _lever_url,
+    "jobs.eu.lever.co": _lever_url,
+    "jobs.ashbyhq.com": _ashby_url,
+}
+
+
+@lru_cache(maxsize=16384)
+def _canonicalize(url: str, job: bool, strip_www: bool) -> Optional[str]:
+    # 同一網站的連結在每次爬取都會重複出現，以快取略過重複的解析
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in _HTTP_SCHEMES or not parts.hostname:
+        return None
+    
+    host = parts.hostname.lower()
+    # 沒有 apex 轉址的網站拿掉 www. 後無法開啟，只有比對用的鍵才移除
+    bare_host = host[4:] if host.startswith("www.") else host
+    if strip_www:
+        host = bare_host
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    
+    if job:
+        rule = _ATS_RULES.get(bare_host)
+        if rule is not None:
+            canonical = rule(bare_host, parts.path, {name.lower(): value for name, value in params})
+            if canonical is not None:
+                return canonical
+        # 自有網域內嵌 ATS 的職缺頁，以職缺 ID 參數識別職缺
+        ats_params = [(name, value) for name, value in params if name.lower() in ATS_ID_PARAMS]
+        if ats_params:
+            params = ats_params
+    
+    params = [(name, value) for name, value in params if not _is_tracking_param(name)]
+    try:
+        port = parts.port
+    except ValueError:
+        return None
+    netloc = host if port is None or DEFAULT_PORTS.get(scheme) == port else f"{host}:{port}"
+    
+    path = re.sub(r"/{2,}", "/", parts.path) or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    
+    return urlunsplit((scheme, netloc, path, urlencode(sorted(params)), ""))
+
+
+def canonicalize_url(url: Optional[str], base_url: Optional[str] = None) -> Optional[str]:
+    """
+    Canonicalize a URL for caching and comparison.
+    
+    Resolves relative URLs against ``base_url`` and applies :func:`normalize_url`, and
+    also drops a leading ``www.``, tracking query parameters (``utm_*``, ``gclid``,
+    ``ref`` ...) and duplicate slashes. The result is a key, not a URL to link to.
+    
+    Args:
+        url: URL to canonicalize, possibly relative.
+        base_url: URL of the page the link was found on.
+        
+    Returns:
+        Optional[str]: Canonical URL, or None if the URL is empty or not an http(s) URL.
+    """
+    if not url or not url.strip():
+        return None
+    url = url.strip()
+    if base_url:
+        url = urljoin(base_url.strip(), url)
+    return _canonicalize(url, False, True)
+
+
+def canonicalize_job_url(url: Optional[str], base_url: Optional[str] = None) -> Optional[str]:
+    """
+    Canonicalize the URL of a job posting so every spelling of the same posting matches.
+    
+    Applies the same rules as :func:`canonicalize_url` except that a leading ``www.``
+    is kept, so the result can be stored and linked to. Greenhouse, Lever and Ashby
+    links (including embed and apply pages) are rewritten to the hosted job page of
+    the same region, and career pages embedding an ATS keep only the job ID parameter
+    (``gh_jid``, ``ashby_jid``).
+    
+    Args:
+        url: URL of the posting, possibly relative.
+        base_url: URL of the career page the posting was found on.
+        
+    Returns:
+        Optional[str]: Canonical URL, or None if the URL is empty or not an http(s) URL.
+    """
+    if not url or not url.strip() or url.strip() == "#":
+        return None
+    url = url.strip()
+    if base_url:
+        url = urljoin(base_url.strip(), url)
+    return _canonicalize(url, True, False)
+
+
+def job_url_key(url: Optional[str], base_url: Optional[str] = None) -> Optional[str]:
+    """
+    Comparison key of a job posting URL.
+    
+    Like :func:`canonicalize_job_url`, but also drops a leading ``www.`` so links with
+    and without it match. Use it to compare postings, never as the stored URL.
+    
+    Args:
+        url: URL of the posting, possibly relative.
+        base_url: URL of the career page the posting was found on.
+        
+    Returns:
+        Optional[str]: Comparison key, or None if the URL is empty or not an http(s) URL.
+    """
+    if not url or not url.strip() or url.strip() == "#":
+        return None
+    url = url.strip()
+    if base_url:
+        url = urljoin(base_url.strip(), url)
+    return _canonicalize(url, True, True)
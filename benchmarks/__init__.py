@@ -0,0 +1,3 @@
+"""
+Benchmark suite for the crawler service and API.
+"""
@@ -0,0 +1,233 @@
+"""
+Local stand-in for the FireCrawl and Jina Reader APIs, plus synthetic career pages.
+
+Every response is generated from the requested URL, so the same page always lists
+the same jobs across runs. Latency, error rate, throttling and payload size follow
+the configured distributions.
+
+Usage:
+    python -m benchmarks.mock_server --port 8900 --latency-ms 800 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Dict, List
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse
+
+TITLES = (
+    "Senior Python Engineer", "Backend Developer", "Frontend Engineer (React)", "Data Scientist",
+    "Machine Learning Engineer", "DevOps Engineer", "Site Reliability Engineer", "Product Manager",
+    "Product Designer", "QA Automation Engineer", "Mobile Engineer (iOS)", "Android Developer",
+    "Engineering Manager", "Security Engineer", "Data Engineer", "Technical Writer",
+)
+LOCATIONS = ("Taipei, TW", "Berlin, DE", "London, GB", "New York, US", "Remote")
+DEPARTMENTS = ("Engineering", "Data", "Product", "Design", "Operations")
+SKILL_WORDS = (
+    "Python", "FastAPI", "PostgreSQL", "Kubernetes", "Docker", "AWS", "React", "TypeScript",
+    "Go", "Kafka", "Redis", "Terraform", "machine learning", "SQL", "GraphQL", "CI/CD",
+)
+
+
+@dataclass
+class MockConfig:
+    """
+    Behaviour of the mock server.
+    """
+    # 提取 API 延遲的中位數與對數常態分布的 sigma
+    latency_ms: float = 800.0
+    latency_sigma: float = 0.5
+    # 職缺頁面與詳細頁面的延遲中位數
+    page_latency_ms: float = 50.0
+    # 回傳 HTTP 500 與 429 的機率
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: float = 1.0
+    # 每個職缺頁面的職缺數範圍
+    min_jobs: int = 5
+    max_jobs: int = 40
+    # 詳細頁面描述的位元組數
+    description_bytes: int = 4000
+    seed: int = 42
+
+
+def _page_rng(config: MockConfig, key: str) -> random.Random:
+    # 以網址決定亂數，同一頁面每次產生相同內容
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return random.Random(config.seed ^ int.from_bytes(digest, "big"))
+
+
+def page_jobs(config: MockConfig, page_url: str) -> List[Dict[str, str]]:
+    """
+    Jobs listed on a synthetic career page.
+    
+    Args:
+        config: Mock server configuration.
+        page_url: URL of the career page.
+    
+    Returns:
+        List[Dict[str, str]]: ``job_title`` / ``job_url`` entries.
+    """
+    page_url = page_url.split("#")[0].rstrip("/")
+    rng = _page_rng(config, page_url)
+    count = rng.randint(config.min_jobs, config.max_jobs)
+    return [
+        {"job_title": f"{rng.choice(TITLES)} #{n}", "job_url": f"{page_url}/jobs/{n}"}
+        for n in range(1, count + 1)
+    ]
+
+
+def job_description(config: MockConfig, job_url: str) -> str:
+    """
+    Description text of a synthetic job posting, about ``description_bytes`` long.
+    """
+    rng = _page_rng(config, job_url)
+    sentences = []
+    size = 0
+    while size < config.description_bytes:
+        skills = ", ".join(rng.sample(SKILL_WORDS, 3))
+        sentence = f"You will build and operate services using {skills} with a small, friendly team."
+        sentences.append(sentence)
+        size += len(sentence) + 1
+    return " ".join(sentences)
+
+
+def create_mock_app(config: MockConfig) -> FastAPI:
+    """
+    Create the mock provider application.
+    
+    Args:
+        config: Mock server configuration.
+    
+    Returns:
+        FastAPI: Application serving ``/v1/extract`` (FireCrawl), ``/reader/{url}``
+                 (Jina Reader) and ``/careers/...`` (career and detail pages).
+    """
+    app = FastAPI(title="Mock crawler providers")
+    rng = random.Random(config.seed)
+    extract_jobs: Dict[str, dict] = {}
+    stats = {"extract": 0, "reader": 0, "pages": 0, "errors": 0, "throttled": 0}
+    
+    async def delay(median_ms: float) -> None:
+        if median_ms > 0:
+            await asyncio.sleep(median_ms / 1000 * math.exp(rng.gauss(0, config.latency_sigma)))
+    
+    def failure():
+        roll = rng.random()
+        if roll < config.throttle_rate:
+            stats["throttled"] += 1
+            return JSONResponse(
+                {"success": False, "error": "Rate limit exceeded"},
+                status_code=429,
+                headers={"Retry-After": str(config.retry_after)},
+            )
+        if roll < config.throttle_rate + config.error_rate:
+            stats["errors"] += 1
+            return JSONResponse({"success": False, "error": "Internal error"}, status_code=500)
+        return None
+    
+    @app.post("/v1/extract")
+    async def extract(request: Request):
+        stats["extract"] += 1
+        payload = await request.json()
+        await delay(config.latency_ms)
+        error = failure()
+        if error is not None:
+            return error
+        
+        urls = payload.get("urls") or []
+        if len(urls) == 1:
+            data = {"jobs": page_jobs(config, urls[0])}
+        else:
+            data = {"pages": [{"page_url": url, "jobs": page_jobs(config, url)} for url in urls]}
+        
+        # 偶數請求直接完成，其餘需輪詢，兩種流程都會被測到
+        if stats["extract"] % 2 == 0:
+            return {"success": True, "status": "completed", "data": data}
+        job_id = str(uuid.uuid4())
+        extract_jobs[job_id] = {"success": True, "status": "completed", "data": data}
+        return {"success": True, "id": job_id}
+    
+    @app.get("/v1/extract/{job_id}")
+    async def extract_status(job_id: str):
+        result = extract_jobs.pop(job_id, None)
+        if result is None:
+            return JSONResponse({"success": False, "error": "Unknown job"}, status_code=404)
+        return result
+    
+    @app.get("/reader/{url:path}")
+    async def reader(url: str):
+        stats["reader"] += 1
+        await delay(config.latency_ms)
+        error = failure()
+        if error is not None:
+            return error
+        
+        jobs = page_jobs(config, url)
+        content = "\n".join(f"- [{job['job_title']}]({job['job_url']})" for job in jobs)
+        links = {job["job_title"]: job["job_url"] for job in jobs}
+        return {"code": 200, "data": {"url": url, "content": f"# Careers\n\n{content}", "links": links}}
+    
+    @app.get("/careers/{company}", response_class=HTMLResponse)
+    async def career_page(company: str, request: Request):
+        stats["pages"] += 1
+        await delay(config.page_latency_ms)
+        page_url = str(request.url).split("?")[0]
+        items = "".join(
+            f'<li><a href="{job["job_url"]}">{job["job_title"]}</a></li>' for job in page_jobs(config, page_url)
+        )
+        return f"<html><head><title>{company} careers</title></head><body><h1>Open roles</h1><ul>{items}</ul></body></html>"
+    
+    @app.get("/careers/{company}/jobs/{number}", response_class=HTMLResponse)
+    async def job_page(company: str, number: int, request: Request):
+        stats["pages"] += 1
+        await delay(config.page_latency_ms)
+        job_url = str(request.url).split("?")[0]
+        rng_job = _page_rng(config, job_url)
+        posting = {
+            "@context": "https://schema.org",
+            "@type": "JobPosting",
+            "title": rng_job.choice(TITLES),
+            "description": job_description(config, job_url),
+            "occupationalCategory": rng_job.choice(DEPARTMENTS),
+            "jobLocation": {"@type": "Place", "address": {"addressLocality": rng_job.choice(LOCATIONS)}},
+        }
+        return (
+            f'<html><head><script type="application/ld+json">{json.dumps(posting)}</script></head>'
+            f"<body><h1>{posting['title']}</h1><p>{posting['description']}</p></body></html>"
+        )
+    
+    @app.get("/stats")
+    async def get_stats():
+        return {**stats, "config": asdict(config)}
+    
+    return app
+
+
+def serve(config: MockConfig, host: str = "127.0.0.1", port: int = 8900) -> None:
+    """
+    Run the mock server until interrupted (blocking).
+    """
+    uvicorn.run(create_mock_app(config), host=host, port=port, log_level="warning", access_log=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mock FireCrawl / Jina Reader server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    for name, value in asdict(MockConfig()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    args = vars(parser.parse_args())
+    host, port = args.pop("host"), args.pop("port")
+    serve(MockConfig(**args), host=host, port=port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+"""
+Benchmark runner for the crawler service and the ``/crawler`` API endpoints.
+
+Starts the mock provider server in a separate process, points the application at
+it and drives each scenario at the requested concurrency levels. Reports throughput,
+latency percentiles, event-loop lag and memory, and saves the results as JSON so
+runs can be compared between commits.
+
+Usage:
+    python -m benchmarks.run --scenario service --scenario api --concurrency 1,8,32 \
+        --requests 200 --output benchmarks/results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.run ... --compare benchmarks/results/baseline.json
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import math
+import multiprocessing
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.mock_server import MockConfig, serve
+
+SCENARIOS = ("service", "batch", "changes", "api")
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile of a list of values.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """
+    Summary statistics in milliseconds for a list of durations in seconds.
+    """
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "mean": round(sum(values) / len(values) * 1000, 3),
+        "p50": round(percentile(values, 50) * 1000, 3),
+        "p95": round(percentile(values, 95) * 1000, 3),
+        "p99": round(percentile(values, 99) * 1000, 3),
+        "max": round(max(values) * 1000, 3),
+    }
+
+
+def rss_mb() -> float:
+    """
+    Current resident set size in MB, falling back to the peak where /proc is unavailable.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process in MB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以位元組回報，Linux 以 KB 回報
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class LoopLagMonitor:
+    """
+    Measure event-loop lag as the overshoot of a short periodic sleep.
+    """
+    
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+    
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - started - self.interval))
+    
+    def __enter__(self) -> "LoopLagMonitor":
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self._task.cancel()
+
+
+async def drive(call: Callable[[int], Awaitable[Any]], requests: int, concurrency: int) -> Dict[str, Any]:
+    """
+    Run ``requests`` calls with at most ``concurrency`` in flight and collect metrics.
+    
+    Args:
+        call: Coroutine factory taking the request index.
+        requests: Total number of calls.
+        concurrency: Number of concurrent callers.
+    
+    Returns:
+        Dict[str, Any]: Throughput, latency, loop lag, memory and error counts.
+    """
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    counter = iter(range(requests))
+    
+    async def caller() -> None:
+        for index in counter:
+            started = time.perf_counter()
+            try:
+                await call(index)
+            except Exception as e:
+                name = type(e).__name__
+                errors[name] = errors.get(name, 0) + 1
+                continue
+            latencies.append(time.perf_counter() - started)
+    
+    gc.collect()
+    rss_start = rss_mb()
+    with LoopLagMonitor() as lag:
+        started = time.perf_counter()
+        await asyncio.gather(*(caller() for _ in range(concurrency)))
+        duration = time.perf_counter() - started
+    
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "succeeded": len(latencies),
+        "errors": errors,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(latencies) / duration, 3) if duration else 0.0,
+        "latency_ms": summarize(latencies),
+        "loop_lag_ms": summarize(lag.samples),
+        "memory_mb": {
+            "rss_start": round(rss_start, 1),
+            "rss_end": round(rss_mb(), 1),
+            "rss_peak": round(max(peak_rss_mb(), rss_mb()), 1),
+        },
+    }
+
+
+def configure_environment(base_url: str, provider: str, cache: bool) -> None:
+    """
+    Point the application settings at the mock server. Must run before importing ``app``.
+    """
+    # 只啟用受測的爬蟲服務 (金鑰需符合各服務的前綴檢查)
+    keys = {"firecrawl": ("FIRECRAWL_API_KEY", "fc-bench"), "jina": ("JINA_AI_API_KEY", "jina_bench")}
+    for name, (key, value) in keys.items():
+        os.environ[key] = value if provider in (name, "all") else ""
+    os.environ.update({
+        "FIRECRAWL_API_URL": base_url,
+        "FIRECRAWL_POLL_INTERVAL": "0.05",
+        "JINA_READER_URL": f"{base_url}/reader",
+        # 所有頁面都在同一主機上，不套用網域與服務的速率限制
+        "CRAWLER_DOMAIN_RATE_LIMIT": "1000000",
+        "CRAWLER_DOMAIN_BURST": "1000000",
+        "FIRECRAWL_RATE_LIMIT": "1000000",
+        "FIRECRAWL_RATE_BURST": "1000000",
+        "JINA_RATE_LIMIT": "1000000",
+        "JINA_RATE_BURST": "1000000",
+        # 真實情況下每家公司是不同網域，每網域的詳細頁面併發上限不應在此限制整體併發
+        "JOB_ENRICHMENT_DOMAIN_CONCURRENCY": "1000",
+        "EXTRACTION_CACHE_ENABLED": str(cache),
+        "EXTRACTION_CACHE_SQLITE_PATH": "",
+        "CHANGE_DETECTION_ENABLED": str(cache),
+        "CHANGE_DETECTION_SQLITE_PATH": "",
+    })
+
+
+def page_url(base_url: str, pages: int, index: int) -> str:
+    return f"{base_url}/careers/company-{index % pages}"
+
+
+async def run_scenario(scenario: str, base_url: str, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """
+    Run one scenario at every concurrency level.
+    """
+    from app.services.crawler.crawler_service import CrawlerService
+    
+    results = []
+    for concurrency in args.concurrency:
+        if scenario == "api":
+            result = await run_api(base_url, args, concurrency)
+        else:
+            service = CrawlerService()
+            try:
+                if scenario == "service":
+                    async def call(index: int) -> None:
+                        await service.crawl_job_postings(page_url(base_url, args.pages, index))
+                elif scenario == "batch":
+                    async def call(index: int) -> None:
+                        urls = [page_url(base_url, args.pages, index * args.batch_size + i)
+                                for i in range(args.batch_size)]
+                        response = await service.crawl_job_postings_batch(urls)
+                        if response.errors:
+                            raise RuntimeError(next(iter(response.errors.values())))
+                else:
+                    async def call(index: int) -> None:
+                        await service.crawl_job_posting_changes(page_url(base_url, args.pages, index))
+                
+                await drive(call, min(args.warmup, args.requests), concurrency)
+                result = await drive(call, args.requests, concurrency)
+                result["providers"] = service.provider_stats()
+            finally:
+                await service.aclose()
+        result["scenario"] = scenario
+        results.append(result)
+        print(
+            f"{scenario:>8} c={concurrency:<4} {result['throughput_rps']:>9.2f} req/s  "
+            f"p50={result['latency_ms']['p50']:.1f}ms p95={result['latency_ms']['p95']:.1f}ms "
+            f"p99={result['latency_ms']['p99']:.1f}ms lag_p99={result['loop_lag_ms']['p99']:.1f}ms "
+            f"rss={result['memory_mb']['rss_end']:.0f}MB errors={sum(result['errors'].values())}"
+        )
+    return results
+
+
+async def run_api(base_url: str, args: argparse.Namespace, concurrency: int) -> Dict[str, Any]:
+    """
+    Drive ``POST /crawler/extract-jobs`` in-process through the ASGI app and its lifespan.
+    """
+    from app.core.config import settings
+    from app.main import app
+    
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def call(index: int) -> None:
+                response = await client.post(
+                    f"{settings.API_V1_STR}/crawler/extract-jobs",
+                    json={"url": page_url(base_url, args.pages, index)},
+                )
+                response.raise_for_status()
+            
+            await drive(call, min(args.warmup, args.requests), concurrency)
+            return await drive(call, args.requests, concurrency)
+
+
+def start_mock_server(config: MockConfig, port: int) -> multiprocessing.Process:
+    """
+    Start the mock server in a separate process and wait until it accepts connections.
+    """
+    process = multiprocessing.get_context("spawn").Process(
+        target=serve, args=(config,), kwargs={"port": port}, daemon=True
+    )
+    process.start()
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"Mock server did not start on port {port}")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict[str, Any], baseline_path: str) -> None:
+    """
+    Print throughput and latency changes against a saved run.
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    previous = {(r["scenario"], r["concurrency"]): r for r in baseline["results"]}
+    
+    print(f"\nCompared with {baseline_path} (commit {baseline['meta'].get('commit')}):")
+    for result in current["results"]:
+        old = previous.get((result["scenario"], result["concurrency"]))
+        if old is None:
+            continue
+        
+        def change(new: float, before: float) -> str:
+            return f"{(new - before) / before * 100:+.1f}%" if before else "n/a"
+        
+        print(
+            f"{result['scenario']:>8} c={result['concurrency']:<4} "
+            f"throughput {change(result['throughput_rps'], old['throughput_rps'])}  "
+            f"p95 {change(result['latency_ms']['p95'], old['latency_ms']['p95'])}  "
+            f"p99 {change(result['latency_ms']['p99'], old['latency_ms']['p99'])}"
+        )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Crawler benchmark runner")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS,
+                        help="Scenario to run (repeatable, default: service)")
+    parser.add_argument("--provider", choices=("firecrawl", "jina", "all"), default="firecrawl")
+    parser.add_argument("--concurrency", type=lambda v: [int(c) for c in v.split(",")], default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=1000, help="Distinct synthetic career pages")
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--cache", action="store_true", help="Enable the extraction cache and change detection")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--output", help="Path of the JSON results file")
+    parser.add_argument("--compare", help="Previous JSON results to compare with")
+    parser.add_argument("--log-level", default="CRITICAL", help="Log level of the application under test")
+    for name, value in asdict(MockConfig()).items():
+        parser.add_argument(f"--mock-{name.replace('_', '-')}", dest=f"mock_{name}", type=type(value), default=value)
+    args = parser.parse_args(argv)
+    args.scenario = args.scenario or ["service"]
+    return args
+
+
+async def run(args: argparse.Namespace, base_url: str) -> List[Dict[str, Any]]:
+    results = []
+    for scenario in args.scenario:
+        results.extend(await run_scenario(scenario, base_url, args))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    logging.basicConfig(level=args.log_level)
+    mock_config = MockConfig(**{
+        name: getattr(args, f"mock_{name}") for name in asdict(MockConfig())
+    })
+    base_url = f"http://127.0.0.1:{args.port}"
+    configure_environment(base_url, args.provider, args.cache)
+    
+    server = start_mock_server(mock_config, args.port)
+    try:
+        results = asyncio.run(run(args, base_url))
+    finally:
+        server.terminate()
+        server.join(5)
+    
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "provider": args.provider,
+            "cache": args.cache,
+            "pages": args.pages,
+            "mock": asdict(mock_config),
+        },
+        "results": results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.output}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()